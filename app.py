@@ -15,12 +15,16 @@ from flask import Flask
 from flask_login import LoginManager
 from models import db, User
 from auth import auth
-from main import main
+from main import main, start_job_workers
 from config import Config
 from database import init_db
+from utils.structured_logging import configure_logging
 
 def create_app():
     """Create and configure the Flask application"""
+    # Non-blocking structured logging for request threads
+    configure_logging(Config.LOG_LEVEL, Config.LOG_FORMAT, Config.LOG_DEBUG_SAMPLE_RATE)
+    
     app = Flask(__name__)
     
     # Configuration
@@ -47,6 +51,10 @@ def create_app():
     app.register_blueprint(auth)
     app.register_blueprint(main)
     
+    # Resume queued extraction jobs when async uploads are enabled
+    if Config.ASYNC_UPLOADS:
+        start_job_workers(app)
+    
     return app
 
 if __name__ == '__main__':
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark: per-image extract_text loop vs extract_text_batch
+
+Usage:
+    python -m benchmarks.bench_batch_extraction --images 32 --workers 4 --prefetch 4
+    python -m benchmarks.bench_batch_extraction --processor lightweight
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import generate_corpus
+
+
+def make_images(directory: str, count: int, seed: int = 0) -> list:
+    """Write `count` printed-text images from the synthetic corpus and return their paths"""
+    samples = generate_corpus(directory, per_kind=count, seed=seed, kinds=['printed-medium'])
+    return [sample['path'] for sample in samples]
+
+
+def load_processor(name: str):
+    if name == 'lightweight':
+        from utils.lightweight_ocr_processor import LightweightOCRProcessor
+        return LightweightOCRProcessor()
+    from utils.advanced_ocr_processor import AdvancedOCRProcessor
+    return AdvancedOCRProcessor()
+
+
+def run(args) -> dict:
+    processor = load_processor(args.processor)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_images(tmp, args.images)
+
+        # Warm-up so model loading is not billed to either mode
+        processor.extract_text(paths[0])
+
+        started = time.perf_counter()
+        for path in paths:
+            processor.extract_text(path)
+        loop_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        count = sum(1 for _ in processor.extract_text_batch(
+            paths, prefetch=args.prefetch, workers=args.workers, ordered=not args.unordered
+        ))
+        batch_seconds = time.perf_counter() - started
+
+    report = {
+        'processor': args.processor,
+        'images': count,
+        'workers': args.workers,
+        'prefetch': args.prefetch,
+        'ordered': not args.unordered,
+        'loop_images_per_sec': args.images / loop_seconds if loop_seconds else 0.0,
+        'batch_images_per_sec': count / batch_seconds if batch_seconds else 0.0,
+    }
+    report['speedup'] = (report['batch_images_per_sec'] / report['loop_images_per_sec']
+                         if report['loop_images_per_sec'] else 0.0)
+    if hasattr(processor, 'get_batching_stats'):
+        report['batching'] = processor.get_batching_stats()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processor', choices=['advanced', 'lightweight'], default='advanced')
+    parser.add_argument('--images', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--prefetch', type=int, default=4)
+    parser.add_argument('--unordered', action='store_true', help='Yield results as completed')
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    report = run(args)
+
+    print("\n" + "=" * 60)
+    print(f"Loop : {report['loop_images_per_sec']:.2f} images/sec")
+    print(f"Batch: {report['batch_images_per_sec']:.2f} images/sec "
+          f"(workers={args.workers}, prefetch={args.prefetch})")
+    print(f"Speedup: {report['speedup']:.2f}x")
+    print("=" * 60)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
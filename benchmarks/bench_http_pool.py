@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Per-call overhead of fresh vs pooled HTTP connections
+
+Starts a local stub translation server (HTTP/1.1 keep-alive, optionally
+TLS with a throwaway self-signed certificate) and sends the same POST
+/translate calls two ways:
+
+    fresh    module-level requests.post: new TCP (+TLS) connection per call
+    pooled   utils.http_pool.HTTPClientPool: one keep-alive session per host
+
+It reports the latency per call and how many connections the server
+accepted in each mode. The stub answers immediately, so the difference
+is connection setup alone.
+
+Usage:
+    python -m benchmarks.bench_http_pool --calls 500
+    python -m benchmarks.bench_http_pool --tls --threads 4 --output bench_http_pool.json
+"""
+import argparse
+import json
+import os
+import ssl
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_ocr import git_commit, percentile
+from utils.http_pool import HTTPClientPool
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    disable_nagle_algorithm = True  # as production servers do; avoids 40 ms delayed-ACK stalls
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with StubHandler.lock:
+            StubHandler.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        body = json.dumps({'translatedText': payload.get('q', '')}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_stub(tls_dir=None) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    if tls_dir:
+        cert, key = os.path.join(tls_dir, 'cert.pem'), os.path.join(tls_dir, 'key.pem')
+        subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+                        '-subj', '/CN=127.0.0.1', '-keyout', key, '-out', cert],
+                       check=True, capture_output=True)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure(call: Callable[[], requests.Response], calls: int, threads: int) -> Dict:
+    StubHandler.connections = 0
+
+    def timed_call(_):
+        started = time.perf_counter()
+        response = call()
+        response.raise_for_status()
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = sorted(pool.map(timed_call, range(calls)))
+    elapsed = time.perf_counter() - started
+    return {
+        'calls': calls,
+        'mean_ms': round(statistics.mean(latencies), 3),
+        'p50_ms': round(percentile(latencies, 0.5), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'calls_per_s': round(calls / elapsed, 1),
+        'connections': StubHandler.connections,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=300)
+    parser.add_argument('--threads', type=int, default=1, help='Concurrent callers')
+    parser.add_argument('--tls', action='store_true', help='Serve HTTPS (needs the openssl CLI)')
+    parser.add_argument('--output', default='bench_http_pool.json', help='JSON report path')
+    args = parser.parse_args()
+
+    payload = {'q': 'The quick brown fox', 'source': 'en', 'target': 'es', 'format': 'text'}
+    with tempfile.TemporaryDirectory() as tmp:
+        server = start_stub(tmp if args.tls else None)
+        url = f"{'https' if args.tls else 'http'}://127.0.0.1:{server.server_port}/translate"
+        warnings.filterwarnings('ignore', message='Unverified HTTPS request')
+        pool = HTTPClientPool(pool_size=max(args.threads, 1))
+
+        results = {
+            'fresh': measure(lambda: requests.post(url, json=payload, timeout=5, verify=False),
+                             args.calls, args.threads),
+            'pooled': measure(lambda: pool.post(url, json=payload, verify=False), args.calls, args.threads),
+        }
+        pool.close()
+        server.shutdown()
+
+    saved = results['fresh']['mean_ms'] - results['pooled']['mean_ms']
+    report = {
+        'meta': {'commit': git_commit(), 'python': sys.version.split()[0], 'tls': args.tls,
+                 'threads': args.threads},
+        'results': results,
+        'saved_per_call_ms': round(saved, 3),
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    print("\n" + "=" * 70)
+    print(f"{'mode':8} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'calls/s':>9} {'conns':>7}")
+    for mode, r in results.items():
+        print(f"{mode:8} {r['mean_ms']:9.2f} {r['p50_ms']:9.2f} {r['p95_ms']:9.2f} "
+              f"{r['calls_per_s']:9.1f} {r['connections']:7d}")
+    print(f"\nPooling saves {saved:.2f} ms per call ({'HTTPS' if args.tls else 'HTTP'}, local stub)")
+    print("=" * 70)
+    print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
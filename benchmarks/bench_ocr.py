@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+OCR engine benchmark over the synthetic corpus
+
+Runs every extract_with_* engine, both preprocessors, the full
+AdvancedOCRProcessor.extract_text and LightweightOCRProcessor.extract_text
+on the same images and writes a JSON report (sorted keys, so reports from
+two commits can be diffed):
+
+    p50/p95/mean latency, throughput, peak RSS, character error rate (CER)
+    overall and per image kind
+
+Engines that are not installed are reported as skipped.
+
+Usage:
+    python -m benchmarks.bench_ocr --per-kind 3 --output bench_ocr.json
+    python -m benchmarks.bench_ocr --targets advanced.extract_text lightweight.extract_text
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import KINDS, generate_corpus
+
+TARGETS = (
+    'advanced.preprocess_for_handwriting',
+    'advanced.preprocess_for_printed',
+    'advanced.extract_with_trocr',
+    'advanced.extract_with_paddle',
+    'advanced.extract_with_easyocr',
+    'advanced.extract_with_tesseract',
+    'advanced.extract_text',
+    'lightweight.extract_text',
+)
+
+
+def _normalize(text: str) -> str:
+    return ' '.join((text or '').split())
+
+
+def levenshtein(a: str, b: str) -> int:
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def cer(reference: str, hypothesis: str) -> float:
+    """Character error rate on whitespace-normalised text"""
+    reference, hypothesis = _normalize(reference), _normalize(hypothesis)
+    if not reference:
+        return 0.0 if not hypothesis else 1.0
+    return levenshtein(reference, hypothesis) / len(reference)
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def current_rss_mb() -> float:
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is KB on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == 'darwin' else maxrss / 1024
+
+
+class RSSSampler:
+    """Tracks peak resident memory while a target runs"""
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_mb = max(self.peak_mb, current_rss_mb())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak_mb = current_rss_mb()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+
+def build_targets(names: List[str]) -> Dict[str, Dict]:
+    """Resolve target names to callables; unavailable ones carry a 'skipped' reason"""
+    targets = {}
+    advanced = lightweight = None
+    advanced_error = None
+
+    if any(name.startswith('advanced.') for name in names):
+        try:
+            import utils.advanced_ocr_processor as advanced_module
+            advanced = advanced_module.AdvancedOCRProcessor()
+        except Exception as e:
+            advanced_error = f'AdvancedOCRProcessor unavailable: {e}'
+
+    for name in names:
+        owner, method = name.split('.', 1)
+        if owner == 'lightweight':
+            if lightweight is None:
+                from utils.lightweight_ocr_processor import LightweightOCRProcessor
+                lightweight = LightweightOCRProcessor()
+            if not lightweight.is_available():
+                targets[name] = {'skipped': 'Tesseract not available'}
+            else:
+                targets[name] = {'fn': lightweight.extract_text, 'returns': 'result'}
+            continue
+
+        if advanced is None:
+            targets[name] = {'skipped': advanced_error}
+            continue
+
+        if method.startswith('preprocess_'):
+            targets[name] = {'fn': getattr(advanced, method), 'returns': 'image'}
+            continue
+
+        if method == 'extract_text':
+            if not advanced.is_available():
+                targets[name] = {'skipped': 'No OCR engine available'}
+            else:
+                targets[name] = {'fn': advanced.extract_text, 'returns': 'result'}
+            continue
+
+        engine = method[len('extract_with_'):]
+        ready = {
+            'trocr': lambda: advanced_module.TROCR_AVAILABLE and advanced._load_trocr_on_demand(),
+            'paddle': lambda: advanced_module.PADDLE_AVAILABLE and advanced._load_paddle_on_demand(),
+            'easyocr': advanced._ensure_easyocr_loaded,
+            'tesseract': lambda: 'tesseract' in dict(advanced.processors),
+        }[engine]()
+        if ready:
+            targets[name] = {'fn': getattr(advanced, method), 'returns': 'tuple'}
+        else:
+            targets[name] = {'skipped': f'{engine} not available'}
+    return targets
+
+
+def run_target(fn: Callable, returns: str, samples: List[Dict]) -> Dict:
+    # Warm-up (model loading, caches) is not billed to the measurement
+    try:
+        fn(samples[0]['path'])
+    except Exception:
+        pass
+
+    latencies, errors, by_kind = [], [], {}
+    failures, first_failure = 0, None
+    with RSSSampler() as rss:
+        started = time.perf_counter()
+        for sample in samples:
+            call_started = time.perf_counter()
+            try:
+                output = fn(sample['path'])
+            except Exception as e:
+                failures += 1
+                first_failure = first_failure or f"{sample['kind']}: {type(e).__name__}: {str(e).strip()}"
+                continue
+            latencies.append((time.perf_counter() - call_started) * 1000)
+
+            if returns == 'image':
+                continue
+            text = output['text'] if returns == 'result' else output[0]
+            error = cer(sample['text'], text)
+            errors.append(error)
+            by_kind.setdefault(sample['kind'], []).append(error)
+        elapsed = time.perf_counter() - started
+
+    report = {
+        'images': len(samples),
+        'failures': failures,
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'mean_ms': round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        'throughput_per_sec': round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        'peak_rss_mb': round(rss.peak_mb, 1),
+    }
+    if first_failure:
+        report['first_failure'] = first_failure
+    if errors:
+        report['cer'] = round(sum(errors) / len(errors), 4)
+        report['cer_by_kind'] = {kind: round(sum(v) / len(v), 4) for kind, v in by_kind.items()}
+    return report
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run(args) -> Dict:
+    names = args.targets or list(TARGETS)
+    corpus_dir = args.corpus_dir or tempfile.mkdtemp(prefix='ocr_corpus_')
+    samples = generate_corpus(corpus_dir, per_kind=args.per_kind, seed=args.seed, kinds=args.kinds)
+    targets = build_targets(names)
+
+    results = {}
+    for name in names:
+        target = targets[name]
+        if 'skipped' in target:
+            print(f"[SKIP] {name}: {target['skipped']}")
+            results[name] = {'skipped': target['skipped']}
+            continue
+        print(f"[RUN] {name} on {len(samples)} images...")
+        results[name] = run_target(target['fn'], target['returns'], samples)
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'per_kind': args.per_kind,
+            'kinds': args.kinds or list(KINDS),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        },
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--targets', nargs='+', choices=TARGETS, help='Subset of targets to run')
+    parser.add_argument('--per-kind', type=int, default=3, help='Images per corpus kind')
+    parser.add_argument('--kinds', nargs='+', choices=KINDS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--corpus-dir', help='Keep the generated corpus here')
+    parser.add_argument('--output', default='bench_ocr.json', help='JSON report path')
+    args = parser.parse_args()
+
+    report = run(args)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    print("\n" + "=" * 78)
+    print(f"{'target':40} {'p50 ms':>9} {'p95 ms':>9} {'img/s':>7} {'RSS MB':>7} {'CER':>6} {'fail':>5}")
+    for name, result in report['results'].items():
+        if 'skipped' in result:
+            print(f"{name:40} skipped ({result['skipped']})")
+            continue
+        cer_text = f"{result['cer']:.3f}" if 'cer' in result else '-'
+        print(f"{name:40} {result['p50_ms']:9.1f} {result['p95_ms']:9.1f} "
+              f"{result['throughput_per_sec']:7.2f} {result['peak_rss_mb']:7.0f} {cer_text:>6} {result['failures']:5d}")
+    print("=" * 78)
+    print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+App cold-start benchmark
+
+Starts fresh interpreters with `python -X importtime` and measures, per run:
+
+    import_main_ms    import main (blueprint, processors, config)
+    create_app_ms     create_app() (logging, database, blueprints)
+    first_request_ms  GET /login through the test client
+
+then reports the medians, the slowest imports (cumulative and self time,
+from -X importtime) and which heavy optional libraries were imported during
+startup (none should be: engines and clients are imported on first use).
+
+Usage:
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --max-startup-ms 3000   # exit 1 when slower
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_ocr import git_commit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('torch', 'transformers', 'paddleocr', 'paddle', 'easyocr', 'groq', 'reportlab')
+
+STARTUP_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+from app import create_app
+app = create_app()
+created = time.perf_counter()
+status = app.test_client().get('/login').status_code
+answered = time.perf_counter()
+print(json.dumps({
+    'import_main_ms': (imported - started) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_request_ms': (answered - created) * 1000,
+    'startup_ms': (answered - started) * 1000,
+    'status': status,
+    'heavy_modules': sorted(name for name in %r if name in sys.modules),
+}))
+""" % (HEAVY_MODULES,)
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Rows of `-X importtime` output as {'module', 'self_us', 'cumulative_us'}"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        rows.append({'module': module.strip(), 'self_us': int(self_us), 'cumulative_us': int(cumulative_us)})
+    return rows
+
+
+def run_once(env: Dict) -> Dict:
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+                               cwd=ROOT, env=env, capture_output=True, text=True, timeout=600)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr[-2000:])
+    phases = json.loads(completed.stdout.strip().splitlines()[-1])
+    phases['imports'] = parse_importtime(completed.stderr)
+    return phases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help='Slowest imports to list')
+    parser.add_argument('--max-startup-ms', type=float, help='Fail when median startup is slower')
+    parser.add_argument('--output', default='bench_startup.json', help='JSON report path')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep the database and router stats out of the working tree
+        env = dict(os.environ,
+                   DATABASE_URL='sqlite:///' + os.path.join(tmp, 'startup.db'),
+                   ROUTER_STATS_PATH=os.path.join(tmp, 'engine_stats.sqlite3'),
+                   LOG_LEVEL='WARNING')
+        runs = []
+        for i in range(args.runs):
+            runs.append(run_once(env))
+            print(f"[RUN] {i + 1}/{args.runs}: {runs[-1]['startup_ms']:.0f} ms")
+
+    phases = ('import_main_ms', 'create_app_ms', 'first_request_ms', 'startup_ms')
+    medians = {phase: round(statistics.median(run[phase] for run in runs), 1) for phase in phases}
+
+    # Per-module medians across runs
+    by_module: Dict[str, Dict[str, List[int]]] = {}
+    for run in runs:
+        for row in run['imports']:
+            entry = by_module.setdefault(row['module'], {'self_us': [], 'cumulative_us': []})
+            entry['self_us'].append(row['self_us'])
+            entry['cumulative_us'].append(row['cumulative_us'])
+    modules = [{'module': name,
+                'self_ms': round(statistics.median(v['self_us']) / 1000, 1),
+                'cumulative_ms': round(statistics.median(v['cumulative_us']) / 1000, 1)}
+               for name, v in by_module.items()]
+    top_cumulative = sorted(modules, key=lambda m: m['cumulative_ms'], reverse=True)[:args.top]
+    top_self = sorted(modules, key=lambda m: m['self_ms'], reverse=True)[:args.top]
+    heavy = sorted({name for run in runs for name in run['heavy_modules']})
+
+    report = {
+        'meta': {'commit': git_commit(), 'python': sys.version.split()[0], 'runs': args.runs},
+        'median': medians,
+        'first_request_status': runs[-1]['status'],
+        'heavy_modules_at_startup': heavy,
+        'top_cumulative_imports': top_cumulative,
+        'top_self_imports': top_self,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    print("\n" + "=" * 70)
+    for phase in phases:
+        print(f"{phase:20} {medians[phase]:10.1f} ms")
+    print(f"\n{'slowest imports (cumulative)':50} {'cum ms':>8} {'self ms':>8}")
+    for module in top_cumulative:
+        print(f"{module['module'][:50]:50} {module['cumulative_ms']:8.1f} {module['self_ms']:8.1f}")
+    print(f"\nHeavy libraries imported at startup: {', '.join(heavy) or 'none'}")
+    print("=" * 70)
+    print(f"Report written to {args.output}")
+
+    if args.max_startup_ms and medians['startup_ms'] > args.max_startup_ms:
+        print(f"Startup {medians['startup_ms']:.0f} ms exceeds {args.max_startup_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
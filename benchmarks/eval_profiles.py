@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Accuracy vs latency of OCR speed profiles
+
+Runs AdvancedOCRProcessor.extract_text over a labeled corpus once per named
+configuration ("profile") and reports CER/WER against the ground truth and
+wall time, then prints a Pareto table: a profile is marked * when no other
+profile is both faster and at least as accurate.
+
+A profile sets processor knobs (same names as the attributes on
+AdvancedOCRProcessor, defaults come from Config):
+
+    trocr_num_beams   TrOCR beam width
+    easyocr_passes    subset of ['original', 'handwriting', 'printed']
+    max_image_side    downscale larger images before OCR (0 = never)
+    enabled_engines   subset of ['trocr', 'paddle', 'easyocr', 'tesseract']
+
+The corpus is a directory with manifest.json ({"samples": [{"path", "text",
+"kind"}, ...]}), as written by benchmarks/synthetic.py; without --corpus a
+synthetic one is generated.
+
+Usage:
+    python -m benchmarks.eval_profiles --per-kind 3
+    python -m benchmarks.eval_profiles --corpus data/labeled --profiles baseline fast
+    python -m benchmarks.eval_profiles --profiles-file my_profiles.json --output eval.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_ocr import cer, levenshtein, percentile
+from benchmarks.synthetic import generate_corpus
+
+PROFILES: Dict[str, Dict] = {
+    'baseline': {},
+    'beams-4': {'trocr_num_beams': 4},
+    'greedy': {'trocr_num_beams': 1},
+    'easyocr-original-only': {'easyocr_passes': ['original']},
+    'easyocr-no-printed-pass': {'easyocr_passes': ['original', 'handwriting']},
+    'downscale-2000': {'max_image_side': 2000},
+    'downscale-1200': {'max_image_side': 1200},
+    'no-easyocr': {'enabled_engines': ['trocr', 'paddle', 'tesseract']},
+    'tesseract-only': {'enabled_engines': ['tesseract']},
+    'fast': {'trocr_num_beams': 4, 'easyocr_passes': ['original'], 'max_image_side': 2000},
+}
+
+KNOBS = ('trocr_num_beams', 'easyocr_passes', 'max_image_side', 'enabled_engines')
+
+
+def wer(reference: str, hypothesis: str) -> float:
+    """Word error rate"""
+    reference_words, hypothesis_words = (reference or '').split(), (hypothesis or '').split()
+    if not reference_words:
+        return 0.0 if not hypothesis_words else 1.0
+    return levenshtein(reference_words, hypothesis_words) / len(reference_words)
+
+
+def load_corpus(args) -> List[Dict]:
+    if args.corpus:
+        with open(os.path.join(args.corpus, 'manifest.json')) as f:
+            samples = json.load(f)['samples']
+        for sample in samples:
+            if not os.path.isabs(sample['path']):
+                sample['path'] = os.path.join(args.corpus, sample['path'])
+        return samples
+    return generate_corpus(tempfile.mkdtemp(prefix='eval_corpus_'), per_kind=args.per_kind, seed=args.seed)
+
+
+def evaluate(processor, knobs: Dict, samples: List[Dict]) -> Dict:
+    """Run extract_text over the corpus with the given knobs applied"""
+    unknown = set(knobs) - set(KNOBS)
+    if unknown:
+        raise ValueError(f"Unknown knobs: {', '.join(sorted(unknown))}")
+
+    saved = {knob: getattr(processor, knob) for knob in KNOBS}
+    for knob, value in knobs.items():
+        setattr(processor, knob, value)
+    try:
+        # Warm-up so model loading is not billed to the first profile
+        processor.extract_text(samples[0]['path'])
+
+        latencies, cers, wers, methods = [], [], [], {}
+        started = time.perf_counter()
+        for sample in samples:
+            call_started = time.perf_counter()
+            result = processor.extract_text(sample['path'])
+            latencies.append((time.perf_counter() - call_started) * 1000)
+            text = result.get('text', '') if result.get('method') != 'none' else ''
+            cers.append(cer(sample['text'], text))
+            wers.append(wer(sample['text'], text))
+            methods[result.get('method', 'none')] = methods.get(result.get('method', 'none'), 0) + 1
+        wall_seconds = time.perf_counter() - started
+    finally:
+        for knob, value in saved.items():
+            setattr(processor, knob, value)
+
+    return {
+        'knobs': knobs,
+        'images': len(samples),
+        'wall_seconds': round(wall_seconds, 3),
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'cer': round(sum(cers) / len(cers), 4),
+        'wer': round(sum(wers) / len(wers), 4),
+        'methods': methods,
+    }
+
+
+def mark_pareto(results: Dict[str, Dict]):
+    """Flag profiles not dominated on (wall time, CER)"""
+    for name, result in results.items():
+        result['pareto'] = not any(
+            other['wall_seconds'] <= result['wall_seconds'] and other['cer'] <= result['cer']
+            and (other['wall_seconds'] < result['wall_seconds'] or other['cer'] < result['cer'])
+            for other_name, other in results.items() if other_name != name
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', nargs='+', help='Profile names to run (default: all)')
+    parser.add_argument('--profiles-file', help='JSON file of {name: {knob: value}} added to the built-ins')
+    parser.add_argument('--corpus', help='Labeled corpus directory with manifest.json')
+    parser.add_argument('--per-kind', type=int, default=3, help='Synthetic images per kind (no --corpus)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='eval_profiles.json', help='JSON report path')
+    args = parser.parse_args()
+
+    profiles = dict(PROFILES)
+    if args.profiles_file:
+        with open(args.profiles_file) as f:
+            profiles.update(json.load(f))
+    names = args.profiles or list(profiles)
+    missing = [name for name in names if name not in profiles]
+    if missing:
+        parser.error(f"Unknown profiles: {', '.join(missing)}")
+
+    from utils.advanced_ocr_processor import AdvancedOCRProcessor
+    processor = AdvancedOCRProcessor()
+    processor.router = None  # learned routing would make profiles depend on run order
+    if not processor.is_available():
+        print("No OCR engine is available - nothing to evaluate")
+        sys.exit(1)
+
+    samples = load_corpus(args)
+    results = {}
+    for name in names:
+        print(f"[RUN] {name} {profiles[name]} on {len(samples)} images...")
+        results[name] = evaluate(processor, profiles[name], samples)
+    mark_pareto(results)
+
+    with open(args.output, 'w') as f:
+        json.dump({'images': len(samples), 'profiles': results}, f, indent=2, sort_keys=True)
+
+    print("\n" + "=" * 78)
+    print(f"  {'profile':28} {'wall s':>8} {'p50 ms':>9} {'p95 ms':>9} {'CER':>7} {'WER':>7}")
+    for name, result in sorted(results.items(), key=lambda item: item[1]['wall_seconds']):
+        mark = '*' if result['pareto'] else ' '
+        print(f"{mark} {name:28} {result['wall_seconds']:8.2f} {result['p50_ms']:9.1f} "
+              f"{result['p95_ms']:9.1f} {result['cer']:7.3f} {result['wer']:7.3f}")
+    print("=" * 78)
+    print("* = Pareto-optimal (no other profile is both faster and more accurate)")
+    print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Stub OCR and translation engines for load tests
+
+They honour the same interface main.py calls (extract_text, extract_preview,
+is_available, get_available_methods, translate_text) but instead of loading
+models they wait `latency_ms` (I/O-like: releases the GIL, yields under
+gevent) and burn `cpu_ms` of pure-Python CPU (holds the GIL, like model
+pre/post-processing). Both are jittered by +/- `jitter` (fraction).
+"""
+import random
+import time
+from typing import Dict, Optional
+
+from benchmarks.synthetic import random_lines
+
+
+def burn_cpu(ms: float):
+    """Busy-loop in Python for about `ms` milliseconds"""
+    deadline = time.perf_counter() + ms / 1000
+    x = 0
+    while time.perf_counter() < deadline:
+        for i in range(1000):
+            x += i * i
+    return x
+
+
+def _work(latency_ms: float, cpu_ms: float, jitter: float):
+    scale = 1 + random.uniform(-jitter, jitter) if jitter else 1
+    if cpu_ms:
+        burn_cpu(cpu_ms * scale)
+    if latency_ms:
+        time.sleep(latency_ms * scale / 1000)
+
+
+class FakeOCRProcessor:
+    """Returns canned text after a configurable delay"""
+
+    def __init__(self, latency_ms: float = 500, cpu_ms: float = 100, jitter: float = 0.2,
+                 confidence: float = 0.9, lines: int = 20, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.cpu_ms = cpu_ms
+        self.jitter = jitter
+        self.confidence = confidence
+        self.text = '\n'.join(random_lines(random.Random(seed), lines, 8))
+
+    def is_available(self) -> bool:
+        return True
+
+    def get_available_methods(self) -> list:
+        return ['fake']
+
+    def extract_text(self, image_path: str, force_method: Optional[str] = None,
+                     progress_callback=None) -> Dict:
+        _work(self.latency_ms, self.cpu_ms, self.jitter)
+        return {
+            'text': self.text,
+            'confidence': self.confidence,
+            'method': force_method or 'fake',
+            'text_type': 'printed',
+            'quality': 'good',
+            'quality_details': {'score': 80},
+            'all_results': [],
+        }
+
+    def extract_preview(self, image_path: str, max_side: Optional[int] = None) -> Dict:
+        # Previews are a cheap single-engine pass: a fifth of the full cost
+        _work(self.latency_ms / 5, self.cpu_ms / 5, self.jitter)
+        return {'text': self.text, 'confidence': self.confidence, 'method': 'fake-preview',
+                'quality': 'fair', 'quality_details': {'score': 60}, 'text_type': 'printed'}
+
+
+class FakeTranslator:
+    """Reverses each word after a configurable delay (so output differs from input)"""
+
+    def __init__(self, latency_ms: float = 800, cpu_ms: float = 10, jitter: float = 0.2):
+        self.latency_ms = latency_ms
+        self.cpu_ms = cpu_ms
+        self.jitter = jitter
+
+    def translate_text(self, text, source_lang, target_lang, on_partial=None):
+        if not text or not text.strip():
+            return ""
+        _work(self.latency_ms, self.cpu_ms, self.jitter)
+        result = ' '.join(word[::-1] for word in text.split(' '))
+        if on_partial is not None:
+            on_partial(result)
+        return result
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+End-to-end HTTP load test of the Flask app with stub engines
+
+For each server configuration, starts benchmarks/loadtest_app.py (create_app()
+with FakeOCRProcessor / FakeTranslator of configurable latency and CPU burn)
+under a real WSGI server, drives concurrent /upload, /translate,
+/generate_pdf and /dashboard traffic from logged-in virtual users, and
+reports throughput, latency percentiles and error rate per configuration
+and per endpoint.
+
+A configuration is worker_class:workers[:threads]:
+
+    sync:4          gunicorn -k sync -w 4
+    gthread:1:2     gunicorn -k gthread -w 1 --threads 2   (render.yaml)
+    gevent:4        gunicorn -k gevent -w 4                (Dockerfile)
+    werkzeug        werkzeug's threaded dev server (no gunicorn needed)
+
+Configurations whose server is not installed (gunicorn, gevent) are
+reported as skipped.
+
+Usage:
+    python -m benchmarks.loadtest --duration 30 --users 16
+    python -m benchmarks.loadtest --configs gthread:1:2 gevent:4 --ocr-latency-ms 2000 --ocr-cpu-ms 300
+    python -m benchmarks.loadtest --mix upload=1,dashboard=9 --output loadtest.json
+"""
+import argparse
+import importlib.util
+import io
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_ocr import git_commit, percentile
+from benchmarks.synthetic import make_sample
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CONFIGS = ('sync:4', 'gthread:1:2', 'gthread:4:4', 'gevent:4')
+DEFAULT_MIX = 'upload=3,translate=2,generate_pdf=1,dashboard=4'
+ENDPOINTS = ('upload', 'translate', 'generate_pdf', 'dashboard')
+
+
+def parse_config(spec: str) -> Dict:
+    parts = spec.split(':')
+    worker_class = parts[0]
+    if worker_class == 'werkzeug':
+        return {'name': spec, 'worker_class': 'werkzeug', 'workers': 1, 'threads': None}
+    if worker_class not in ('sync', 'gthread', 'gevent'):
+        raise ValueError(f'Unknown worker class: {worker_class}')
+    workers = int(parts[1]) if len(parts) > 1 else 1
+    threads = int(parts[2]) if len(parts) > 2 else (None if worker_class != 'gthread' else 1)
+    return {'name': spec, 'worker_class': worker_class, 'workers': workers, 'threads': threads}
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for item in spec.split(','):
+        name, _, weight = item.partition('=')
+        if name not in ENDPOINTS:
+            raise ValueError(f'Unknown endpoint in mix: {name}')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def missing_server(config: Dict) -> Optional[str]:
+    """Why this configuration cannot run here, or None"""
+    if config['worker_class'] == 'werkzeug':
+        return None
+    if importlib.util.find_spec('gunicorn') is None:
+        return 'gunicorn not installed'
+    if config['worker_class'] == 'gevent' and importlib.util.find_spec('gevent') is None:
+        return 'gevent not installed'
+    return None
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def server_command(config: Dict, port: int, timeout: int) -> List[str]:
+    if config['worker_class'] == 'werkzeug':
+        return [sys.executable, '-m', 'benchmarks.loadtest', '--serve-werkzeug', str(port)]
+    command = [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}',
+               '--worker-class', config['worker_class'], '--workers', str(config['workers']),
+               '--timeout', str(timeout), '--log-level', 'warning']
+    if config['threads']:
+        command += ['--threads', str(config['threads'])]
+    return command + ['benchmarks.loadtest_app:app']
+
+
+def serve_werkzeug(port: int):
+    from werkzeug.serving import make_server
+    from benchmarks.loadtest_app import app
+    make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+def wait_ready(base_url: str, process: subprocess.Popen, timeout: float = 120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'server exited with code {process.returncode}')
+        try:
+            if requests.get(base_url + '/', timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError('server did not become ready')
+
+
+class VirtualUser(threading.Thread):
+    """Logs in, uploads one document, then loops over the endpoint mix until stopped"""
+
+    def __init__(self, base_url: str, args, mix: Dict[str, float], image: bytes,
+                 stop: threading.Event, measuring: threading.Event, seed: int):
+        super().__init__(daemon=True)
+        self.base_url = base_url
+        self.args = args
+        self.mix = mix
+        self.image = image
+        self.stop = stop
+        self.measuring = measuring
+        self.rng = random.Random(seed)
+        self.session = requests.Session()
+        self.document_id = None
+        self.samples: List[tuple] = []  # (endpoint, latency_ms, ok, status)
+
+    def _request(self, endpoint: str):
+        timeout = self.args.request_timeout
+        if endpoint == 'upload':
+            response = self.session.post(self.base_url + '/upload', timeout=timeout,
+                                         files={'file': ('page.png', self.image, 'image/png')})
+            if response.ok:
+                self.document_id = response.json().get('document_id', self.document_id)
+        elif endpoint == 'translate':
+            response = self.session.post(self.base_url + '/translate', timeout=timeout, json={
+                'document_id': self.document_id, 'source_language': 'en', 'target_language': 'es'})
+        elif endpoint == 'generate_pdf':
+            response = self.session.get(f'{self.base_url}/generate_pdf/{self.document_id}', timeout=timeout)
+        else:
+            response = self.session.get(self.base_url + '/dashboard', timeout=timeout, allow_redirects=False)
+        return response
+
+    def run(self):
+        try:
+            self.session.post(self.base_url + '/login', timeout=self.args.request_timeout,
+                              data={'email': self.args.user_email, 'password': self.args.user_password})
+            self._request('upload')
+        except requests.RequestException:
+            pass
+
+        endpoints, weights = list(self.mix), list(self.mix.values())
+        while not self.stop.is_set():
+            endpoint = self.rng.choices(endpoints, weights)[0]
+            if endpoint in ('translate', 'generate_pdf') and self.document_id is None:
+                endpoint = 'upload'
+            started = time.perf_counter()
+            try:
+                response = self._request(endpoint)
+                ok, status = response.status_code < 400, response.status_code
+            except requests.RequestException as e:
+                ok, status = False, type(e).__name__
+            if self.measuring.is_set():
+                self.samples.append((endpoint, (time.perf_counter() - started) * 1000, ok, status))
+            if self.args.think_ms:
+                time.sleep(self.args.think_ms / 1000)
+
+
+def summarize(samples: List[tuple], seconds: float) -> Dict:
+    latencies = [latency for _, latency, _, _ in samples]
+    errors = sum(1 for _, _, ok, _ in samples if not ok)
+    statuses = {}
+    for _, _, _, status in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        'requests': len(samples),
+        'throughput_rps': round(len(samples) / seconds, 2) if seconds else 0.0,
+        'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50), 1),
+        'p95_ms': round(percentile(latencies, 0.95), 1),
+        'p99_ms': round(percentile(latencies, 0.99), 1),
+        'max_ms': round(max(latencies), 1) if latencies else 0.0,
+        'statuses': statuses,
+    }
+
+
+def run_config(config: Dict, args, mix: Dict[str, float], image: bytes, env: Dict) -> Dict:
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    log = tempfile.TemporaryFile()
+    process = subprocess.Popen(server_command(config, port, args.server_timeout), cwd=ROOT, env=env,
+                               stdout=log, stderr=subprocess.STDOUT)
+    try:
+        wait_ready(base_url, process)
+
+        stop, measuring = threading.Event(), threading.Event()
+        users = [VirtualUser(base_url, args, mix, image, stop, measuring, seed=i) for i in range(args.users)]
+        for user in users:
+            user.start()
+        time.sleep(args.warmup)
+        measuring.set()
+        started = time.perf_counter()
+        time.sleep(args.duration)
+        measuring.clear()
+        seconds = time.perf_counter() - started
+        stop.set()
+        for user in users:
+            user.join(timeout=args.request_timeout + 5)
+
+        samples = [sample for user in users for sample in user.samples]
+        report = summarize(samples, seconds)
+        report['endpoints'] = {
+            endpoint: summarize([s for s in samples if s[0] == endpoint], seconds)
+            for endpoint in ENDPOINTS if any(s[0] == endpoint for s in samples)
+        }
+        report.update({key: config[key] for key in ('worker_class', 'workers', 'threads')})
+        return report
+    except RuntimeError as e:
+        log.seek(0)
+        return {'failed': str(e), 'server_log': log.read().decode(errors='replace')[-2000:]}
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        log.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--configs', nargs='+', default=list(DEFAULT_CONFIGS),
+                        help='worker_class:workers[:threads] or werkzeug')
+    parser.add_argument('--users', type=int, default=16, help='Concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=30, help='Measured seconds per configuration')
+    parser.add_argument('--warmup', type=float, default=5, help='Unmeasured seconds before each run')
+    parser.add_argument('--think-ms', type=float, default=0, help='Pause between a user\'s requests')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='Endpoint weights')
+    parser.add_argument('--ocr-latency-ms', type=float, default=500)
+    parser.add_argument('--ocr-cpu-ms', type=float, default=100)
+    parser.add_argument('--translate-latency-ms', type=float, default=800)
+    parser.add_argument('--translate-cpu-ms', type=float, default=10)
+    parser.add_argument('--jitter', type=float, default=0.2)
+    parser.add_argument('--request-timeout', type=float, default=60)
+    parser.add_argument('--server-timeout', type=int, default=120, help='gunicorn --timeout')
+    parser.add_argument('--user-email', default='loadtest@example.com')
+    parser.add_argument('--user-password', default='loadtest')
+    parser.add_argument('--output', default='loadtest.json', help='JSON report path')
+    parser.add_argument('--serve-werkzeug', type=int, metavar='PORT', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_werkzeug:
+        serve_werkzeug(args.serve_werkzeug)
+        return
+
+    configs = [parse_config(spec) for spec in args.configs]
+    mix = parse_mix(args.mix)
+    buffer = io.BytesIO()
+    make_sample('printed-medium', random.Random(0), 0)['image'].save(buffer, 'PNG')
+    image = buffer.getvalue()
+
+    data_dir = tempfile.mkdtemp(prefix='loadtest_')
+    env = dict(os.environ,
+               LOADTEST_DATA_DIR=data_dir,
+               LOADTEST_USER_EMAIL=args.user_email,
+               LOADTEST_USER_PASSWORD=args.user_password,
+               LOADTEST_OCR_LATENCY_MS=str(args.ocr_latency_ms),
+               LOADTEST_OCR_CPU_MS=str(args.ocr_cpu_ms),
+               LOADTEST_TRANSLATE_LATENCY_MS=str(args.translate_latency_ms),
+               LOADTEST_TRANSLATE_CPU_MS=str(args.translate_cpu_ms),
+               LOADTEST_JITTER=str(args.jitter))
+    # Create the database and user once, so workers don't race on create_all()
+    subprocess.run([sys.executable, '-c', 'import benchmarks.loadtest_app'], cwd=ROOT, env=env,
+                   check=True, capture_output=True)
+
+    results = {}
+    try:
+        for config in configs:
+            reason = missing_server(config)
+            if reason:
+                print(f"[SKIP] {config['name']}: {reason}")
+                results[config['name']] = {'skipped': reason}
+                continue
+            print(f"[RUN] {config['name']}: {args.users} users for {args.duration:.0f}s...")
+            results[config['name']] = run_config(config, args, mix, image, env)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'users': args.users,
+            'duration': args.duration,
+            'mix': mix,
+            'engines': {
+                'ocr_latency_ms': args.ocr_latency_ms, 'ocr_cpu_ms': args.ocr_cpu_ms,
+                'translate_latency_ms': args.translate_latency_ms, 'translate_cpu_ms': args.translate_cpu_ms,
+                'jitter': args.jitter,
+            },
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    print("\n" + "=" * 78)
+    print(f"{'config':16} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}")
+    for name, result in results.items():
+        if 'skipped' in result or 'failed' in result:
+            print(f"{name:16} {result.get('skipped') or 'failed: ' + result['failed']}")
+            continue
+        print(f"{name:16} {result['throughput_rps']:8.2f} {result['p50_ms']:9.1f} {result['p95_ms']:9.1f} "
+              f"{result['p99_ms']:9.1f} {result['error_rate']:8.2%}")
+        for endpoint, stats in result['endpoints'].items():
+            print(f"  {endpoint:14} {stats['throughput_rps']:8.2f} {stats['p50_ms']:9.1f} "
+                  f"{stats['p95_ms']:9.1f} {stats['p99_ms']:9.1f} {stats['error_rate']:8.2%}")
+    print("=" * 78)
+    print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+WSGI app for load tests: create_app() with stub engines
+
+    gunicorn -k gthread -w 2 --threads 4 benchmarks.loadtest_app:app
+
+Engines are configured from the environment (milliseconds):
+
+    LOADTEST_OCR_LATENCY_MS (500)   LOADTEST_OCR_CPU_MS (100)
+    LOADTEST_TRANSLATE_LATENCY_MS (800)   LOADTEST_TRANSLATE_CPU_MS (10)
+    LOADTEST_JITTER (0.2)
+
+LOADTEST_DATA_DIR (required) holds the SQLite database and uploads, so
+runs never touch the real database. The load-test user
+(LOADTEST_USER_EMAIL / LOADTEST_USER_PASSWORD) is created if missing.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DATA_DIR = os.path.abspath(os.environ['LOADTEST_DATA_DIR'])
+os.makedirs(DATA_DIR, exist_ok=True)
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(DATA_DIR, 'loadtest.db')
+os.environ.setdefault('ADAPTIVE_ROUTING', 'false')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+USER_EMAIL = os.environ.get('LOADTEST_USER_EMAIL', 'loadtest@example.com')
+USER_PASSWORD = os.environ.get('LOADTEST_USER_PASSWORD', 'loadtest')
+
+import main as main_module
+from app import create_app
+from benchmarks.fake_engines import FakeOCRProcessor, FakeTranslator
+from config import Config
+from models import db, User
+
+Config.UPLOAD_FOLDER = os.path.join(DATA_DIR, 'uploads')
+
+
+def _env_ms(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
+
+
+main_module.configure_engines(
+    ocr=FakeOCRProcessor(latency_ms=_env_ms('LOADTEST_OCR_LATENCY_MS', 500),
+                         cpu_ms=_env_ms('LOADTEST_OCR_CPU_MS', 100),
+                         jitter=_env_ms('LOADTEST_JITTER', 0.2)),
+    translation=FakeTranslator(latency_ms=_env_ms('LOADTEST_TRANSLATE_LATENCY_MS', 800),
+                               cpu_ms=_env_ms('LOADTEST_TRANSLATE_CPU_MS', 10),
+                               jitter=_env_ms('LOADTEST_JITTER', 0.2)),
+)
+
+app = create_app()
+
+with app.app_context():
+    if not User.query.filter_by(email=USER_EMAIL).first():
+        user = User(email=USER_EMAIL, username='loadtest')
+        user.set_password(USER_PASSWORD)
+        db.session.add(user)
+        try:
+            db.session.commit()
+        except Exception:
+            # Another worker created it first
+            db.session.rollback()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the text and image hot functions of AdvancedOCRProcessor
+
+Each benchmark has a stored baseline (benchmarks/microbench_baseline.json)
+and fails when it runs slower than baseline x threshold. Baselines are
+scaled by a small pure-Python calibration loop measured alongside them,
+so a slower or faster machine does not trip the threshold on its own.
+
+Inputs: 100 KB OCR-like texts (three engines' worth for voting/selection)
+and a 1 MP photo-style page image. The image is kept small enough that each
+image benchmark runs several times in a few seconds; best-of-N over several
+runs is what makes the threshold meaningful.
+
+Usage:
+    python -m benchmarks.microbench                    # compare with baseline, exit 1 on regression
+    python -m benchmarks.microbench --only text        # benchmarks whose name contains 'text'
+    python -m benchmarks.microbench --update-baseline  # record new baseline numbers
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import WORDS, make_sample
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'microbench_baseline.json')
+DEFAULT_THRESHOLD = 1.5
+
+TEXT_BYTES = 100_000
+IMAGE_SIZE = (1224, 816)  # 1 MP
+
+
+def ocr_like_text(size: int, seed: int) -> str:
+    """Text shaped like raw OCR output: line breaks, stray punctuation, ALL-CAPS words, pipes"""
+    rng = random.Random(seed)
+    words, total = [], 0
+    while total < size:
+        word = rng.choice(WORDS)
+        roll = rng.random()
+        if roll < 0.05:
+            word = word.upper()
+        elif roll < 0.08:
+            word += '|'
+        elif roll < 0.18:
+            word += rng.choice('.,;:')
+        if rng.random() < 0.03:
+            word = f'{rng.randint(0, 9999)}'
+        words.append(word)
+        total += len(word) + 1
+        if rng.random() < 0.08:
+            words.append('\n')
+    return ' '.join(words)[:size]
+
+
+def calibrate() -> float:
+    """Fixed pure-Python workload (ms) used to scale baselines across machines"""
+    def workload():
+        data = [((i * 7919) % 10007) for i in range(200_000)]
+        data.sort()
+        return sum(x & 0xff for x in data) + len(' '.join(str(x) for x in data[:50_000]).split())
+    return measure(workload, repeat=5)
+
+
+def measure(fn: Callable, repeat: int) -> float:
+    """Best-of-`repeat` wall time in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return best
+
+
+def build_benchmarks(processor, workdir: str) -> List[Tuple[str, Callable, int]]:
+    """(name, zero-argument callable, repeat) for every benchmark"""
+    texts = [ocr_like_text(TEXT_BYTES, seed) for seed in range(3)]
+    results = [('easyocr', texts[0], 0.82), ('paddle', texts[1], 0.74), ('tesseract', texts[2], 0.61)]
+
+    image_path = os.path.join(workdir, 'page_1mp.png')
+    make_sample('photo', random.Random(0), 0)['image'].resize(IMAGE_SIZE).save(image_path)
+
+    return [
+        ('text.aggressive_text_cleanup', lambda: processor.aggressive_text_cleanup(texts[0]), 5),
+        ('text.post_process_text', lambda: processor.post_process_text(texts[0]), 5),
+        ('text.detect_text_quality', lambda: processor.detect_text_quality(texts[0]), 5),
+        ('text.word_level_voting', lambda: processor.word_level_voting(results), 5),
+        ('text.select_best_result', lambda: processor._select_best_result(results), 5),
+        ('image.detect_handwriting', lambda: processor.detect_handwriting(image_path), 5),
+        ('image.preprocess_for_printed', lambda: processor.preprocess_for_printed(image_path), 3),
+        ('image.preprocess_for_handwriting', lambda: processor.preprocess_for_handwriting(image_path), 3),
+    ]
+
+
+def load_baseline() -> Dict:
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', help='Run benchmarks whose name contains this string')
+    parser.add_argument('--update-baseline', action='store_true', help='Write current numbers as the baseline')
+    parser.add_argument('--threshold', type=float, help='Override every per-benchmark threshold')
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    from utils.advanced_ocr_processor import AdvancedOCRProcessor
+    processor = AdvancedOCRProcessor()
+
+    baseline = load_baseline()
+    calibration_ms = calibrate()
+    baseline_calibration = baseline.get('calibration_ms') or calibration_ms
+    speed_factor = calibration_ms / baseline_calibration
+
+    report, regressions = {}, []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, fn, repeat in build_benchmarks(processor, workdir):
+            if args.only and args.only not in name:
+                continue
+            if repeat > 1:
+                fn()  # warm-up (imports, regex compilation, allocator)
+            current_ms = measure(fn, repeat)
+
+            entry = baseline.get('benchmarks', {}).get(name)
+            result = {'ms': round(current_ms, 2)}
+            if entry:
+                threshold = args.threshold or entry.get('threshold', DEFAULT_THRESHOLD)
+                allowed_ms = entry['ms'] * speed_factor * threshold
+                result.update({
+                    'baseline_ms': round(entry['ms'] * speed_factor, 2),
+                    'allowed_ms': round(allowed_ms, 2),
+                    'ratio': round(current_ms / (entry['ms'] * speed_factor), 3),
+                    'passed': current_ms <= allowed_ms,
+                })
+                if not result['passed']:
+                    regressions.append(name)
+            report[name] = result
+
+            status = ('PASS' if result['passed'] else 'FAIL') if 'passed' in result else 'NEW '
+            detail = f"(baseline {result['baseline_ms']:.1f} ms, x{result['ratio']:.2f})" if entry else ''
+            print(f"[{status}] {name:36} {current_ms:10.1f} ms {detail}")
+
+    print(f"\nCalibration: {calibration_ms:.1f} ms (baseline {baseline_calibration:.1f} ms, "
+          f"speed factor {speed_factor:.2f})")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'calibration_ms': calibration_ms, 'benchmarks': report}, f, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        benchmarks = dict(baseline.get('benchmarks', {}))
+        for name, result in report.items():
+            threshold = benchmarks.get(name, {}).get('threshold', DEFAULT_THRESHOLD)
+            # Store at the baseline machine's speed so the calibration stays consistent
+            benchmarks[name] = {'ms': round(result['ms'] / speed_factor, 2), 'threshold': threshold}
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump({'calibration_ms': round(baseline_calibration, 2), 'benchmarks': benchmarks},
+                      f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline written to {BASELINE_PATH}")
+        return
+
+    if regressions:
+        print(f"\nRegressions: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
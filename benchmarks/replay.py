@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Replay a captured workload against a running instance and compare builds
+
+Capture (on the server):  CAPTURE_DIR=/var/capture CAPTURE_INPUTS=true gunicorn ...
+records /upload and /translate requests, plain or streamed (see
+utils/workload_capture.py).
+
+Replay re-sends them to --target in arrival order, at the original pace
+(--speed 1), accelerated (--speed 4) or as fast as --concurrency allows
+(--speed 0). /translate requests are pointed at the document their
+captured upload created on the target. Uploads whose file was not stored
+(CAPTURE_INPUTS off) are skipped unless --synthetic-inputs sends a
+synthetic page instead.
+
+The report has per-endpoint latency distributions of the replay, of the
+original capture, and per-stage p50 from the responses' timings.
+
+Usage:
+    python -m benchmarks.replay run --capture /var/capture --target http://127.0.0.1:5000 \\
+        --user-email me@example.com --password secret --label build-a --output a.json
+    python -m benchmarks.replay compare a.json b.json
+"""
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_ocr import git_commit, percentile
+from benchmarks.synthetic import make_sample
+from utils.workload_capture import blob_path, load_capture
+
+ENDPOINT_PATHS = {'main.upload_file': '/upload', 'main.upload_file_stream': '/upload/stream',
+                  'main.translate': '/translate', 'main.translate_stream': '/translate/stream'}
+UPLOAD_ENDPOINTS = ('main.upload_file', 'main.upload_file_stream')
+
+
+def final_event(text: str):
+    """(event, data) of the last message in a Server-Sent Events body"""
+    messages = text.strip().split('\n\n')
+    fields = dict(line.split(': ', 1) for line in messages[-1].splitlines() if ': ' in line)
+    return fields.get('event'), json.loads(fields.get('data') or '{}')
+
+
+def distribution(latencies: List[float]) -> Dict:
+    if not latencies:
+        return {'count': 0}
+    return {
+        'count': len(latencies),
+        'mean_ms': round(sum(latencies) / len(latencies), 1),
+        'p50_ms': round(percentile(latencies, 0.50), 1),
+        'p90_ms': round(percentile(latencies, 0.90), 1),
+        'p95_ms': round(percentile(latencies, 0.95), 1),
+        'p99_ms': round(percentile(latencies, 0.99), 1),
+        'max_ms': round(max(latencies), 1),
+    }
+
+
+class Replayer:
+    """Re-sends captured requests on a schedule; one logged-in session per worker thread"""
+
+    def __init__(self, args, entries: List[Dict]):
+        self.args = args
+        self.entries = entries
+        self.local = threading.local()
+        self.uploads: Dict[int, Future] = {}  # captured document id -> future of replayed id
+        self.fallback_document: Optional[Future] = None
+        self.results: List[Dict] = []
+        self.skipped: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        self._synthetic = None
+
+    def session(self) -> requests.Session:
+        if not hasattr(self.local, 'session'):
+            session = requests.Session()
+            session.post(self.args.target + '/login', timeout=self.args.timeout,
+                         data={'email': self.args.user_email, 'password': self.args.password})
+            self.local.session = session
+        return self.local.session
+
+    def _skip(self, reason: str):
+        with self.lock:
+            self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+    def _upload_body(self, entry: Dict):
+        path = blob_path(self.args.capture, entry['content_sha256']) if entry.get('content_sha256') else None
+        if path:
+            with open(path, 'rb') as f:
+                name = entry.get('filename') or 'upload' + (entry.get('filename_ext') or '.png')
+                return name, f.read(), entry.get('content_type')
+        if not self.args.synthetic_inputs:
+            return None
+        if self._synthetic is None:
+            buffer = io.BytesIO()
+            make_sample('printed-medium', random.Random(0), 0)['image'].save(buffer, 'PNG')
+            self._synthetic = buffer.getvalue()
+        return 'synthetic.png', self._synthetic, 'image/png'
+
+    def _send(self, entry: Dict, method: str, **kwargs) -> Optional[Dict]:
+        url = self.args.target + ENDPOINT_PATHS[entry['endpoint']]
+        session = self.session()  # logging in is not billed to the request
+        started = time.perf_counter()
+        try:
+            response = session.request(method, url, timeout=self.args.timeout, **kwargs)
+            status = response.status_code
+            content_type = response.headers.get('Content-Type', '')
+            if 'event-stream' in content_type:
+                event, body = final_event(response.text)  # the stream ends with result or error
+                if event != 'result':
+                    status = f'stream_{event}'
+            else:
+                body = response.json() if 'json' in content_type else {}
+        except (requests.RequestException, ValueError) as e:
+            status, body = type(e).__name__, {}
+        latency_ms = (time.perf_counter() - started) * 1000
+        with self.lock:
+            self.results.append({
+                'endpoint': entry['endpoint'],
+                'latency_ms': latency_ms,
+                'lag_ms': (started - entry['_due']) * 1000,
+                'status': status,
+                'ok': isinstance(status, int) and status < 400,
+                'timings': body.get('timings') if isinstance(body, dict) else None,
+            })
+        return body if isinstance(body, dict) else {}
+
+    def upload(self, entry: Dict) -> Optional[int]:
+        upload_body = self._upload_body(entry)
+        if upload_body is None:
+            self._skip('upload_input_not_stored')
+            return None
+        body = self._send(entry, 'POST', files={'file': upload_body}, data=entry.get('params') or {})
+        return body.get('document_id')
+
+    def translate(self, entry: Dict):
+        source = self.uploads.get(entry.get('document_id')) or self.fallback_document
+        document_id = source.result() if source is not None else None
+        if document_id is None:
+            self._skip('translate_document_unavailable')
+            return
+        self._send(entry, 'POST', json=dict(entry.get('params') or {}, document_id=document_id))
+
+    def run(self) -> float:
+        speed = self.args.speed
+        first_ts = self.entries[0]['ts']
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.args.concurrency) as pool:
+            for entry in self.entries:
+                entry['_due'] = started + ((entry['ts'] - first_ts) / speed if speed > 0 else 0)
+                delay = entry['_due'] - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                if entry['endpoint'] in UPLOAD_ENDPOINTS:
+                    future = pool.submit(self.upload, entry)
+                    if entry.get('document_id') is not None:
+                        self.uploads[entry['document_id']] = future
+                    if self.fallback_document is None:
+                        self.fallback_document = future
+                else:
+                    pool.submit(self.translate, entry)
+        return time.perf_counter() - started
+
+
+def stage_p50(results: List[Dict]) -> Dict[str, float]:
+    stages: Dict[str, List[float]] = {}
+    for result in results:
+        for stage, ms in (result.get('timings') or {}).items():
+            stages.setdefault(stage, []).append(ms)
+    return {stage: round(percentile(values, 0.5), 1) for stage, values in sorted(stages.items())}
+
+
+def run(args):
+    entries = [entry for entry in load_capture(args.capture) if entry.get('endpoint') in ENDPOINT_PATHS]
+    if args.limit:
+        entries = entries[:args.limit]
+    if not entries:
+        print(f"No /upload or /translate records in {args.capture}")
+        sys.exit(1)
+
+    print(f"[RUN] Replaying {len(entries)} requests against {args.target} "
+          f"(speed {args.speed or 'max'}, concurrency {args.concurrency})...")
+    replayer = Replayer(args, entries)
+    wall_seconds = replayer.run()
+
+    report = {'meta': {
+        'label': args.label,
+        'commit': git_commit(),
+        'target': args.target,
+        'speed': args.speed,
+        'concurrency': args.concurrency,
+        'requests': len(entries),
+        'captured_seconds': round(entries[-1]['ts'] - entries[0]['ts'], 2),
+        'wall_seconds': round(wall_seconds, 2),
+        'skipped': replayer.skipped,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+    }, 'endpoints': {}}
+    for endpoint in ENDPOINT_PATHS:
+        results = [result for result in replayer.results if result['endpoint'] == endpoint]
+        captured = [entry['duration_ms'] for entry in entries
+                    if entry['endpoint'] == endpoint and entry.get('duration_ms') is not None]
+        statuses = {}
+        for result in results:
+            statuses[str(result['status'])] = statuses.get(str(result['status']), 0) + 1
+        report['endpoints'][endpoint] = {
+            'replay': distribution([result['latency_ms'] for result in results]),
+            'captured': distribution(captured),
+            'error_rate': round(sum(not r['ok'] for r in results) / len(results), 4) if results else 0.0,
+            'statuses': statuses,
+            'schedule_lag_p95_ms': round(percentile([max(r['lag_ms'], 0) for r in results], 0.95), 1),
+            'stage_p50_ms': stage_p50(results),
+        }
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    print("\n" + "=" * 80)
+    print(f"{'endpoint':24} {'':9} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}")
+    for endpoint, stats in report['endpoints'].items():
+        for source in ('captured', 'replay'):
+            dist = stats[source]
+            if not dist['count']:
+                continue
+            errors = f"{stats['error_rate']:8.2%}" if source == 'replay' else ''
+            print(f"{endpoint:24} {source:9} {dist['count']:6d} {dist['p50_ms']:9.1f} "
+                  f"{dist['p95_ms']:9.1f} {dist['p99_ms']:9.1f} {errors:>8}")
+    print("=" * 78)
+    if replayer.skipped:
+        print(f"Skipped: {replayer.skipped}")
+    print(f"Report written to {args.output}")
+
+
+def _delta(a: float, b: float) -> str:
+    if not a:
+        return '-'
+    return f"{(b - a) / a:+.1%}"
+
+
+def compare(args):
+    with open(args.a) as f:
+        a = json.load(f)
+    with open(args.b) as f:
+        b = json.load(f)
+    label_a = a['meta'].get('label') or a['meta'].get('commit') or 'A'
+    label_b = b['meta'].get('label') or b['meta'].get('commit') or 'B'
+
+    print(f"A = {label_a}    B = {label_b}")
+    print("=" * 78)
+    print(f"{'endpoint / stage':34} {'metric':7} {'A ms':>10} {'B ms':>10} {'change':>9}")
+    for endpoint in sorted(set(a['endpoints']) & set(b['endpoints'])):
+        stats_a, stats_b = a['endpoints'][endpoint], b['endpoints'][endpoint]
+        if not stats_a['replay']['count'] or not stats_b['replay']['count']:
+            continue
+        for metric in ('p50_ms', 'p90_ms', 'p95_ms', 'p99_ms'):
+            value_a, value_b = stats_a['replay'][metric], stats_b['replay'][metric]
+            print(f"{endpoint:34} {metric[:-3]:7} {value_a:10.1f} {value_b:10.1f} {_delta(value_a, value_b):>9}")
+        print(f"{endpoint:34} {'errors':7} {stats_a['error_rate']:10.2%} {stats_b['error_rate']:10.2%}")
+        stages_a, stages_b = stats_a.get('stage_p50_ms', {}), stats_b.get('stage_p50_ms', {})
+        for stage in sorted(set(stages_a) & set(stages_b)):
+            print(f"  {stage:32} {'p50':7} {stages_a[stage]:10.1f} {stages_b[stage]:10.1f} "
+                  f"{_delta(stages_a[stage], stages_b[stage]):>9}")
+    print("=" * 78)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Replay a capture directory')
+    run_parser.add_argument('--capture', required=True, help='CAPTURE_DIR of the recording server')
+    run_parser.add_argument('--target', default='http://127.0.0.1:5000')
+    run_parser.add_argument('--user-email', required=True, help='Account on the target to replay as')
+    run_parser.add_argument('--password', required=True)
+    run_parser.add_argument('--speed', type=float, default=1.0, help='Pace multiplier; 0 = as fast as possible')
+    run_parser.add_argument('--concurrency', type=int, default=16, help='Max requests in flight')
+    run_parser.add_argument('--limit', type=int, help='Replay only the first N requests')
+    run_parser.add_argument('--synthetic-inputs', action='store_true',
+                            help='Send a synthetic page for uploads whose file was not captured')
+    run_parser.add_argument('--timeout', type=float, default=300)
+    run_parser.add_argument('--label', help='Name of this build in reports')
+    run_parser.add_argument('--output', default='replay.json', help='JSON report path')
+
+    compare_parser = commands.add_parser('compare', help='Compare two replay reports')
+    compare_parser.add_argument('a', help='Report of build A')
+    compare_parser.add_argument('b', help='Report of build B')
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        args.target = args.target.rstrip('/')
+        run(args)
+    else:
+        compare(args)
+
+
+if __name__ == '__main__':
+    main()
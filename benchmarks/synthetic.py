@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Reproducible synthetic document corpus for OCR benchmarks
+
+Every image is rendered with PIL from a seeded random generator, and its
+ground-truth text is stored next to it in manifest.json. Kinds:
+
+    printed-small / printed-medium / printed-large   clean text at 16/28/44 px
+    noisy      gaussian noise, blur and low contrast
+    rotated    small skew (3-8 degrees either way)
+    photo      large (12 MP) "phone photo": page on a background, with
+               margins, uneven lighting and slight rotation
+
+Usage:
+    python -m benchmarks.synthetic --output /tmp/corpus --per-kind 5
+"""
+import argparse
+import json
+import os
+import random
+from typing import Dict, List, Optional
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+KINDS = ('printed-small', 'printed-medium', 'printed-large', 'noisy', 'rotated', 'photo')
+
+WORDS = ['invoice', 'total', 'balance', 'payment', 'received', 'keep', 'the',
+         'thank', 'you', 'for', 'your', 'business', 'date', 'amount', 'due',
+         'account', 'number', 'customer', 'order', 'shipping', 'address', 'tax',
+         'subtotal', 'quantity', 'price', 'description', 'reference', 'signature']
+
+FONT_FILES = ('DejaVuSans.ttf', 'DejaVuSerif.ttf', 'DejaVuSansMono.ttf')
+FONT_DIRS = ('/usr/share/fonts/truetype/dejavu', '/usr/share/fonts/dejavu',
+             '/Library/Fonts', 'C:\\Windows\\Fonts')
+
+
+def load_font(size: int, index: int = 0):
+    """A TrueType font at `size` px; Pillow's bundled font if none is installed"""
+    name = FONT_FILES[index % len(FONT_FILES)]
+    for directory in ('',) + FONT_DIRS:
+        try:
+            return ImageFont.truetype(os.path.join(directory, name), size), name
+        except OSError:
+            continue
+    return ImageFont.load_default(size), 'pillow-default'
+
+
+def random_lines(rng: random.Random, lines: int, words_per_line: int) -> List[str]:
+    result = []
+    for _ in range(lines):
+        words = [rng.choice(WORDS) for _ in range(words_per_line)]
+        if rng.random() < 0.3:
+            words.append(f'{rng.randint(1, 9999)}.{rng.randint(0, 99):02d}')
+        result.append(' '.join(words))
+    return result
+
+
+def render_page(lines: List[str], font, width: int, margin: int = 40, spacing: float = 1.6) -> Image.Image:
+    line_height = int(font.size * spacing)
+    height = margin * 2 + line_height * len(lines)
+    page = Image.new('L', (width, height), 255)
+    draw = ImageDraw.Draw(page)
+    for i, line in enumerate(lines):
+        draw.text((margin, margin + i * line_height), line, fill=0, font=font)
+    return page
+
+
+def _add_noise(image: Image.Image, rng: random.Random, sigma: float) -> Image.Image:
+    noise_rng = np.random.default_rng(rng.randint(0, 2 ** 31))
+    arr = np.asarray(image, dtype=np.float32)
+    arr = arr + noise_rng.normal(0, sigma, arr.shape)
+    return Image.fromarray(np.clip(arr, 0, 255).astype(np.uint8))
+
+
+def make_sample(kind: str, rng: random.Random, index: int) -> Dict:
+    """Render one sample of `kind`; returns {'image', 'text', 'font'}"""
+    if kind.startswith('printed-'):
+        size = {'printed-small': 16, 'printed-medium': 28, 'printed-large': 44}[kind]
+        font, font_name = load_font(size, index)
+        lines = random_lines(rng, rng.randint(3, 6), rng.randint(4, 8))
+        image = render_page(lines, font, width=size * 30)
+
+    elif kind == 'noisy':
+        font, font_name = load_font(28, index)
+        lines = random_lines(rng, rng.randint(3, 5), rng.randint(4, 7))
+        image = render_page(lines, font, width=900)
+        # Low contrast (grey ink on off-white paper), blur and sensor noise
+        image = image.point(lambda v: 70 + v * 0.6)
+        image = image.filter(ImageFilter.GaussianBlur(radius=rng.uniform(0.6, 1.2)))
+        image = _add_noise(image, rng, sigma=rng.uniform(12, 22))
+
+    elif kind == 'rotated':
+        font, font_name = load_font(28, index)
+        lines = random_lines(rng, rng.randint(3, 5), rng.randint(4, 7))
+        image = render_page(lines, font, width=900, margin=80)
+        angle = rng.choice([-1, 1]) * rng.uniform(3, 8)
+        image = image.rotate(angle, resample=Image.Resampling.BICUBIC, expand=True, fillcolor=255)
+
+    elif kind == 'photo':
+        font, font_name = load_font(64, index)
+        lines = random_lines(rng, rng.randint(8, 12), rng.randint(4, 7))
+        page = render_page(lines, font, width=2400, margin=160)
+        page = page.rotate(rng.uniform(-2, 2), resample=Image.Resampling.BICUBIC, expand=True, fillcolor=235)
+        # 3000x4000 background (a desk), page placed off-centre with margins
+        image = Image.new('L', (3000, 4000), rng.randint(60, 110))
+        x = rng.randint(100, max(101, 3000 - page.width - 100))
+        y = rng.randint(150, max(151, 4000 - page.height - 150))
+        image.paste(page, (x, y))
+        # Uneven lighting: horizontal brightness gradient
+        gradient = np.linspace(rng.uniform(0.75, 0.9), 1.0, image.width, dtype=np.float32)
+        if rng.random() < 0.5:
+            gradient = gradient[::-1]
+        arr = np.asarray(image, dtype=np.float32) * gradient[np.newaxis, :]
+        image = _add_noise(Image.fromarray(arr.astype(np.uint8)), rng, sigma=4)
+
+    else:
+        raise ValueError(f'Unknown kind: {kind}')
+
+    return {'image': image.convert('RGB'), 'text': '\n'.join(lines), 'font': font_name}
+
+
+def generate_corpus(directory: str, per_kind: int = 3, seed: int = 0,
+                    kinds: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Write the corpus to `directory` (PNG per sample plus manifest.json) and
+    return the manifest entries: {'path', 'kind', 'text', 'font', 'width', 'height'}
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    entries = []
+    for kind in kinds or KINDS:
+        for i in range(per_kind):
+            sample = make_sample(kind, rng, i)
+            path = os.path.join(directory, f'{kind}_{i:03d}.png')
+            sample['image'].save(path)
+            entries.append({
+                'path': path,
+                'kind': kind,
+                'text': sample['text'],
+                'font': sample['font'],
+                'width': sample['image'].width,
+                'height': sample['image'].height,
+            })
+    with open(os.path.join(directory, 'manifest.json'), 'w') as f:
+        json.dump({'seed': seed, 'per_kind': per_kind, 'samples': entries}, f, indent=2)
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', required=True, help='Directory to write the corpus to')
+    parser.add_argument('--per-kind', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--kinds', nargs='+', choices=KINDS)
+    args = parser.parse_args()
+
+    entries = generate_corpus(args.output, args.per_kind, args.seed, args.kinds)
+    print(f"Wrote {len(entries)} images to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
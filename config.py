@@ -1,11 +1,13 @@
 import os
 import platform
+from functools import lru_cache
 from dotenv import load_dotenv
 
 load_dotenv()
 
+@lru_cache(maxsize=None)
 def get_tesseract_path():
-    """Auto-detect Tesseract path based on operating system"""
+    """Auto-detect Tesseract path based on operating system (probed once, on first use)"""
     system = platform.system().lower()
     
     if system == 'windows':
@@ -58,10 +60,153 @@ class Config:
     
     # Translation API
     GROQ_API_KEY = os.environ.get('GROQ_API_KEY')
+    # Free fallback providers. Nothing is probed at startup: a background
+    # checker marks them up/down every TRANSLATION_HEALTH_INTERVAL seconds
+    # once translation is first used, and providers marked down are skipped.
+    LIBRETRANSLATE_ENDPOINTS = [e.strip() for e in os.environ.get(
+        'LIBRETRANSLATE_ENDPOINTS',
+        'https://libretranslate.de,https://translate.argosopentech.com,https://libretranslate.com'
+    ).split(',') if e.strip()]
+    MYMEMORY_URL = os.environ.get('MYMEMORY_URL', 'https://mymemory.translated.net')
+    TRANSLATION_HEALTH_INTERVAL = float(os.environ.get('TRANSLATION_HEALTH_INTERVAL', '60'))
+    TRANSLATION_PROBE_TIMEOUT = float(os.environ.get('TRANSLATION_PROBE_TIMEOUT', '3'))
+    TRANSLATION_REQUEST_TIMEOUT = float(os.environ.get('TRANSLATION_REQUEST_TIMEOUT', '5'))  # read timeout
+    # Keep-alive connection pool per provider host; connection errors and
+    # 502/503/504 are retried TRANSLATION_HTTP_RETRIES times with backoff
+    TRANSLATION_CONNECT_TIMEOUT = float(os.environ.get('TRANSLATION_CONNECT_TIMEOUT', '3'))
+    TRANSLATION_HTTP_POOL_SIZE = int(os.environ.get('TRANSLATION_HTTP_POOL_SIZE', '10'))
+    TRANSLATION_HTTP_RETRIES = int(os.environ.get('TRANSLATION_HTTP_RETRIES', '1'))
+    TRANSLATION_HTTP_BACKOFF = float(os.environ.get('TRANSLATION_HTTP_BACKOFF', '0.2'))
+    # Circuit breaker per provider: opens when TRANSLATION_BREAKER_FAILURE_RATE
+    # of its last TRANSLATION_BREAKER_WINDOW calls failed or took longer than
+    # TRANSLATION_SLOW_CALL_MS (0 = no limit); one trial call after OPEN_SECONDS
+    TRANSLATION_BREAKER_FAILURE_RATE = float(os.environ.get('TRANSLATION_BREAKER_FAILURE_RATE', '0.5'))
+    TRANSLATION_BREAKER_WINDOW = int(os.environ.get('TRANSLATION_BREAKER_WINDOW', '20'))
+    TRANSLATION_BREAKER_MIN_CALLS = int(os.environ.get('TRANSLATION_BREAKER_MIN_CALLS', '3'))
+    TRANSLATION_BREAKER_OPEN_SECONDS = float(os.environ.get('TRANSLATION_BREAKER_OPEN_SECONDS', '30'))
+    TRANSLATION_SLOW_CALL_MS = float(os.environ.get('TRANSLATION_SLOW_CALL_MS', '8000'))
+    # Hedging across LibreTranslate mirrors: if the best endpoint has not
+    # answered within its p90 latency (TRANSLATION_HEDGE_QUANTILE), also ask
+    # the next one; first good answer wins. TRANSLATION_HEDGE_MAX caps the
+    # extra requests in flight per call (0 = try mirrors one at a time).
+    TRANSLATION_HEDGE_MAX = int(os.environ.get('TRANSLATION_HEDGE_MAX', '1'))
+    TRANSLATION_HEDGE_QUANTILE = float(os.environ.get('TRANSLATION_HEDGE_QUANTILE', '0.9'))
+    TRANSLATION_HEDGE_DEFAULT_DELAY_MS = float(os.environ.get('TRANSLATION_HEDGE_DEFAULT_DELAY_MS', '1000'))
+    TRANSLATION_HEDGE_MIN_DELAY_MS = float(os.environ.get('TRANSLATION_HEDGE_MIN_DELAY_MS', '50'))
+    # Long texts are cut at paragraph/line/sentence boundaries into chunks of
+    # at most TRANSLATION_CHUNK_CHARS characters for each provider and
+    # translated TRANSLATION_CHUNK_WORKERS at a time; failed chunks are
+    # retried TRANSLATION_CHUNK_RETRIES times, then go to the next provider
+    TRANSLATION_CHUNK_CHARS = {k.strip(): int(v) for k, v in (item.split('=') for item in os.environ.get(
+        'TRANSLATION_CHUNK_CHARS', 'groq=3000,libretranslate=2000,mymemory=500,google=4500'
+    ).split(',') if item.strip())}
+    # Groq's max_tokens is sized from the chunk length times the output
+    # tokens per source character of the target language (Devanagari,
+    # Arabic and CJK output costs far more tokens than Latin), capped at
+    # GROQ_MAX_TOKENS; Groq chunks are shrunk so their output fits the cap
+    GROQ_MAX_TOKENS = int(os.environ.get('GROQ_MAX_TOKENS', '8192'))
+    GROQ_TOKENS_PER_CHAR = {k.strip(): float(v) for k, v in (item.split('=') for item in os.environ.get(
+        'GROQ_TOKENS_PER_CHAR', 'default=0.5,hi=1.5,mr=1.5,ar=1.0,ru=0.8,zh=0.8,ja=0.8,ko=0.8'
+    ).split(',') if item.strip())}
+    TRANSLATION_CHUNK_WORKERS = int(os.environ.get('TRANSLATION_CHUNK_WORKERS', '4'))
+    TRANSLATION_CHUNK_RETRIES = int(os.environ.get('TRANSLATION_CHUNK_RETRIES', '1'))
+    # Requests per minute per provider endpoint (per process), in bursts of
+    # up to TRANSLATION_RATE_BURST; calls that would wait longer than
+    # TRANSLATION_REQUEST_TIMEOUT for a slot skip the provider instead
+    TRANSLATION_RATE_LIMITS = {k.strip(): float(v) for k, v in (item.split('=') for item in os.environ.get(
+        'TRANSLATION_RATE_LIMITS', 'groq=30,libretranslate=60,mymemory=60,google=60'
+    ).split(',') if item.strip())}
+    TRANSLATION_RATE_BURST = float(os.environ.get('TRANSLATION_RATE_BURST', '5'))
+    # /translate/batch translates one document into up to this many target
+    # languages at a time
+    TRANSLATION_BATCH_WORKERS = int(os.environ.get('TRANSLATION_BATCH_WORKERS', '4'))
+    # Finished translations are cached in SQLite by (normalized text, language
+    # pair) and served without calling any provider; LRU eviction past the
+    # entry/size limits, entries expire after TTL_DAYS (0 = never)
+    TRANSLATION_CACHE = os.environ.get('TRANSLATION_CACHE', 'true').lower() == 'true'
+    TRANSLATION_CACHE_PATH = os.environ.get('TRANSLATION_CACHE_PATH', 'instance/translation_cache.sqlite3')
+    TRANSLATION_CACHE_MAX_ENTRIES = int(os.environ.get('TRANSLATION_CACHE_MAX_ENTRIES', '10000'))
+    TRANSLATION_CACHE_MAX_MB = float(os.environ.get('TRANSLATION_CACHE_MAX_MB', '50'))
+    TRANSLATION_CACHE_TTL_DAYS = float(os.environ.get('TRANSLATION_CACHE_TTL_DAYS', '30'))
+    # Translation memory: sentences/lines already translated are reused and
+    # only unseen ones are sent to a provider (one batched call per request)
+    TRANSLATION_MEMORY = os.environ.get('TRANSLATION_MEMORY', 'true').lower() == 'true'
+    TRANSLATION_MEMORY_PATH = os.environ.get('TRANSLATION_MEMORY_PATH', 'instance/translation_memory.sqlite3')
+    TRANSLATION_MEMORY_MAX_ENTRIES = int(os.environ.get('TRANSLATION_MEMORY_MAX_ENTRIES', '200000'))
+    TRANSLATION_MEMORY_MAX_MB = float(os.environ.get('TRANSLATION_MEMORY_MAX_MB', '200'))
     
     # OCR Configuration
-    TESSERACT_CMD = os.environ.get('TESSERACT_CMD') or get_tesseract_path()
+    # Tesseract is probed lazily (it runs the binary): use Config.tesseract_cmd()
+    TESSERACT_CMD_OVERRIDE = os.environ.get('TESSERACT_CMD')
+
+    # Micro-batching for neural engines (TrOCR, EasyOCR):
+    # concurrent calls arriving within the window are run as one batch
+    OCR_MICRO_BATCHING = os.environ.get('OCR_MICRO_BATCHING', 'true').lower() == 'true'
+    OCR_BATCH_WINDOW_MS = float(os.environ.get('OCR_BATCH_WINDOW_MS', '10'))
+    OCR_MAX_BATCH_SIZE = int(os.environ.get('OCR_MAX_BATCH_SIZE', '8'))
+    
+    # Async uploads: /upload returns a job id and background workers run OCR.
+    # Clients can also opt in per request with async=true.
+    ASYNC_UPLOADS = os.environ.get('ASYNC_UPLOADS', 'false').lower() == 'true'
+    # 'sqlite' is shared by all worker processes on the host; 'memory' is
+    # per process, so /jobs/<id> polls 404 when they land on another worker
+    JOB_QUEUE_BACKEND = os.environ.get('JOB_QUEUE_BACKEND', 'sqlite')  # 'sqlite' or 'memory'
+    JOB_QUEUE_PATH = os.environ.get('JOB_QUEUE_PATH', 'instance/jobs.sqlite3')
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+    JOB_TTL_SECONDS = float(os.environ.get('JOB_TTL_SECONDS', '3600'))  # finished jobs kept
+    # A running job whose worker stops renewing its lease this long is requeued
+    JOB_LEASE_SECONDS = float(os.environ.get('JOB_LEASE_SECONDS', '300'))
+    
+    # Two-phase uploads: return a fast Tesseract preview on a downscaled
+    # image, then upgrade the Document when the full ensemble finishes.
+    # Clients can also opt in per request with mode=preview.
+    PREVIEW_UPLOADS = os.environ.get('PREVIEW_UPLOADS', 'false').lower() == 'true'
+    PREVIEW_MAX_SIDE = int(os.environ.get('PREVIEW_MAX_SIDE', '1000'))
+    
+    # Adaptive engine routing: skip engines that rarely win for similar
+    # images (by handwriting score, size and contrast) once enough samples exist
+    ADAPTIVE_ROUTING = os.environ.get('ADAPTIVE_ROUTING', 'true').lower() == 'true'
+    ROUTER_STATS_PATH = os.environ.get('ROUTER_STATS_PATH', 'instance/engine_stats.sqlite3')
+    ROUTER_MIN_SAMPLES = int(os.environ.get('ROUTER_MIN_SAMPLES', '20'))
+    ROUTER_MIN_WIN_RATE = float(os.environ.get('ROUTER_MIN_WIN_RATE', '0.1'))
+    ROUTER_LATENCY_BUDGET_MS = float(os.environ.get('ROUTER_LATENCY_BUDGET_MS', '10000'))
+    ROUTER_EXPLORATION_RATE = float(os.environ.get('ROUTER_EXPLORATION_RATE', '0.05'))
+    
+    # Speed/accuracy knobs - compare settings with benchmarks/eval_profiles.py
+    TROCR_NUM_BEAMS = int(os.environ.get('TROCR_NUM_BEAMS', '10'))
+    # EasyOCR passes: any of original, handwriting, printed
+    EASYOCR_PASSES = [p.strip() for p in os.environ.get('EASYOCR_PASSES', 'original,handwriting,printed').split(',') if p.strip()]
+    OCR_MAX_IMAGE_SIDE = int(os.environ.get('OCR_MAX_IMAGE_SIDE', '0'))  # 0 = never downscale
+    # Restrict the ensemble to these engines (empty = all available)
+    OCR_ENGINES = [e.strip() for e in os.environ.get('OCR_ENGINES', '').split(',') if e.strip()]
+    
+    # Metrics (/metrics). Under gunicorn, point METRICS_DIR at a directory
+    # shared by the workers so the endpoint reports totals for all of them.
+    METRICS_DIR = os.environ.get('METRICS_DIR')
+    METRICS_FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', '5'))
     
+    # Admins (comma-separated emails) can profile a single /upload or
+    # /translate request with an X-Profile header or ?profile= query flag
+    # ('sample' or 'cprofile'); profiles are listed at /admin/profiles
+    ADMIN_EMAILS = {email.strip().lower() for email in os.environ.get('ADMIN_EMAILS', '').split(',') if email.strip()}
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', 'instance/profiles')
+    PROFILE_SAMPLE_INTERVAL_MS = float(os.environ.get('PROFILE_SAMPLE_INTERVAL_MS', '5'))
+    
+    # Logging: records go through a background queue listener; LOG_FORMAT is
+    # 'json' (one object per line) or 'text'. LOG_DEBUG_SAMPLE_RATE enables
+    # DEBUG output (engine output, selection scores) for that share of requests.
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
+    LOG_DEBUG_SAMPLE_RATE = float(os.environ.get('LOG_DEBUG_SAMPLE_RATE', '0'))
+
+    # Workload capture (off unless CAPTURE_DIR is set): /upload and /translate
+    # requests are recorded for benchmarks/replay.py. Uploaded files are only
+    # kept (with their filename) with CAPTURE_INPUTS=true; otherwise just
+    # their hash, size and extension.
+    CAPTURE_DIR = os.environ.get('CAPTURE_DIR')
+    CAPTURE_INPUTS = os.environ.get('CAPTURE_INPUTS', 'false').lower() == 'true'
+    CAPTURE_SAMPLE_RATE = float(os.environ.get('CAPTURE_SAMPLE_RATE', '1'))
+
     # Supported languages for translation
     SUPPORTED_LANGUAGES = {
         'en': 'English',
@@ -79,6 +224,11 @@ class Config:
         'ru': 'Russian'
     }
     
+    @classmethod
+    def tesseract_cmd(cls):
+        """TESSERACT_CMD if set, else the auto-detected path (None if not installed)"""
+        return cls.TESSERACT_CMD_OVERRIDE or get_tesseract_path()
+
     @classmethod
     def check_configuration(cls):
         """Check and report configuration status"""
@@ -94,8 +244,8 @@ class Config:
         print("  3. EasyOCR - Good for printed text")
         print("  4. Tesseract - Fast fallback option")
         
-        if cls.TESSERACT_CMD:
-            print(f"\nStatus: Tesseract found at: {cls.TESSERACT_CMD}")
+        if cls.tesseract_cmd():
+            print(f"\nStatus: Tesseract found at: {cls.tesseract_cmd()}")
         
         if cls.GROQ_API_KEY:
             print("Status: Groq translation API configured")
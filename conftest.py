@@ -0,0 +1,103 @@
+"""Shared fixtures: the Flask app on a temporary database with stub engines"""
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+class StubOCR:
+    """
+    Reports the same progress events as AdvancedOCRProcessor and returns
+    canned text; files whose name contains 'blank' yield nothing
+    """
+
+    def __init__(self, text='Invoice total due today'):
+        self.text = text
+        self.full_delay = 0.0  # seconds the full extraction takes
+        self.calls = []
+
+    def is_available(self):
+        return True
+
+    def get_available_methods(self):
+        return ['stub']
+
+    def extract_text(self, image_path, force_method=None, progress_callback=None):
+        self.calls.append(('full', image_path))
+        time.sleep(self.full_delay)
+        text = '' if 'blank' in os.path.basename(image_path) else self.text
+        emit = progress_callback or (lambda event, data: None)
+        emit('decoded', {'width': 8, 'height': 8, 'format': 'PNG'})
+        emit('engine', {'engine': 'stub', 'text': text, 'confidence': 0.9})
+        emit('selected', {'engine': 'stub'})
+        return {'text': text, 'confidence': 0.9 if text else 0.0, 'method': force_method or 'stub',
+                'text_type': 'printed', 'quality': 'good', 'quality_details': {'score': 80}, 'all_results': []}
+
+    def extract_preview(self, image_path, max_side=None):
+        self.calls.append(('preview', image_path))
+        return {'text': self.text.lower(), 'confidence': 0.6, 'method': 'stub-preview',
+                'quality': 'fair', 'quality_details': {'score': 60}, 'text_type': 'printed'}
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    import app as app_module
+    import main as main_module
+    from config import Config
+
+    monkeypatch.setattr(Config, 'SQLALCHEMY_DATABASE_URI', 'sqlite:///' + str(tmp_path / 'app.db'))
+    monkeypatch.setattr(Config, 'UPLOAD_FOLDER', str(tmp_path / 'uploads'))
+    monkeypatch.setattr(Config, 'ASYNC_UPLOADS', False)
+    monkeypatch.setattr(Config, 'PREVIEW_UPLOADS', False)
+    monkeypatch.setattr(Config, 'JOB_QUEUE_BACKEND', 'memory')
+    monkeypatch.setattr(app_module, 'configure_logging', lambda *args, **kwargs: None)  # keep pytest's handlers
+    monkeypatch.setattr(main_module, 'ocr_processor', StubOCR())
+    monkeypatch.setattr(main_module, '_job_queue', None)
+    monkeypatch.setattr(main_module, '_job_workers', None)
+
+    app = app_module.create_app()
+    app.config['TESTING'] = True
+    yield app
+    if main_module._job_workers is not None:
+        main_module._job_workers.stop()
+    from models import db
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def user_id(app):
+    from models import db, User
+
+    with app.app_context():
+        user = User(username='reader', email='reader@example.com')
+        user.set_password('secret')
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+
+@pytest.fixture
+def client(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
+
+
+def read_events(response):
+    """[(event, data)] from a text/event-stream response body"""
+    import json
+
+    events = []
+    for message in response.get_data(as_text=True).split('\n\n'):
+        if not message.strip():
+            continue
+        fields = dict(line.split(': ', 1) for line in message.split('\n'))
+        events.append((fields['event'], json.loads(fields['data'])))
+    return events
@@ -1,11 +1,30 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, send_file
+from flask import (Blueprint, render_template, request, flash, redirect, url_for, jsonify, send_file,
+                   current_app, Response, stream_with_context, g, abort, send_from_directory)
 from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
-from models import db, Document
+from models import db, Document, DocumentTranslation
 from utils.translator import Translator
+from utils.translation_cache import TranslationCache, text_digest
+from utils.translation_stream import DeltaSink
 from utils.pdf_generator import PDFGenerator
+from utils.job_queue import create_job_queue, JobFailed, JobWorkerPool
+from utils.request_profiler import (MODES as PROFILE_MODES, resolve_mode, run_profiled, profile_stream, save_profile,
+                                    list_profiles)
+from utils.structured_logging import (begin_job_log, begin_request_log, current_request_id, debug_sampled,
+                                      end_request_log, request_fields)
+from utils.workload_capture import WorkloadCapture
+from utils.metrics import (REGISTRY, timed, IN_FLIGHT, REQUESTS, begin_request_timings, end_request_timings,
+                           finish_request_timings, request_timings, server_timing_header)
 from config import Config
+from functools import wraps
 import os
+import contextvars
+import json
+import logging
+import queue
+import re
+import threading
+import time
 import uuid
 
 # Import appropriate OCR processor based on environment
@@ -21,16 +40,206 @@ except ImportError as e:
 
 main = Blueprint('main', __name__)
 
+logger = logging.getLogger(__name__)
+request_logger = logging.getLogger('sde.request')
+
 # Initialize processors
 pdf_generator = PDFGenerator()
-translator = Translator(Config.GROQ_API_KEY) if Config.GROQ_API_KEY else None
+translation_cache = (TranslationCache(
+    Config.TRANSLATION_CACHE_PATH,
+    max_entries=Config.TRANSLATION_CACHE_MAX_ENTRIES,
+    max_bytes=int(Config.TRANSLATION_CACHE_MAX_MB * 1024 * 1024),
+    ttl_seconds=Config.TRANSLATION_CACHE_TTL_DAYS * 86400
+) if Config.TRANSLATION_CACHE and Config.GROQ_API_KEY else None)
+translation_memory = (TranslationCache(
+    Config.TRANSLATION_MEMORY_PATH,
+    max_entries=Config.TRANSLATION_MEMORY_MAX_ENTRIES,
+    max_bytes=int(Config.TRANSLATION_MEMORY_MAX_MB * 1024 * 1024)
+) if Config.TRANSLATION_MEMORY and Config.GROQ_API_KEY else None)
+translator = (Translator(Config.GROQ_API_KEY, cache=translation_cache, memory=translation_memory)
+              if Config.GROQ_API_KEY else None)
+workload_capture = (WorkloadCapture(Config.CAPTURE_DIR, Config.CAPTURE_INPUTS, Config.CAPTURE_SAMPLE_RATE)
+                    if Config.CAPTURE_DIR else None)
+
+def configure_engines(ocr=None, translation=None, pdf=None):
+    """Swap the OCR processor, translator or PDF generator (load tests, stub engines)"""
+    global ocr_processor, translator, pdf_generator
+    if ocr is not None:
+        ocr_processor = ocr
+    if translation is not None:
+        translator = translation
+    if pdf is not None:
+        pdf_generator = pdf
 
 ALLOWED_EXTENSIONS = {'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif'}
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')  # accepted from an incoming X-Request-ID
+UPLOAD_ENDPOINTS = ('main.upload_file', 'main.upload_file_stream')
+CAPTURED_ENDPOINTS = UPLOAD_ENDPOINTS + ('main.translate', 'main.translate_stream')
 
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+@main.before_app_request
+def _track_request_start():
+    if Config.METRICS_DIR:
+        REGISTRY.start_flusher(Config.METRICS_DIR, Config.METRICS_FLUSH_SECONDS)
+    g.metrics_endpoint = request.endpoint or 'unknown'
+    g.request_started = time.perf_counter()
+    g.timings_token = begin_request_timings()
+    incoming_id = request.headers.get('X-Request-ID', '')
+    begin_request_log(Config.LOG_DEBUG_SAMPLE_RATE,
+                      incoming_id if REQUEST_ID_PATTERN.match(incoming_id) else None)
+    IN_FLIGHT.inc(endpoint=g.metrics_endpoint)
+
+@main.after_app_request
+def _track_request_status(response):
+    REQUESTS.inc(endpoint=g.get('metrics_endpoint', 'unknown'), status=str(response.status_code))
+    if current_request_id():
+        response.headers['X-Request-ID'] = current_request_id()
+    if response.is_streamed:
+        g.streamed_response = response  # recorded in teardown, once the body has been produced
+        return response
+    timings, duration_ms = _record_request(response)
+    if timings:
+        response.headers['Server-Timing'] = server_timing_header(dict(timings, total=duration_ms))
+    return response
+
+def _record_request(response):
+    """Log the request record and capture it if sampled; returns (timings, duration_ms)"""
+    timings = request_timings()
+    duration_ms = (time.perf_counter() - g.request_started) * 1000 if 'request_started' in g else None
+    if g.get('metrics_endpoint') != 'static':
+        # One compact record per request: outcome, stage durations and decisions
+        request_logger.info('request', extra=dict(
+            request_fields(),
+            endpoint=g.get('metrics_endpoint', 'unknown'),
+            method=request.method,
+            path=request.path,
+            status=response.status_code,
+            duration_ms=round(duration_ms, 2) if duration_ms is not None else None,
+            timings=timings,
+            user_id=current_user.get_id() if current_user else None
+        ))
+    if workload_capture and g.get('metrics_endpoint') in CAPTURED_ENDPOINTS and workload_capture.sampled():
+        try:
+            _capture_request(response, duration_ms, timings)
+        except Exception as e:
+            logger.warning("Workload capture failed: %s", e)
+    return timings, duration_ms
+
+def _capture_request(response, duration_ms, timings):
+    """Record this /upload or /translate request (plain or streamed) for benchmarks/replay.py"""
+    entry = {
+        'ts': time.time() - (duration_ms or 0) / 1000,  # arrival time
+        'endpoint': g.metrics_endpoint,
+        'status': response.status_code,
+        'duration_ms': round(duration_ms, 2) if duration_ms is not None else None,
+        'timings': timings,
+        'user': workload_capture.user_hash(current_user.get_id() if current_user else None),
+    }
+    body = response.get_json(silent=True) if response.is_json and not response.is_streamed else None
+    body = body if isinstance(body, dict) else {}
+    
+    data = None
+    if g.metrics_endpoint in UPLOAD_ENDPOINTS:
+        file = request.files.get('file')
+        if file is not None:
+            file.stream.seek(0)
+            data = file.stream.read()  # hashed (and stored) by the capture's writer thread
+            entry['content_type'] = file.mimetype
+            # The original name only goes with the stored input; otherwise just its type
+            if workload_capture.store_inputs:
+                entry['filename'] = file.filename
+            else:
+                entry['filename_ext'] = os.path.splitext(file.filename or '')[1].lower()
+        entry['params'] = {key: request.values[key] for key in ('mode', 'async') if key in request.values}
+        entry['document_id'] = body.get('document_id', g.get('stream_document_id'))
+    else:
+        params = request.get_json(silent=True) or {}
+        entry['params'] = {key: params.get(key) for key in ('source_language', 'target_language')}
+        entry['document_id'] = params.get('document_id')
+        document = Document.query.get(params['document_id']) if params.get('document_id') else None
+        if document is not None and document.extracted_text:
+            entry['text_chars'] = len(document.extracted_text)
+    
+    workload_capture.submit(entry, data)
+
+@main.teardown_app_request
+def _track_request_end(exc):
+    finish_request_timings()
+    if 'streamed_response' in g:
+        _record_request(g.pop('streamed_response'))
+    if 'metrics_endpoint' in g:
+        IN_FLIGHT.dec(endpoint=g.metrics_endpoint)
+    if 'timings_token' in g:
+        end_request_timings(g.pop('timings_token'))
+    end_request_log()
+
+def _with_timings(payload):
+    """Attach this request's per-stage breakdown (milliseconds) to a JSON payload"""
+    timings = request_timings()
+    if 'request_started' in g:
+        timings['total'] = round((time.perf_counter() - g.request_started) * 1000, 2)
+    payload['timings'] = timings
+    return payload
+
+@main.route('/metrics')
+def metrics():
+    """Prometheus text exposition (summed over worker processes when METRICS_DIR is set)"""
+    return Response(REGISTRY.render(Config.METRICS_DIR or None),
+                    content_type='text/plain; version=0.0.4; charset=utf-8')
+
+def _requested_profile_mode():
+    """Profiler mode an admin asked for with X-Profile or ?profile=, else None"""
+    flag = request.headers.get('X-Profile') or request.args.get('profile')
+    if not flag or flag.lower() in ('0', 'false', 'no', 'off'):
+        return None
+    if not current_user.is_authenticated or not current_user.is_admin:
+        return None
+    return resolve_mode(flag.lower() if flag.lower() in PROFILE_MODES else 'sample')
+
+def profiled(view):
+    """Run the view under a profiler when an admin asks for it; a plain call otherwise"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        mode = _requested_profile_mode()
+        if mode is None:
+            return view(*args, **kwargs)
+        
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        interval = Config.PROFILE_SAMPLE_INTERVAL_MS / 1000
+        meta = {'endpoint': request.endpoint, 'path': request.full_path, 'mode': mode, 'user': current_user.email}
+        started = time.perf_counter()
+        
+        def save(artifacts):
+            try:
+                save_profile(Config.PROFILE_DIR, profile_id, artifacts, dict(
+                    meta, duration_ms=(time.perf_counter() - started) * 1000, created_at=time.time()))
+                logger.info("Saved %s profile %s for %s", mode, profile_id, meta['endpoint'])
+            except Exception as e:
+                logger.warning("Could not save profile %s: %s", profile_id, e)
+        
+        rv, artifacts = run_profiled(lambda: view(*args, **kwargs), mode, interval)
+        response = current_app.make_response(rv)
+        response.headers['X-Profile-Id'] = profile_id
+        if response.is_streamed:
+            # A streaming view's work happens while its body is produced: profile that instead
+            response.response = profile_stream(response.response, save, mode, interval)
+        else:
+            save(artifacts)
+        return response
+    return wrapper
+
+def admin_required(view):
+    @wraps(view)
+    @login_required
+    def wrapper(*args, **kwargs):
+        if not current_user.is_admin:
+            abort(403)
+        return view(*args, **kwargs)
+    return wrapper
+
 @main.route('/')
 def index():
     return render_template('index.html')
@@ -48,8 +257,176 @@ def dashboard():
 def extract():
     return render_template('extract.html', languages=Config.SUPPORTED_LANGUAGES)
 
+def _extract_with_retries(filepath, progress_callback=None):
+    """Run the OCR ensemble, retrying other methods if the first pass is weak"""
+    # Show available OCR methods
+    logger.debug("Available OCR methods: %s", ocr_processor.get_available_methods())
+    
+    # Extract text using advanced OCR processor
+    extraction_result = ocr_processor.extract_text(filepath, progress_callback=progress_callback)
+    
+    # Check if extraction was successful
+    if extraction_result['confidence'] < 0.2 or not extraction_result['text']:
+        # Try different methods if first attempt failed
+        all_methods = ocr_processor.get_available_methods()
+        for method in all_methods:
+            if method != extraction_result.get('method'):
+                logger.info("Retrying with %s", method)
+                try:
+                    retry_result = ocr_processor.extract_text(filepath, force_method=method,
+                                                              progress_callback=progress_callback)
+                    if retry_result['confidence'] > extraction_result['confidence']:
+                        extraction_result = retry_result
+                except Exception as retry_err:
+                    logger.warning("Retry with %s failed: %s", method, retry_err)
+    
+    return extraction_result
+
+def _extraction_failed(extraction_result):
+    return extraction_result['confidence'] < 0.2 or not extraction_result['text']
+
+def _extraction_failure_payload(extraction_result):
+    return {
+        'error': 'Could not extract meaningful text from the image.',
+        'extracted_text': extraction_result.get('text', ''),
+        'confidence': extraction_result.get('confidence', 0),
+        'method_used': extraction_result.get('method', 'none'),
+        'text_type': extraction_result.get('text_type', 'unknown'),
+        'all_methods_tried': extraction_result.get('all_results', []),
+        'suggestions': [
+            'For handwritten text: Write clearly with dark ink on white paper',
+            'For printed text: Ensure good lighting and clear image',
+            'Take photo from directly above the document',
+            'Avoid shadows and ensure even lighting',
+            'Make sure text is in focus and not blurry',
+            'Try writing in print letters rather than cursive'
+        ]
+    }
+
+def _save_document(filename, original_filename, filepath, extraction_result, user_id):
+    document = Document(
+        filename=filename,
+        original_filename=original_filename,
+        file_path=filepath,
+        extracted_text=extraction_result.get('text', ''),
+        user_id=user_id
+    )
+    db.session.add(document)
+    with timed('db.commit'):
+        db.session.commit()
+    
+    extracted_text = extraction_result.get('text', '')
+    logger.debug("Saved document %s: %d characters, method=%s, confidence=%.2f, quality=%s",
+                 document.id, len(extracted_text), extraction_result.get('method', 'unknown'),
+                 extraction_result.get('confidence', 0), extraction_result.get('quality', 'unknown'))
+    return document
+
+def _extraction_success_payload(document, extraction_result, result_stage='final'):
+    extracted_text = extraction_result.get('text', '')
+    return {
+        'success': True,
+        'result_stage': result_stage,
+        'document_id': document.id,
+        'extracted_text': extracted_text,
+        'word_count': len(extracted_text.split()) if extracted_text else 0,
+        'confidence': extraction_result.get('confidence', 0),
+        'method_used': extraction_result.get('method', 'unknown'),
+        'quality': extraction_result.get('quality', 'unknown'),
+        'quality_score': extraction_result.get('quality_details', {}).get('score', 0),
+        'text_type': extraction_result.get('text_type', 'unknown'),
+        'available_methods': ocr_processor.get_available_methods()
+    }
+
+# Background extraction jobs (async uploads)
+_job_queue = None
+_job_workers = None
+_job_lock = threading.Lock()
+
+def start_job_workers(app):
+    """Create the job queue and start this process's background workers (once)"""
+    global _job_queue, _job_workers
+    with _job_lock:
+        if _job_workers is None:
+            _job_queue = create_job_queue(Config.JOB_QUEUE_BACKEND, Config.JOB_QUEUE_PATH, Config.JOB_TTL_SECONDS,
+                                          Config.JOB_LEASE_SECONDS)
+            handlers = {
+                'extract': lambda job: _run_extraction_job(app, job),
+                'upgrade': lambda job: _run_upgrade_job(app, job)
+            }
+            _job_workers = JobWorkerPool(_job_queue, handlers, workers=Config.JOB_WORKERS)
+            _job_workers.start()
+            logger.info("Started %d extraction job workers (%s queue)", Config.JOB_WORKERS, Config.JOB_QUEUE_BACKEND)
+    return _job_queue
+
+def _run_extraction_job(app, job):
+    """Job handler: extract text for a stored upload and save the Document"""
+    payload = job['payload']
+    begin_job_log(payload.get('debug_sampled'), payload.get('request_id'), job_id=job['id'])
+    with app.app_context():
+        extraction_result = _extract_with_retries(payload['filepath'])
+        if _extraction_failed(extraction_result):
+            failure = _extraction_failure_payload(extraction_result)
+            raise JobFailed(failure['error'], failure)
+        
+        document = _save_document(
+            payload['filename'], payload['original_filename'], payload['filepath'],
+            extraction_result, payload['user_id']
+        )
+        return _extraction_success_payload(document, extraction_result)
+
+def _run_upgrade_job(app, job):
+    """Job handler: run the full ensemble for a previewed upload and update its Document in place"""
+    payload = job['payload']
+    begin_job_log(payload.get('debug_sampled'), payload.get('request_id'), job_id=job['id'])
+    with app.app_context():
+        extraction_result = _extract_with_retries(payload['filepath'])
+        document = db.session.get(Document, payload['document_id'])
+        if document is None:
+            return {'success': False, 'result_stage': 'final', 'error': 'Document no longer exists'}
+        
+        if _extraction_failed(extraction_result):
+            # Nothing better than the preview - it becomes the final text
+            return {
+                'success': True,
+                'result_stage': 'final',
+                'upgraded': False,
+                'document_id': document.id,
+                'extracted_text': document.extracted_text or ''
+            }
+        
+        document.extracted_text = extraction_result.get('text', '')
+        db.session.commit()
+        logger.info("Upgraded document %s from preview (%s)", document.id, extraction_result.get('method', 'unknown'))
+        
+        result = _extraction_success_payload(document, extraction_result)
+        result['upgraded'] = True
+        return result
+
+def _wants_preview_upload():
+    mode = request.form.get('mode', request.args.get('mode'))
+    if mode is None:
+        return Config.PREVIEW_UPLOADS
+    return mode == 'preview'
+
+def _extract_preview(filepath):
+    """Fast preview result, or None if the processor has no preview path or it found nothing"""
+    if not hasattr(ocr_processor, 'extract_preview'):
+        return None
+    preview = ocr_processor.extract_preview(filepath)
+    if not preview or _extraction_failed(preview):
+        return None
+    return preview
+
+def _wants_async_upload():
+    flag = request.form.get('async', request.args.get('async'))
+    if flag is None:
+        return Config.ASYNC_UPLOADS
+    return str(flag).lower() in ('1', 'true', 'yes')
+
 @main.route('/upload', methods=['POST'])
 @login_required
+@profiled
+@timed('upload')
 def upload_file():
     try:
         # Check OCR availability first
@@ -77,80 +454,59 @@ def upload_file():
                 os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
                 
                 file.save(filepath)
-                print(f"[INFO] File saved: {filepath}")
+                logger.debug("File saved: %s", filepath)
                 
-                # Show available OCR methods
-                print(f"[INFO] Available OCR methods: {ocr_processor.get_available_methods()}")
+                # Async mode: hand the file to the background workers
+                if _wants_async_upload():
+                    job_queue = start_job_workers(current_app._get_current_object())
+                    job_id = job_queue.enqueue('extract', {
+                        'filename': filename,
+                        'original_filename': file.filename,
+                        'filepath': filepath,
+                        'user_id': current_user.id,
+                        'debug_sampled': debug_sampled(),
+                        'request_id': current_request_id()
+                    })
+                    return jsonify({
+                        'success': True,
+                        'job_id': job_id,
+                        'status': 'queued',
+                        'status_url': url_for('main.job_status', job_id=job_id)
+                    }), 202
                 
-                # Extract text using advanced OCR processor
-                extraction_result = ocr_processor.extract_text(filepath)
+                # Preview mode: answer with a fast result, upgrade it in the background
+                if _wants_preview_upload():
+                    preview = _extract_preview(filepath)
+                    if preview:
+                        document = _save_document(filename, file.filename, filepath,
+                                                  preview, current_user.id)
+                        job_queue = start_job_workers(current_app._get_current_object())
+                        job_id = job_queue.enqueue('upgrade', {
+                            'document_id': document.id,
+                            'filepath': filepath,
+                            'user_id': current_user.id,
+                            'debug_sampled': debug_sampled(),
+                            'request_id': current_request_id()
+                        })
+                        response = _extraction_success_payload(document, preview, result_stage='preview')
+                        response['job_id'] = job_id
+                        response['status_url'] = url_for('main.job_status', job_id=job_id)
+                        return jsonify(_with_timings(response))
+                    logger.info("No preview available, running full extraction")
                 
-                # Check if extraction was successful
-                if extraction_result['confidence'] < 0.2 or not extraction_result['text']:
-                    # Try different methods if first attempt failed
-                    all_methods = ocr_processor.get_available_methods()
-                    for method in all_methods:
-                        if method != extraction_result.get('method'):
-                            print(f"[INFO] Retrying with {method}...")
-                            try:
-                                retry_result = ocr_processor.extract_text(filepath, force_method=method)
-                                if retry_result['confidence'] > extraction_result['confidence']:
-                                    extraction_result = retry_result
-                            except Exception as retry_err:
-                                print(f"[WARN] Retry with {method} failed: {retry_err}")
-                    
-                    if extraction_result['confidence'] < 0.2 or not extraction_result['text']:
-                        return jsonify({
-                            'error': 'Could not extract meaningful text from the image.',
-                            'extracted_text': extraction_result.get('text', ''),
-                            'confidence': extraction_result.get('confidence', 0),
-                            'method_used': extraction_result.get('method', 'none'),
-                            'text_type': extraction_result.get('text_type', 'unknown'),
-                            'all_methods_tried': extraction_result.get('all_results', []),
-                            'suggestions': [
-                                'For handwritten text: Write clearly with dark ink on white paper',
-                                'For printed text: Ensure good lighting and clear image',
-                                'Take photo from directly above the document',
-                                'Avoid shadows and ensure even lighting',
-                                'Make sure text is in focus and not blurry',
-                                'Try writing in print letters rather than cursive'
-                            ]
-                        }), 400
+                extraction_result = _extract_with_retries(filepath)
                 
-                # Save to database
-                document = Document(
-                    filename=filename,
-                    original_filename=file.filename,
-                    file_path=filepath,
-                    extracted_text=extraction_result.get('text', ''),
-                    user_id=current_user.id
-                )
-                db.session.add(document)
-                db.session.commit()
+                if _extraction_failed(extraction_result):
+                    return jsonify(_with_timings(_extraction_failure_payload(extraction_result))), 400
                 
-                extracted_text = extraction_result.get('text', '')
-                print(f"[OK] Successfully extracted {len(extracted_text)} characters")
-                print(f"[INFO] Method: {extraction_result.get('method', 'unknown')}")
-                print(f"[INFO] Confidence: {extraction_result.get('confidence', 0):.2%}")
-                print(f"[INFO] Quality: {extraction_result.get('quality', 'unknown')}")
+                # Save to database
+                document = _save_document(filename, file.filename, filepath,
+                                          extraction_result, current_user.id)
                 
-                return jsonify({
-                    'success': True,
-                    'document_id': document.id,
-                    'extracted_text': extracted_text,
-                    'word_count': len(extracted_text.split()) if extracted_text else 0,
-                    'confidence': extraction_result.get('confidence', 0),
-                    'method_used': extraction_result.get('method', 'unknown'),
-                    'quality': extraction_result.get('quality', 'unknown'),
-                    'quality_score': extraction_result.get('quality_details', {}).get('score', 0),
-                    'text_type': extraction_result.get('text_type', 'unknown'),
-                    'available_methods': ocr_processor.get_available_methods()
-                })
+                return jsonify(_with_timings(_extraction_success_payload(document, extraction_result)))
                 
             except Exception as e:
-                print(f"[ERROR] Upload error: {str(e)}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Upload error: %s", e)
                 return jsonify({
                     'error': f'File processing failed: {str(e)}',
                     'help': 'Please try with a different image or check if the file is corrupted.'
@@ -159,21 +515,118 @@ def upload_file():
         return jsonify({'error': 'Invalid file type. Please select PNG, JPG, JPEG, or PDF files.'}), 400
     
     except Exception as e:
-        print(f"❌ Unexpected error in upload_file: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Unexpected error in upload_file: %s", e)
         return jsonify({
             'error': f'An unexpected error occurred: {str(e)}'
         }), 500
 
-@main.route('/translate', methods=['POST'])
+def _sse(event, data):
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@main.route('/upload/stream', methods=['POST'])
 @login_required
-def translate():
-    data = request.get_json()
-    document_id = data.get('document_id')
-    target_lang = data.get('target_language')
-    source_lang = data.get('source_language', 'en')
+@profiled
+@timed('upload')
+def upload_file_stream():
+    """
+    Upload a file and stream extraction progress as Server-Sent Events:
+    preview (with mode=preview), decoded, routing, engine (one per OCR
+    engine, with its text), selected, then result (same payload as /upload)
+    or error.
+    """
+    if not ocr_processor.is_available():
+        return jsonify({
+            'error': 'No OCR service is available. Please check the installation.',
+            'available_methods': ocr_processor.get_available_methods()
+        }), 500
+    
+    file = request.files.get('file')
+    if not file or file.filename == '':
+        return jsonify({'error': 'No file selected'}), 400
+    if not allowed_file(file.filename):
+        return jsonify({'error': 'Invalid file type. Please select PNG, JPG, JPEG, or PDF files.'}), 400
+    
+    filename = str(uuid.uuid4()) + '_' + secure_filename(file.filename)
+    filepath = os.path.join(Config.UPLOAD_FOLDER, filename)
+    os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
+    file.save(filepath)
+    original_filename = file.filename
+    user_id = current_user.id
+    
+    events = queue.Queue()
+    
+    wants_preview = _wants_preview_upload()
+    
+    def run_preview():
+        try:
+            preview = _extract_preview(filepath)
+        except Exception as e:
+            logger.warning("Preview extraction failed: %s", e)
+            return
+        if preview:
+            events.put(('preview', {
+                'result_stage': 'preview',
+                'extracted_text': preview['text'],
+                'confidence': preview['confidence'],
+                'method_used': preview['method']
+            }))
+    
+    def run_extraction():
+        try:
+            result = _extract_with_retries(filepath, progress_callback=lambda event, data: events.put((event, data)))
+            events.put(('_done', result))
+        except Exception as e:
+            logger.exception("Streaming upload error: %s", e)
+            events.put(('_error', str(e)))
+    
+    # The preview runs alongside the full ensemble rather than ahead of it; a
+    # preview that finishes after the result is never sent. Workers run in a
+    # copy of this request's context (timings, log fields, debug sampling).
+    workers = [run_preview, run_extraction] if wants_preview else [run_extraction]
+    for target in workers:
+        threading.Thread(target=contextvars.copy_context().run, args=(target,), daemon=True).start()
     
+    def generate():
+        yield _sse('uploaded', {'filename': original_filename})
+        while True:
+            event, data = events.get()
+            if event == '_error':
+                yield _sse('error', {'error': f'File processing failed: {data}'})
+                return
+            if event == '_done':
+                if _extraction_failed(data):
+                    yield _sse('error', _extraction_failure_payload(data))
+                else:
+                    document = _save_document(filename, original_filename, filepath, data, user_id)
+                    g.stream_document_id = document.id
+                    yield _sse('result', _extraction_success_payload(document, data))
+                return
+            yield _sse(event, data)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@main.route('/jobs/<job_id>')
+@login_required
+def job_status(job_id):
+    """Report the status (and result, once finished) of a background extraction job"""
+    job_queue = start_job_workers(current_app._get_current_object())
+    job = job_queue.get(job_id)
+    if not job or job['payload'].get('user_id') != current_user.id:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    return jsonify({
+        'job_id': job['id'],
+        'status': job['status'],
+        'result': job['result'],
+        'error': job['error'],
+        'created_at': job['created_at'],
+        'updated_at': job['updated_at']
+    })
+
+def _translation_request_error(document_id, source_lang, target_lang):
+    """Error response for an invalid /translate request, else None"""
     if not translator:
         return jsonify({'error': 'Translation service not available. Please configure GROQ_API_KEY.'}), 500
     
@@ -185,6 +638,36 @@ def translate():
             'error': 'Source and target languages must be different',
             'suggestion': 'Please select different languages or use auto-detect for source'
         }), 400
+    return None
+
+def _store_translation(document, source_lang, target_lang, translated_text, provider=None):
+    """
+    Keep this translation per (document, language), replacing one made from
+    another source language or text; the caller commits
+    """
+    if not translated_text or translated_text == document.extracted_text:
+        return  # nothing was translated (every provider failed)
+    translation = DocumentTranslation.query.filter_by(document_id=document.id, language=target_lang).first()
+    if translation is None:
+        translation = DocumentTranslation(document_id=document.id, language=target_lang)
+        db.session.add(translation)
+    translation.source_language = source_lang
+    translation.translated_text = translated_text
+    translation.provider = provider
+    translation.source_hash = text_digest(document.extracted_text or '')
+
+@main.route('/translate', methods=['POST'])
+@login_required
+@profiled
+def translate():
+    data = request.get_json()
+    document_id = data.get('document_id')
+    target_lang = data.get('target_language')
+    source_lang = data.get('source_language', 'en')
+    
+    error = _translation_request_error(document_id, source_lang, target_lang)
+    if error:
+        return error
     
     try:
         document = Document.query.get_or_404(document_id)
@@ -203,17 +686,165 @@ def translate():
         document.translated_text = translated_text
         document.source_language = source_lang
         document.target_language = target_lang
-        db.session.commit()
+        _store_translation(document, source_lang, target_lang, translated_text)
+        with timed('db.commit'):
+            db.session.commit()
         
-        return jsonify({
+        return jsonify(_with_timings({
             'success': True,
             'translated_text': translated_text
-        })
+        }))
         
     except Exception as e:
-        print(f"Translation error: {str(e)}")
+        logger.exception("Translation error: %s", e)
         return jsonify({'error': f'Translation failed: {str(e)}'}), 500
 
+@main.route('/translate/stream', methods=['POST'])
+@login_required
+@profiled
+@timed('translate.stream')
+def translate_stream():
+    """
+    Translate a document and stream the output as Server-Sent Events:
+    delta (text to append), reset (replace everything shown so far, after
+    a retry or provider fallback), then result (same payload as
+    /translate, saved to the Document the same way) or error.
+    """
+    data = request.get_json() or {}
+    document_id = data.get('document_id')
+    target_lang = data.get('target_language')
+    source_lang = data.get('source_language', 'en')
+    
+    error = _translation_request_error(document_id, source_lang, target_lang)
+    if error:
+        return error
+    
+    document = Document.query.get_or_404(document_id)
+    if document.user_id != current_user.id:
+        return jsonify({'error': 'Unauthorized access'}), 403
+    text = document.extracted_text
+    
+    events = queue.Queue()
+    sink = DeltaSink(lambda event, payload: events.put((event, payload)))
+    
+    def run_translation():
+        try:
+            events.put(('_done', translator.translate_text(text, source_lang, target_lang, on_partial=sink)))
+        except Exception as e:
+            logger.exception("Streaming translation error: %s", e)
+            events.put(('_error', str(e)))
+    
+    threading.Thread(target=contextvars.copy_context().run, args=(run_translation,), daemon=True).start()
+    
+    def generate():
+        while True:
+            event, payload = events.get()
+            if event == '_error':
+                yield _sse('error', {'error': f'Translation failed: {payload}'})
+                return
+            if event == '_done':
+                document = Document.query.get(document_id)
+                if document is None:  # deleted while the translation ran
+                    yield _sse('error', {'error': 'Document no longer exists'})
+                    return
+                document.translated_text = payload
+                document.source_language = source_lang
+                document.target_language = target_lang
+                _store_translation(document, source_lang, target_lang, payload)
+                with timed('db.commit'):
+                    db.session.commit()
+                yield _sse('result', {'success': True, 'translated_text': payload})
+                return
+            yield _sse(event, payload)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@main.route('/translate/batch', methods=['POST'])
+@login_required
+@profiled
+def translate_batch():
+    """
+    Translate a document into several target languages at once. Languages
+    already stored for the current text are returned without a provider
+    call (unless refresh is true); the rest run concurrently.
+    """
+    data = request.get_json() or {}
+    document_id = data.get('document_id')
+    source_lang = data.get('source_language', 'en')
+    target_langs = list(dict.fromkeys(data.get('target_languages') or []))
+    refresh = bool(data.get('refresh'))
+    
+    if not target_langs:
+        return jsonify({'error': 'No target languages provided'}), 400
+    unsupported = [lang for lang in target_langs if lang not in Config.SUPPORTED_LANGUAGES]
+    if unsupported:
+        return jsonify({'error': f"Unsupported target languages: {', '.join(map(str, unsupported))}",
+                        'supported': sorted(Config.SUPPORTED_LANGUAGES)}), 400
+    for target_lang in target_langs:
+        error = _translation_request_error(document_id, source_lang, target_lang)
+        if error:
+            return error
+    
+    try:
+        document = Document.query.get_or_404(document_id)
+        
+        if document.user_id != current_user.id:
+            return jsonify({'error': 'Unauthorized access'}), 403
+        
+        translations, missing = {}, []
+        for target_lang in target_langs:
+            stored = None if refresh else document.translation_for(target_lang, source_lang)
+            if stored is not None:
+                translations[target_lang] = {'translated_text': stored.translated_text,
+                                             'provider': stored.provider, 'stored': True}
+            else:
+                missing.append(target_lang)
+        
+        failed = []
+        if missing:
+            results = translator.translate_many(document.extracted_text, source_lang, missing)
+            for target_lang, (translated_text, provider) in results.items():
+                if translated_text is None:
+                    failed.append(target_lang)
+                    continue
+                _store_translation(document, source_lang, target_lang, translated_text, provider)
+                translations[target_lang] = {'translated_text': translated_text, 'provider': provider,
+                                             'stored': False}
+            with timed('db.commit'):
+                db.session.commit()
+        
+        return jsonify(_with_timings({
+            'success': not failed,
+            'translations': {lang: translations[lang] for lang in target_langs if lang in translations},
+            'failed': failed
+        }))
+    
+    except Exception as e:
+        logger.exception("Batch translation error: %s", e)
+        return jsonify({'error': f'Translation failed: {str(e)}'}), 500
+
+@main.route('/translations/<int:document_id>')
+@login_required
+def document_translations(document_id):
+    """Stored translations of a document that match its current text, by language"""
+    document = Document.query.get_or_404(document_id)
+    if document.user_id != current_user.id:
+        return jsonify({'error': 'Unauthorized access'}), 403
+    current = text_digest(document.extracted_text or '')
+    return jsonify({
+        'document_id': document.id,
+        'translations': {
+            translation.language: {
+                'translated_text': translation.translated_text,
+                'source_language': translation.source_language,
+                'provider': translation.provider,
+                'updated_at': translation.updated_at.isoformat() if translation.updated_at else None
+            }
+            for translation in document.translations if translation.source_hash == current
+        }
+    })
+
 @main.route('/generate_pdf/<int:document_id>')
 @login_required
 def generate_pdf(document_id):
@@ -223,7 +854,15 @@ def generate_pdf(document_id):
         if document.user_id != current_user.id:
             return jsonify({'error': 'Unauthorized access'}), 403
         
-        text_content = document.translated_text or document.extracted_text
+        # ?language=xx renders that stored translation (no provider call)
+        language = request.args.get('language')
+        if language:
+            translation = document.translation_for(language)
+            if translation is None:
+                return jsonify({'error': f'No stored translation for language: {language}'}), 404
+            text_content = translation.translated_text
+        else:
+            text_content = document.translated_text or document.extracted_text
         
         if not text_content:
             return jsonify({'error': 'No text content available for PDF generation'}), 400
@@ -240,7 +879,7 @@ def generate_pdf(document_id):
             return jsonify({'error': 'Failed to generate PDF'}), 500
             
     except Exception as e:
-        print(f"PDF generation error: {str(e)}")
+        logger.exception("PDF generation error: %s", e)
         return jsonify({'error': f'PDF generation failed: {str(e)}'}), 500
 
 @main.route('/delete_document/<int:document_id>', methods=['POST'])
@@ -265,7 +904,7 @@ def delete_document(document_id):
         return redirect(url_for('main.dashboard'))
         
     except Exception as e:
-        print(f"Delete error: {str(e)}")
+        logger.exception("Delete error: %s", e)
         flash(f'Failed to delete document: {str(e)}', 'error')
         return redirect(url_for('main.dashboard'))
 
@@ -286,15 +925,54 @@ def reprocess_document(document_id):
         
         # Update document
         document.extracted_text = extraction_result['text']
-        db.session.commit()
+        with timed('db.commit'):
+            db.session.commit()
         
-        return jsonify({
+        return jsonify(_with_timings({
             'success': True,
             'extracted_text': extraction_result['text'],
             'confidence': extraction_result['confidence'],
             'method_used': extraction_result['method']
-        })
+        }))
         
     except Exception as e:
-        print(f"Reprocess error: {str(e)}")
-        return jsonify({'error': f'Reprocessing failed: {str(e)}'}), 500
\ No newline at end of file
+        logger.exception("Reprocess error: %s", e)
+        return jsonify({'error': f'Reprocessing failed: {str(e)}'}), 500
+
+@main.route('/ocr/batching')
+@login_required
+def batching_stats():
+    """Micro-batching histograms (batch size, queue wait) per neural engine"""
+    if not hasattr(ocr_processor, 'get_batching_stats'):
+        return jsonify({'enabled': False, 'engines': {}})
+    return jsonify(ocr_processor.get_batching_stats())
+
+@main.route('/ocr/routing')
+@login_required
+def routing_stats():
+    """Per-bucket engine win-rates and latencies behind adaptive routing"""
+    if not hasattr(ocr_processor, 'get_routing_stats'):
+        return jsonify({'enabled': False, 'buckets': {}})
+    return jsonify(ocr_processor.get_routing_stats())
+
+@main.route('/translate/providers')
+@login_required
+def translation_providers():
+    """Up/down state and last-checked time of each translation provider"""
+    if not translator:
+        return jsonify({'enabled': False, 'providers': {}})
+    return jsonify(translator.health_status())
+
+@main.route('/admin/profiles')
+@admin_required
+def admin_profiles():
+    """Stored request profiles, newest first"""
+    return render_template('admin_profiles.html', profiles=list_profiles(Config.PROFILE_DIR))
+
+@main.route('/admin/profiles/<path:name>')
+@admin_required
+def download_profile(name):
+    directory = os.path.abspath(Config.PROFILE_DIR)
+    if not os.path.isdir(directory) or name not in os.listdir(directory):
+        abort(404)
+    return send_from_directory(directory, name, as_attachment=True)
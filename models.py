@@ -2,6 +2,8 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
+from config import Config
+from utils.translation_cache import text_digest
 
 db = SQLAlchemy()
 
@@ -20,6 +22,10 @@ class User(UserMixin, db.Model):
     
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
+    
+    @property
+    def is_admin(self):
+        return (self.email or '').lower() in Config.ADMIN_EMAILS
 
 class Document(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -32,4 +38,33 @@ class Document(db.Model):
     target_language = db.Column(db.String(10))
     pdf_path = db.Column(db.String(300))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
\ No newline at end of file
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    
+    # Stored translations, one per target language
+    translations = db.relationship('DocumentTranslation', backref='document', lazy=True,
+                                   cascade='all, delete-orphan')
+    
+    def translation_for(self, language, source_language=None):
+        """
+        The stored translation into `language` if it was made from the current
+        text (and from `source_language`, when given), else None
+        """
+        digest = text_digest(self.extracted_text or '')
+        for translation in self.translations:
+            if (translation.language == language and translation.source_hash == digest
+                    and source_language in (None, translation.source_language)):
+                return translation
+        return None
+
+class DocumentTranslation(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    document_id = db.Column(db.Integer, db.ForeignKey('document.id'), nullable=False, index=True)
+    language = db.Column(db.String(10), nullable=False)
+    source_language = db.Column(db.String(10))
+    translated_text = db.Column(db.Text)
+    provider = db.Column(db.String(50))
+    source_hash = db.Column(db.String(64))  # digest of the extracted text it was made from
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (db.UniqueConstraint('document_id', 'language'),)
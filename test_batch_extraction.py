@@ -0,0 +1,79 @@
+"""Batch extraction ordering, buffer inputs, bad inputs and the in-flight bound"""
+import io
+import os
+import sys
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.batch_extraction import iter_batch_extraction
+
+
+def _png(width=8):
+    buffer = io.BytesIO()
+    Image.new('L', (width, 8), 255).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def images(tmp_path):
+    paths = []
+    for n in range(6):
+        path = tmp_path / f'{n}.png'
+        path.write_bytes(_png(8 + n))
+        paths.append(str(path))
+    return paths
+
+
+def _extract(path, force_method=None):
+    """Stand-in engine: later inputs finish first"""
+    with Image.open(path) as img:
+        width = img.width
+    time.sleep(0.01 * (14 - width))
+    return {'text': f'width {width}', 'path': path}
+
+
+def test_results_follow_input_order(images):
+    results = list(iter_batch_extraction(_extract, images, workers=3))
+    assert [r['index'] for r in results] == list(range(6))
+    assert [r['text'] for r in results] == [f'width {8 + n}' for n in range(6)]
+    assert results[2]['source'] == images[2]
+
+
+def test_unordered_yields_every_input(images):
+    results = list(iter_batch_extraction(_extract, images, workers=3, ordered=False))
+    assert sorted(r['index'] for r in results) == list(range(6))
+
+
+def test_buffers_are_spilled_and_removed():
+    results = list(iter_batch_extraction(_extract, [_png(), io.BytesIO(_png(9))]))
+    assert [r['text'] for r in results] == ['width 8', 'width 9']
+    assert results[0]['source'] == '<buffer>'
+    assert not any(os.path.exists(r['path']) for r in results)
+
+
+def test_bad_input_gets_an_error_result(images):
+    results = list(iter_batch_extraction(_extract, [images[0], b'not an image', images[1]]))
+    assert results[1]['error'].startswith('Could not process input')
+    assert results[1]['text'] == '' and results[1]['method'] == 'none'
+    assert results[0]['text'] == 'width 8' and results[2]['text'] == 'width 9'
+
+
+def test_in_flight_inputs_are_bounded(images):
+    pulled, lock = [], threading.Lock()
+
+    def inputs():
+        for path in images * 3:
+            with lock:
+                pulled.append(path)
+            yield path
+
+    batches = iter_batch_extraction(_extract, inputs(), prefetch=2, workers=2)
+    next(batches)
+    time.sleep(0.1)
+    assert len(pulled) <= 2 + 2 + 1
+    batches.close()
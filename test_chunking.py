@@ -0,0 +1,61 @@
+"""Chunk split and rejoin, chunk retries, and the provider token bucket"""
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.chunking import TokenBucket, split_chunks, translate_chunks
+
+DOCUMENT = ('Invoice 42. Billed to Acme Corp.\nDue in thirty days.\n\n'
+            'Items were shipped on time. Nothing is outstanding!\n\n\n'
+            'Signed,\n  ' + 'Supercalifragilisticexpialidocious' * 3)
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        yield pool
+
+
+@pytest.mark.parametrize('max_chars', [10, 25, 40, 60, 1000])
+def test_chunks_rejoin_to_the_text(max_chars):
+    chunks = split_chunks(DOCUMENT, max_chars)
+    assert ''.join(chunk + sep for chunk, sep in chunks) == DOCUMENT
+    assert all(0 < len(chunk) <= max_chars for chunk, _ in chunks)
+
+
+def test_cuts_at_the_coarsest_boundary_that_fits():
+    paragraphs = 'First paragraph here.\n\nSecond one.'
+    assert split_chunks(paragraphs, 25) == [('First paragraph here.', '\n\n'), ('Second one.', '')]
+    sentences = 'One sentence. Another one. Last.'
+    assert split_chunks(sentences, 20) == [('One sentence.', ' '), ('Another one. Last.', '')]
+    assert split_chunks('abcdefghij', 4) == [('abcd', ''), ('efgh', ''), ('ij', '')]
+
+
+def test_only_failed_chunks_are_retried(executor):
+    calls = []
+
+    def translate(i, chunk):
+        calls.append(i)
+        if i == 1 and calls.count(1) == 1:
+            raise ConnectionError('reset')
+        if i == 2:
+            return ''
+        return chunk.upper()
+
+    seen = {}
+    results = translate_chunks(['one', 'two', 'three', '12.50'], translate, executor, retries=1,
+                               on_result=seen.__setitem__)
+
+    assert results == ['ONE', 'TWO', None, '12.50']
+    assert sorted(calls) == [0, 1, 1, 2, 2]  # '12.50' has no letters and is never sent
+    assert seen == {0: 'ONE', 1: 'TWO', 3: '12.50'}
+
+
+def test_token_bucket_refuses_past_timeout():
+    bucket = TokenBucket(rate=1, burst=2)
+    assert bucket.acquire(timeout=0) and bucket.acquire(timeout=0)
+    assert bucket.acquire(timeout=0.1) is False
@@ -0,0 +1,86 @@
+"""Circuit breaker state machine and provider scores"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils import circuit_breaker
+from utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, ProviderScore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _breaker(monkeypatch, **kwargs):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, 'monotonic', clock)
+    return CircuitBreaker('test', **kwargs), clock
+
+
+def test_opens_at_the_failure_rate(monkeypatch):
+    breaker, _ = _breaker(monkeypatch, failure_rate=0.5, window=4, min_calls=4, open_seconds=30)
+    for success in (True, False, True):
+        breaker.record(success)
+    assert breaker.state == CLOSED  # below min_calls
+    breaker.record(False)
+    assert breaker.state == OPEN and breaker.times_opened == 1
+    assert not breaker.allow()
+
+
+def test_half_open_trial_closes_on_success(monkeypatch):
+    breaker, clock = _breaker(monkeypatch, min_calls=1, open_seconds=30)
+    breaker.record(False)
+    clock.now += 29
+    assert not breaker.allow()
+
+    clock.now += 2
+    assert breaker.allow()  # the single trial call
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # everyone else waits for the trial
+
+    assert breaker.record(True) is False
+    assert breaker.state == CLOSED and breaker.allow()
+    assert breaker.snapshot()['recent_calls'] == 0
+
+
+def test_half_open_trial_reopens_on_failure(monkeypatch):
+    breaker, clock = _breaker(monkeypatch, min_calls=1, open_seconds=30)
+    breaker.record(False)
+    clock.now += 31
+    assert breaker.allow()
+    breaker.record(False)
+    assert breaker.state == OPEN and breaker.times_opened == 2
+    assert not breaker.allow()
+
+
+def test_slow_calls_count_as_failures(monkeypatch):
+    breaker, _ = _breaker(monkeypatch, window=2, min_calls=2, failure_rate=1.0, slow_call_ms=100)
+    assert breaker.record(True, latency_ms=50) is False
+    assert breaker.record(True, latency_ms=500) is True
+    assert breaker.state == CLOSED  # the fast success is still in the window
+    breaker.record(True, latency_ms=500)
+    assert breaker.state == OPEN
+
+
+def test_score_prefers_fast_reliable_providers():
+    fast, flaky = ProviderScore(), ProviderScore()
+    for _ in range(10):
+        fast.observe(100, True)
+        flaky.observe(100, False)
+        flaky.observe(80, True)
+    assert fast.expected_ms() < flaky.expected_ms()
+    assert fast.percentile(0.9) == 100
+
+
+def test_released_trial_slot_can_be_claimed_again(monkeypatch):
+    breaker, clock = _breaker(monkeypatch, min_calls=1, open_seconds=30)
+    breaker.record(False)
+    clock.now += 31
+    assert breaker.allow() and not breaker.allow()
+    breaker.release()  # the trial call never went out
+    assert breaker.allow() and breaker.state == HALF_OPEN
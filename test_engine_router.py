@@ -0,0 +1,82 @@
+"""Engine routing: warmup, exploration, learned decisions and shared statistics"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.engine_router import EngineRouter
+
+ENGINES = ['paddleocr', 'easyocr', 'tesseract']
+
+
+class FixedRandom:
+    def __init__(self, value):
+        self.value = value
+
+    def random(self):
+        return self.value
+
+
+def _router(tmp_path=None, explore_draw=0.99, **kwargs):
+    kwargs.setdefault('min_samples', 3)
+    path = str(tmp_path / 'engine_stats.sqlite3') if tmp_path is not None else None
+    return EngineRouter(path=path, rng=FixedRandom(explore_draw), **kwargs)
+
+
+def _contests(router, bucket, n, winner, latency_ms=None):
+    latency_ms = latency_ms or {}
+    for _ in range(n):
+        router.record(bucket, [{'engine': name, 'latency_ms': latency_ms.get(name, 100), 'confidence': 0.8}
+                               for name in ENGINES], winner=winner)
+
+
+def test_runs_every_engine_until_each_has_enough_contests():
+    router = _router()
+    assert router.route('print|s|high', ENGINES) == (ENGINES, 'warmup')
+    _contests(router, 'print|s|high', 2, 'paddleocr')
+    assert router.route('print|s|high', ENGINES)[1] == 'warmup'
+    assert router.route('print|s|high', ['tesseract']) == (['tesseract'], 'single')
+
+
+def test_learned_route_drops_losers_and_engines_over_budget():
+    router = _router(min_win_rate=0.2, latency_budget_ms=1000)
+    _contests(router, 'hw|m|mid', 6, 'paddleocr', {'easyocr': 2000})
+    _contests(router, 'hw|m|mid', 4, 'easyocr', {'easyocr': 2000})
+    _contests(router, 'hw|m|mid', 1, 'tesseract', {'easyocr': 2000})
+
+    # easyocr wins 40% but would blow the budget; tesseract wins under 20%
+    assert router.route('hw|m|mid', ENGINES) == (['paddleocr'], 'learned')
+    assert router.route('print|s|high', ENGINES)[1] == 'warmup'  # buckets learn separately
+
+
+def test_exploration_runs_everything():
+    router = _router(explore_draw=0.01, exploration_rate=0.05)
+    _contests(router, 'hw|m|mid', 5, 'paddleocr')
+    assert router.route('hw|m|mid', ENGINES) == (ENGINES, 'explore')
+
+
+def test_only_contests_count_towards_win_rate():
+    router = _router()
+    router.record('print|s|high', [{'engine': 'tesseract', 'latency_ms': 50, 'confidence': 0.9}],
+                  winner='tesseract')
+    router.record('print|s|high', [{'engine': 'tesseract', 'latency_ms': 70, 'confidence': 0.7},
+                                   {'engine': 'easyocr', 'latency_ms': 300, 'confidence': 0.9}],
+                  winner='easyocr')
+
+    stats = router.stats()['print|s|high']
+    assert stats['tesseract']['runs'] == 2 and stats['tesseract']['contests'] == 1
+    assert stats['tesseract']['win_rate'] == 0.0 and stats['easyocr']['win_rate'] == 1.0
+    assert stats['tesseract']['mean_latency_ms'] == 60
+
+
+def test_statistics_are_shared_through_the_file(tmp_path):
+    first = _router(tmp_path)
+    assert not os.listdir(tmp_path)  # nothing is written until the first record
+
+    _contests(first, 'print|s|high', 3, 'tesseract')
+    second = _router(tmp_path)
+    assert second.stats() == first.stats()
+
+    _contests(first, 'print|s|high', 1, 'easyocr')
+    second._reload()
+    assert second.stats()['print|s|high']['easyocr']['contests'] == 4
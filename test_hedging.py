@@ -0,0 +1,71 @@
+"""Hedged calls across provider mirrors"""
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.hedging import hedged_call
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        yield pool
+
+
+def _attempt(result, delay=0.0, started=None, index=None):
+    def run():
+        if started is not None:
+            started.append(index)
+        time.sleep(delay)
+        return result
+    return run
+
+
+def test_fast_primary_is_never_hedged(executor):
+    started = []
+    attempts = [_attempt('primary', 0.0, started, 0), _attempt('mirror', 0.0, started, 1)]
+    assert hedged_call(attempts, lambda i: 0.5, 1, executor) == (0, 'primary')
+    assert started == [0]
+
+
+def test_slow_primary_is_hedged_and_the_mirror_wins(executor):
+    attempts = [_attempt('primary', 1.0), _attempt('mirror', 0.0)]
+    started = time.monotonic()
+    assert hedged_call(attempts, lambda i: 0.05, 1, executor) == (1, 'mirror')
+    assert time.monotonic() - started < 0.5
+
+
+def test_failed_attempt_is_replaced_without_waiting(executor):
+    def broken():
+        raise ConnectionError('down')
+
+    attempts = [broken, _attempt(None), _attempt('third')]
+    started = time.monotonic()
+    assert hedged_call(attempts, lambda i: 5.0, 0, executor) == (2, 'third')
+    assert time.monotonic() - started < 1.0
+
+
+def test_no_answer(executor):
+    assert hedged_call([_attempt(None), _attempt('')], lambda i: 0.01, 1, executor) == (None, None)
+
+
+def test_in_flight_attempts_are_capped(executor):
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def slow():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.1)
+        with lock:
+            running[0] -= 1
+        return None
+
+    hedged_call([slow] * 4, lambda i: 0.01, 1, executor)
+    assert peak[0] <= 2
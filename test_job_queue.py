@@ -0,0 +1,203 @@
+"""Job queue state transitions for both backends"""
+import contextvars
+import os
+import sqlite3
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils import job_queue as jq
+from utils.job_queue import (COMPLETED, FAILED, QUEUED, RUNNING, InMemoryJobQueue, JobFailed,
+                             JobWorkerPool, SQLiteJobQueue, create_job_queue)
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def job_queue(request, tmp_path):
+    return create_job_queue(request.param, str(tmp_path / 'jobs.sqlite3'))
+
+
+def test_default_backend_is_shared_sqlite(tmp_path):
+    assert isinstance(create_job_queue(path=str(tmp_path / 'jobs.sqlite3')), SQLiteJobQueue)
+
+
+def test_queued_running_completed(job_queue):
+    job_id = job_queue.enqueue('extract', {'filepath': 'a.png'})
+    assert job_queue.get(job_id)['status'] == QUEUED
+
+    job = job_queue.claim(timeout=0.1)
+    assert job['id'] == job_id and job['status'] == RUNNING
+    assert job['payload'] == {'filepath': 'a.png'}
+    assert job_queue.get(job_id)['status'] == RUNNING
+    assert job_queue.claim(timeout=0.1) is None
+
+    job_queue.complete(job_id, {'success': True})
+    job = job_queue.get(job_id)
+    assert job['status'] == COMPLETED and job['result'] == {'success': True}
+
+
+def test_fail_keeps_result(job_queue):
+    job_id = job_queue.enqueue('extract', {})
+    job_queue.claim(timeout=0.1)
+    job_queue.fail(job_id, 'no text', {'error': 'no text'})
+    job = job_queue.get(job_id)
+    assert job['status'] == FAILED and job['error'] == 'no text' and job['result'] == {'error': 'no text'}
+
+
+def test_claims_in_fifo_order(job_queue):
+    first = job_queue.enqueue('extract', {'n': 1})
+    time.sleep(0.01)
+    second = job_queue.enqueue('extract', {'n': 2})
+    assert job_queue.claim(timeout=0.1)['id'] == first
+    assert job_queue.claim(timeout=0.1)['id'] == second
+
+
+def test_worker_pool_records_outcomes(job_queue):
+    def extract(job):
+        if job['payload']['ok']:
+            return {'success': True}
+        raise JobFailed('Could not extract', {'error': 'Could not extract'})
+
+    pool = JobWorkerPool(job_queue, {'extract': extract, 'crash': lambda job: 1 / 0}, workers=2)
+    ok = job_queue.enqueue('extract', {'ok': True})
+    bad = job_queue.enqueue('extract', {'ok': False})
+    crash = job_queue.enqueue('crash', {})
+    unknown = job_queue.enqueue('nope', {})
+    pool.start()
+    try:
+        deadline = time.time() + 10
+        while time.time() < deadline and any(
+                job_queue.get(j)['status'] in (QUEUED, RUNNING) for j in (ok, bad, crash, unknown)):
+            time.sleep(0.05)
+    finally:
+        pool.stop()
+
+    assert job_queue.get(ok)['status'] == COMPLETED
+    failed = job_queue.get(bad)
+    assert failed['status'] == FAILED and failed['result'] == {'error': 'Could not extract'}
+    assert job_queue.get(crash)['status'] == FAILED
+    assert 'No handler' in job_queue.get(unknown)['error']
+
+
+def test_memory_queue_expires_finished_jobs(monkeypatch):
+    q = InMemoryJobQueue(ttl_seconds=60)
+    done = q.enqueue('extract', {})
+    q.claim(timeout=0.1)
+    q.complete(done, {})
+    pending = q.enqueue('extract', {})
+
+    now = time.time()
+    monkeypatch.setattr(jq, '_now', lambda: now + 120)
+    assert q.get(done) is None
+    assert q.get(pending)['status'] == QUEUED  # unfinished jobs never expire
+
+
+def test_sqlite_requeues_jobs_of_dead_processes(tmp_path, monkeypatch):
+    path = str(tmp_path / 'jobs.sqlite3')
+    q = SQLiteJobQueue(path)
+    job_id = q.enqueue('extract', {})
+    q.claim(timeout=0.1)
+
+    monkeypatch.setattr(jq, 'pid_alive', lambda pid: False)
+    restarted = SQLiteJobQueue(path)
+    assert restarted.get(job_id)['status'] == QUEUED
+
+
+def test_sqlite_deletes_finished_jobs_after_ttl(tmp_path, monkeypatch):
+    q = SQLiteJobQueue(str(tmp_path / 'jobs.sqlite3'), ttl_seconds=60)
+    done = q.enqueue('extract', {})
+    q.claim(timeout=0.1)
+    q.complete(done, {})
+    pending = q.enqueue('extract', {})
+
+    now = time.time()
+    monkeypatch.setattr(jq, '_now', lambda: now + 120)
+    q.claim(timeout=0)  # claims `pending` and sweeps
+    assert q.get(done) is None
+    assert q.get(pending)['status'] == RUNNING  # unfinished jobs never expire
+
+
+def test_sqlite_requeues_running_jobs_whose_lease_lapsed(tmp_path, monkeypatch):
+    q = SQLiteJobQueue(str(tmp_path / 'jobs.sqlite3'), lease_seconds=300)
+    renewed = q.enqueue('extract', {})
+    lapsed = q.enqueue('extract', {})
+    q.claim(timeout=0)
+    q.claim(timeout=0)
+
+    now = time.time()
+    monkeypatch.setattr(jq, '_now', lambda: now + 200)
+    q.heartbeat(renewed)
+    monkeypatch.setattr(jq, '_now', lambda: now + 400)
+    job = q.claim(timeout=0)
+    assert job['id'] == lapsed and q.get(renewed)['status'] == RUNNING
+    assert q.claim(timeout=0) is None
+
+
+def test_worker_pool_renews_leases_of_long_jobs(tmp_path, monkeypatch):
+    monkeypatch.setattr(SQLiteJobQueue, 'SWEEP_INTERVAL', 0)
+    q = SQLiteJobQueue(str(tmp_path / 'jobs.sqlite3'), lease_seconds=0.3)
+    runs = []
+
+    def slow(job):
+        runs.append(job['id'])
+        time.sleep(1.0)
+        return {}
+
+    pool = JobWorkerPool(q, {'extract': slow}, workers=2)
+    job_id = q.enqueue('extract', {})
+    pool.start()
+    try:
+        deadline = time.time() + 10
+        while time.time() < deadline and q.get(job_id)['status'] != COMPLETED:
+            time.sleep(0.05)
+    finally:
+        pool.stop()
+    assert runs == [job_id]  # the idle worker never picked it up again
+
+
+def test_sqlite_claim_surfaces_lock_error(tmp_path):
+    path = str(tmp_path / 'jobs.sqlite3')
+    q = SQLiteJobQueue(path)
+    q._connect = lambda: _connect_no_wait(path)
+    q.enqueue('extract', {})
+
+    holder = sqlite3.connect(path, isolation_level=None)
+    holder.execute('BEGIN IMMEDIATE')
+    try:
+        with pytest.raises(sqlite3.OperationalError, match='locked'):
+            q.claim(timeout=0.1)
+    finally:
+        holder.execute('ROLLBACK')
+        holder.close()
+
+
+def _connect_no_wait(path):
+    conn = sqlite3.connect(path, timeout=0, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def test_workers_inherit_the_starting_context_and_isolate_jobs():
+    tag = contextvars.ContextVar('tag', default=None)
+    seen = []
+
+    def handler(job):
+        seen.append(tag.get())
+        tag.set(job['payload']['n'])
+        return {}
+
+    q = InMemoryJobQueue()
+    token = tag.set('started')
+    pool = JobWorkerPool(q, {'extract': handler}, workers=1)
+    pool.start()
+    tag.reset(token)
+    try:
+        ids = [q.enqueue('extract', {'n': n}) for n in range(3)]
+        deadline = time.time() + 10
+        while time.time() < deadline and any(q.get(j)['status'] != COMPLETED for j in ids):
+            time.sleep(0.05)
+    finally:
+        pool.stop()
+    assert seen == ['started'] * 3
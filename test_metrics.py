@@ -0,0 +1,51 @@
+"""Multiprocess metrics: totals survive exited workers and reused PIDs"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.metrics import RETIRED_FILE, Registry
+
+DEAD_PID = 2 ** 30  # above any pid_max, so never a live process
+
+
+def _write_worker_file(directory, pid, requests, in_flight, instance='old'):
+    family = {'documentation': '', 'labelnames': [], 'buckets': []}
+    metrics = {
+        'requests_total': dict(family, kind='counter', samples=[[[], requests]]),
+        'in_flight': dict(family, kind='gauge', samples=[[[], in_flight]]),
+    }
+    with open(os.path.join(directory, f'metrics_{pid}.json'), 'w') as f:
+        json.dump({'pid': pid, 'instance': instance, 'metrics': metrics}, f)
+
+
+def _registry(requests, in_flight):
+    registry = Registry()
+    registry.counter('requests_total', '').inc(requests)
+    registry.gauge('in_flight', '').set(in_flight)
+    return registry
+
+
+def test_exited_worker_keeps_counters_drops_gauges(tmp_path):
+    _write_worker_file(str(tmp_path), DEAD_PID, requests=5, in_flight=3)
+    registry = _registry(requests=2, in_flight=1)
+
+    for _ in range(2):  # the retired file is folded in exactly once
+        text = registry.render(str(tmp_path))
+        assert 'requests_total 7' in text
+        assert 'in_flight 1' in text
+    assert not os.path.exists(tmp_path / f'metrics_{DEAD_PID}.json')
+    assert os.path.exists(tmp_path / RETIRED_FILE)
+
+
+def test_reused_pid_does_not_overwrite_dead_workers_counters(tmp_path):
+    # A dead worker had our PID; its file is still there
+    _write_worker_file(str(tmp_path), os.getpid(), requests=5, in_flight=3)
+    registry = _registry(requests=2, in_flight=1)
+
+    registry.flush(str(tmp_path))
+    registry.flush(str(tmp_path))
+    text = registry.render(str(tmp_path))
+    assert 'requests_total 7' in text
+    assert 'in_flight 1' in text
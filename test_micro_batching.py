@@ -0,0 +1,57 @@
+"""Micro-batcher grouping and EasyOCR batch padding"""
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.advanced_ocr_processor import padding_groups
+from utils.micro_batcher import MicroBatcher
+
+
+def test_concurrent_calls_share_one_batch():
+    batches = []
+
+    def double(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher('test', double, max_batch_size=8, max_wait_ms=50)
+    results = {}
+    threads = [threading.Thread(target=lambda n=n: results.update({n: batcher.submit_many([n])[0]}))
+               for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    batcher.close()
+    assert results == {n: n * 2 for n in range(4)}
+    assert len(batches) < 4  # at least some calls were grouped
+
+
+def test_batch_errors_reach_every_caller():
+    def fail(items):
+        raise RuntimeError('model crashed')
+
+    batcher = MicroBatcher('failing', fail, max_batch_size=4, max_wait_ms=1)
+    with pytest.raises(RuntimeError, match='model crashed'):
+        batcher.submit_many([1, 2])
+    batcher.close()
+
+
+def test_padding_groups_keep_similar_sizes_together():
+    shapes = [(1000, 800), (40, 300), (1000, 790), (42, 310), (3000, 3000)]
+    groups = padding_groups(shapes, max_padding=1.3)
+    assert sorted(sorted(group) for group in groups) == [[0, 2], [1, 3], [4]]
+    for group in groups:
+        height = max(shapes[i][0] for i in group)
+        width = max(shapes[i][1] for i in group)
+        assert height * width * len(group) <= 1.3 * sum(shapes[i][0] * shapes[i][1] for i in group)
+
+
+def test_padding_groups_cover_every_image_once():
+    shapes = [(h, w) for h in (50, 400, 1200) for w in (60, 900)]
+    groups = padding_groups(shapes)
+    assert sorted(i for group in groups for i in group) == list(range(len(shapes)))
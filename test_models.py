@@ -0,0 +1,47 @@
+"""Stored per-language translations are reused only for the same text and source language"""
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import db, Document, DocumentTranslation, User
+from utils.translation_cache import text_digest
+
+
+@pytest.fixture
+def document():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        user = User(username='reader', email='reader@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+        document = Document(filename='a.png', original_filename='a.png', file_path='a.png',
+                            extracted_text='Hello world', user_id=user.id)
+        db.session.add(document)
+        db.session.commit()
+        yield document
+
+
+def _store(document, source_language, language, text):
+    db.session.add(DocumentTranslation(document_id=document.id, language=language, source_language=source_language,
+                                       translated_text=text, source_hash=text_digest(document.extracted_text)))
+    db.session.commit()
+
+
+def test_translation_matches_language_text_and_source(document):
+    _store(document, 'en', 'es', 'Hola mundo')
+
+    assert document.translation_for('es').translated_text == 'Hola mundo'
+    assert document.translation_for('es', 'en').translated_text == 'Hola mundo'
+    assert document.translation_for('es', 'fr') is None
+    assert document.translation_for('de') is None
+
+    document.extracted_text = 'Goodbye world'
+    db.session.commit()
+    assert document.translation_for('es') is None  # made from the old text
@@ -0,0 +1,64 @@
+"""Preview uploads: the fast answer, the upgrade job and its status endpoint"""
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import db, Document
+
+
+def _upload(client, name='scan.png'):
+    return client.post('/upload', data={'mode': 'preview', 'file': (io.BytesIO(b'image bytes'), name)},
+                       content_type='multipart/form-data')
+
+
+def _wait_for_job(client, job_id):
+    deadline = time.time() + 10
+    while True:
+        job = client.get(f'/jobs/{job_id}').get_json()
+        if job['status'] not in ('queued', 'running') or time.time() > deadline:
+            return job
+        time.sleep(0.05)
+
+
+def test_preview_answer_is_upgraded_by_the_background_job(app, client):
+    response = _upload(client)
+    assert response.status_code == 200
+    preview = response.get_json()
+    assert preview['result_stage'] == 'preview' and preview['extracted_text'] == 'invoice total due today'
+    assert preview['status_url'] == f"/jobs/{preview['job_id']}"
+
+    job = _wait_for_job(client, preview['job_id'])
+    assert job['status'] == 'completed'
+    assert job['result']['upgraded'] and job['result']['result_stage'] == 'final'
+    assert job['result']['document_id'] == preview['document_id']
+    with app.app_context():
+        document = db.session.get(Document, preview['document_id'])
+        assert document.extracted_text == 'Invoice total due today'
+
+
+def test_preview_stays_when_the_full_extraction_finds_nothing(app, client):
+    preview = _upload(client, name='blank.png').get_json()
+    job = _wait_for_job(client, preview['job_id'])
+    assert job['status'] == 'completed' and job['result']['upgraded'] is False
+    with app.app_context():
+        assert db.session.get(Document, preview['document_id']).extracted_text == 'invoice total due today'
+
+
+def test_jobs_are_private_to_their_owner(app, client):
+    from models import User
+
+    job_id = _upload(client).get_json()['job_id']
+    assert client.get('/jobs/unknown').status_code == 404
+
+    with app.app_context():
+        other = User(username='other', email='other@example.com')
+        other.set_password('secret')
+        db.session.add(other)
+        db.session.commit()
+        other_id = other.id
+    with client.session_transaction() as session:
+        session['_user_id'] = str(other_id)
+    assert client.get(f'/jobs/{job_id}').status_code == 404
@@ -0,0 +1,48 @@
+"""Request profiler modes"""
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.request_profiler import profile_stream, resolve_mode, run_profiled
+
+
+def _busy():
+    return sum(i * i for i in range(200000))
+
+
+def test_sampling_collects_stacks():
+    result, artifacts = run_profiled(_busy, 'sample', interval=0.001)
+    assert result == _busy()
+    assert set(artifacts) == {'folded', 'tree.txt'}
+
+
+@pytest.mark.parametrize('mode, suffixes', [('sample', {'folded', 'tree.txt'}), ('cprofile', {'pstats', 'txt'})])
+def test_stream_is_profiled_until_it_is_closed(mode, suffixes):
+    closed, saved = [], []
+
+    def body():
+        try:
+            yield _busy()
+            yield _busy()
+        finally:
+            closed.append(True)
+
+    chunks = profile_stream(body(), saved.append, mode, interval=0.001)
+    assert next(chunks) == _busy()
+    assert not saved
+    chunks.close()  # client went away
+    assert closed and [set(artifacts) for artifacts in saved] == [suffixes]
+
+
+def test_sampling_falls_back_to_cprofile_under_gevent(monkeypatch):
+    monkey = types.ModuleType('gevent.monkey')
+    monkey.is_module_patched = lambda name: name == 'threading'
+    monkeypatch.setitem(sys.modules, 'gevent.monkey', monkey)
+
+    assert resolve_mode('sample') == 'cprofile'
+    _, artifacts = run_profiled(_busy, 'sample')
+    assert set(artifacts) == {'pstats', 'txt'}
@@ -0,0 +1,94 @@
+"""JSON log records, request ids carried through contextvars, and the queue listener"""
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils import structured_logging
+from utils.structured_logging import (JsonFormatter, begin_job_log, begin_request_log, configure_logging,
+                                      current_request_id, end_request_log, stop_logging)
+
+
+@pytest.fixture
+def json_logs(capsys):
+    """Call to configure JSON logging to the captured stdout; the result stops it and reads the records"""
+    def start():
+        configure_logging('INFO', 'json')
+
+        def read():
+            stop_logging()
+            return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        return read
+
+    yield start
+    stop_logging()
+    end_request_log()
+
+
+def test_formatter_fields():
+    record = logging.LogRecord('main', logging.WARNING, __file__, 1, 'Saved %s', ('doc',), None)
+    record.endpoint = 'main.upload_file'
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        record.exc_info = sys.exc_info()
+
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry['level'] == 'warning' and entry['logger'] == 'main' and entry['msg'] == 'Saved doc'
+    assert entry['endpoint'] == 'main.upload_file'
+    assert entry['ts'].endswith('Z') and 'ZeroDivisionError' in entry['exc']
+
+
+def test_request_id_follows_copied_contexts(json_logs):
+    read_logs = json_logs()
+    log = logging.getLogger('utils.test')
+    request_id = begin_request_log(0, 'req-1')
+    assert request_id == current_request_id() == 'req-1'
+
+    log.warning('in the request')
+    worker = threading.Thread(target=contextvars.copy_context().run, args=(log.warning, 'in a worker'))
+    worker.start()
+    worker.join()
+    end_request_log()
+    log.warning('after the request')
+    begin_job_log(None, 'req-1', job_id='job-9')
+    log.warning('in a job')
+
+    records = {entry['msg']: entry for entry in read_logs()}
+    assert records['in the request']['request_id'] == 'req-1'
+    assert records['in a worker']['request_id'] == 'req-1'
+    assert 'request_id' not in records['after the request']
+    assert records['in a job']['request_id'] == 'req-1'
+
+
+def test_requests_get_fresh_ids():
+    first, second = begin_request_log(), begin_request_log()
+    assert first and second and first != second
+    end_request_log()
+    assert current_request_id() is None
+
+
+def test_listener_starts_once_and_stop_restores_root(json_logs):
+    read_logs = json_logs()
+    root = logging.getLogger()
+    listener = structured_logging._listener
+    assert isinstance(root.handlers[0], logging.handlers.QueueHandler)
+    configure_logging('DEBUG', 'text')  # idempotent: the first configuration stays
+    assert structured_logging._listener is listener and root.level == logging.INFO
+
+    logging.getLogger('main').warning('queued before stop')
+    assert [entry['msg'] for entry in read_logs()] == ['queued before stop']  # stop drains the queue
+    assert structured_logging._listener is None
+    assert not any(isinstance(h, logging.handlers.QueueHandler) for h in root.handlers)
+
+
+def test_responses_carry_the_request_id(client):
+    assert client.get('/metrics', headers={'X-Request-ID': 'edge-42'}).headers['X-Request-ID'] == 'edge-42'
+    generated = client.get('/metrics', headers={'X-Request-ID': 'bad id'}).headers['X-Request-ID']
+    assert generated != 'bad id' and len(generated) == 32
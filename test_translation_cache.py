@@ -0,0 +1,105 @@
+"""Translation cache lookups, TTL expiry and LRU eviction"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils import translation_cache
+from utils.translation_cache import TranslationCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(translation_cache.time, 'time', clock)
+    return clock
+
+
+def _cache(tmp_path, **kwargs):
+    return TranslationCache(str(tmp_path / 'cache.sqlite3'), **kwargs)
+
+
+def test_lookup_ignores_whitespace_and_language_pair(tmp_path, clock):
+    cache = _cache(tmp_path)
+    cache.put('Hello world', 'en', 'es', 'Hola mundo', 'libretranslate')
+
+    assert cache.get('Hello world  \r\n', 'en', 'es') == ('Hola mundo', 'libretranslate')
+    assert cache.get('Hello world', 'en', 'fr') is None
+    assert cache.get_many(['Hello world', 'Goodbye'], 'en', 'es') == {'Hello world': 'Hola mundo'}
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (2, 2, 1)
+
+
+def test_evicts_least_recently_used_past_max_entries(tmp_path, clock):
+    cache = _cache(tmp_path, max_entries=10)
+    for n in range(10):
+        clock.now += 1
+        cache.put(f'text {n}', 'en', 'es', f'texto {n}', 'p')
+    clock.now += 100
+    cache.get('text 0', 'en', 'es')  # 'text 1' is now the least recently used
+    cache.put('text 10', 'en', 'es', 'texto 10', 'p')
+
+    # Past the limit, eviction goes down to 90% of it
+    assert cache.stats()['entries'] == 9
+    assert cache.get('text 1', 'en', 'es') is None and cache.get('text 2', 'en', 'es') is None
+    assert cache.get('text 0', 'en', 'es') and cache.get('text 10', 'en', 'es')
+
+
+def test_evicts_least_recently_used_past_max_bytes(tmp_path, clock):
+    cache = _cache(tmp_path, max_bytes=25)
+    for text in ['a', 'b', 'c']:
+        clock.now += 1
+        cache.put(text, 'en', 'es', text * 10, 'p')
+
+    assert cache.get('a', 'en', 'es') is None
+    assert cache.stats()['size_bytes'] == 20
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = _cache(tmp_path, ttl_seconds=60)
+    cache.put('old', 'en', 'es', 'viejo', 'p')
+    clock.now += 30
+    cache.put('new', 'en', 'es', 'nuevo', 'p')
+    clock.now += 45
+
+    assert cache.get('old', 'en', 'es') is None
+    assert cache.get_many(['old', 'new'], 'en', 'es') == {'new': 'nuevo'}
+    clock.now += 60
+    cache.put('newest', 'en', 'es', 'novísimo', 'p')  # eviction drops expired rows too
+    assert cache.stats()['entries'] == 1
+
+
+def test_hits_refresh_last_use_at_most_every_touch_interval(tmp_path, clock):
+    cache = _cache(tmp_path, max_entries=2, touch_seconds=60)
+    cache.put('one', 'en', 'es', 'uno', 'p')
+    clock.now += 1
+    cache.put('two', 'en', 'es', 'dos', 'p')
+    clock.now += 30
+    cache.get_many(['one'], 'en', 'es')  # too soon to be recorded: 'one' stays the oldest
+    cache.put('three', 'en', 'es', 'tres', 'p')
+    assert cache.get('one', 'en', 'es') is None
+
+
+def test_totals_and_limits_hold_across_instances_and_overwrites(tmp_path, clock):
+    first = _cache(tmp_path, max_entries=50, max_bytes=2000)
+    second = _cache(tmp_path, max_entries=50, max_bytes=2000)
+    for n in range(300):
+        clock.now += 1
+        cache = first if n % 2 else second
+        cache.put_many({f'text {n}': 'x' * (n % 40), f'text {n // 2}': 'y' * 7}, 'en', 'es', 'p')
+
+        entries, size = cache.stats()['entries'], cache.stats()['size_bytes']
+        assert entries <= 50 and size <= 2000
+    with first._connection() as conn:
+        actual = conn.execute('SELECT COUNT(*), SUM(size_bytes) FROM translation_cache').fetchone()
+    assert actual == (first.stats()['entries'], first.stats()['size_bytes'])
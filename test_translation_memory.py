@@ -0,0 +1,67 @@
+"""Sentence segmentation, deduplication and reuse through the translation memory"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.translation_cache import TranslationCache
+from utils.translation_memory import segment, translate_segments
+
+TEXT = 'Invoice total. Paid in full!\n\n  12/03/2024\nInvoice total. Thank you。谢谢'
+
+
+@pytest.fixture
+def memory(tmp_path):
+    return TranslationCache(str(tmp_path / 'memory.sqlite3'))
+
+
+class Provider:
+    """Upper-cases every line it is sent"""
+
+    def __init__(self, reply=None):
+        self.batches = []
+        self.reply = reply
+
+    def __call__(self, batch):
+        self.batches.append(batch)
+        return (self.reply if self.reply is not None else batch.upper()), 'groq'
+
+
+def test_segments_join_back_to_the_text():
+    pieces = segment(TEXT)
+    assert ''.join(piece for _, piece in pieces) == TEXT
+    translatable = [piece for ok, piece in pieces if ok]
+    assert translatable == ['Invoice total.', 'Paid in full!', 'Invoice total.', 'Thank you。', '谢谢']
+    assert (False, '12/03/2024') in pieces  # no letters: kept verbatim
+
+
+def test_repeated_segments_are_sent_once(memory):
+    provider = Provider()
+    translated, stats = translate_segments(TEXT, 'en', 'es', memory, provider)
+
+    assert translated == TEXT.replace('Invoice total.', 'INVOICE TOTAL.').replace(
+        'Paid in full!', 'PAID IN FULL!').replace('Thank you', 'THANK YOU')
+    assert provider.batches == ['Invoice total.\nPaid in full!\nThank you。\n谢谢']
+    assert stats == {'segments': 5, 'unique': 4, 'from_memory': 0, 'sent': 4, 'provider': 'groq'}
+
+
+def test_known_segments_come_from_memory(memory):
+    translate_segments('Invoice total. Paid in full!', 'en', 'es', memory, Provider())
+    provider = Provider()
+    translated, stats = translate_segments('Invoice total. Due today.', 'en', 'es', memory, provider)
+
+    assert translated == 'INVOICE TOTAL. DUE TODAY.'
+    assert provider.batches == ['Due today.']
+    assert (stats['from_memory'], stats['sent']) == (1, 1)
+
+    provider = Provider()
+    assert translate_segments('Paid in full!', 'en', 'es', memory, provider)[1]['provider'] == 'memory'
+    assert provider.batches == []
+
+
+def test_misaligned_reply_falls_back_and_is_not_remembered(memory):
+    translated, stats = translate_segments('One. Two.', 'en', 'es', memory, Provider(reply='UNO DOS'))
+    assert translated is None and stats['misaligned']
+    assert memory.stats()['entries'] == 0
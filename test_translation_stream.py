@@ -0,0 +1,78 @@
+"""Streamed translation events and partial-output scopes"""
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.fake_engines import FakeTranslator
+from conftest import read_events
+from models import db, Document
+from utils.translation_stream import DeltaSink, current_reporter, partial_scope, report_partial
+from utils.workload_capture import WorkloadCapture, load_capture
+
+
+def test_snapshots_become_deltas_and_resets():
+    events = []
+    sink = DeltaSink(lambda event, data: events.append((event, data['text'])))
+    for snapshot in ['Hola', 'Hola mun', 'Hola mun', 'Hola mundo', 'Buenos días', 'Buenos días.']:
+        sink(snapshot)
+
+    assert events == [('delta', 'Hola'), ('delta', ' mun'), ('delta', 'do'),
+                      ('reset', 'Buenos días'), ('delta', '.')]
+
+
+def test_client_replaying_events_ends_with_the_last_snapshot():
+    shown = []
+
+    def client(event, data):
+        if event == 'reset':
+            shown.clear()
+        shown.append(data['text'])
+
+    sink = DeltaSink(client)
+    for snapshot in ['A', 'AB', 'X', 'XY', 'XYZ']:
+        sink(snapshot)
+    assert ''.join(shown) == 'XYZ'
+
+
+def test_scopes_nest_and_follow_copied_contexts():
+    outer = []
+    report_partial('nobody is listening')
+
+    with partial_scope(outer.append):
+        parent = current_reporter()
+        with partial_scope(lambda text: parent('prefix ' + text)):
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                pool.submit(copy_context().run, report_partial, 'from a worker').result()
+        report_partial('direct')
+    assert current_reporter() is None
+    assert outer == ['prefix from a worker', 'direct']
+
+
+def test_streamed_translation_is_captured_and_timed_to_the_end(app, client, user_id, tmp_path, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, 'translator', FakeTranslator(latency_ms=80, cpu_ms=0, jitter=0))
+    capture = WorkloadCapture(str(tmp_path / 'capture'))
+    monkeypatch.setattr(main, 'workload_capture', capture)
+    with app.app_context():
+        document = Document(filename='a.png', original_filename='a.png', file_path='a.png',
+                            extracted_text='hello world', user_id=user_id)
+        db.session.add(document)
+        db.session.commit()
+        document_id = document.id
+
+    response = client.post('/translate/stream', json={'document_id': document_id, 'source_language': 'en',
+                                                      'target_language': 'es'})
+    assert read_events(response)[-1] == ('result', {'success': True, 'translated_text': 'olleh dlrow'})
+    capture.drain()
+
+    [entry] = load_capture(str(tmp_path / 'capture'))
+    assert entry['endpoint'] == 'main.translate_stream' and entry['document_id'] == document_id
+    assert entry['params'] == {'source_language': 'en', 'target_language': 'es'}
+    # The view returns before the translation runs; its stage closes with the stream
+    assert entry['timings']['translate.stream'] >= 80
+    assert 'db.commit' in entry['timings']
+    assert entry['duration_ms'] >= entry['timings']['translate.stream']
@@ -0,0 +1,208 @@
+"""Translator fallbacks against a local stand-in for the free translation APIs"""
+import json
+import os
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.translator import Translator
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    LibreTranslate (/languages, /translate) and MyMemory (/api/get) in one
+    server. Translations upper-case the text; MyMemory rejects any text
+    containing a word listed in `rejected`.
+    """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    rejected = set()
+    libretranslate_status = 200
+    calls = []
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/languages':
+            return self._reply(200, [{'code': 'en'}, {'code': 'es'}])
+        if url.path == '/api/get':
+            q = parse_qs(url.query).get('q', [''])[0]
+            StandInHandler.calls.append(('mymemory', q))
+            if any(word in q for word in StandInHandler.rejected):
+                return self._reply(200, {'responseStatus': 403, 'responseData': {'translatedText': ''}})
+            return self._reply(200, {'responseStatus': 200, 'responseData': {'translatedText': q.upper()}})
+        self._reply(404, {})
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        StandInHandler.calls.append(('libretranslate', payload.get('q', '')))
+        if StandInHandler.libretranslate_status != 200:
+            return self._reply(StandInHandler.libretranslate_status, {'error': 'Visit the portal to get an API key'})
+        self._reply(200, {'translatedText': payload.get('q', '').upper()})
+
+
+@pytest.fixture
+def stand_in():
+    StandInHandler.rejected = set()
+    StandInHandler.libretranslate_status = 200
+    StandInHandler.calls = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+
+
+CONFIGURED_TRANSLATION = """
+import json
+from utils.translator import Translator
+translator = Translator(None)
+translator.health.check_now()
+text, provider = translator._translate('hello world', 'en', 'es')
+print(json.dumps({'text': text, 'provider': provider, 'endpoints': translator.libretranslate_endpoints,
+                  'mymemory': translator.mymemory_url,
+                  'up': {name: state['up'] for name, state in translator.health.snapshot().items()}}))
+"""
+
+
+def test_endpoints_come_from_the_environment(stand_in):
+    env = dict(os.environ, LIBRETRANSLATE_ENDPOINTS=f' {stand_in}/ ', MYMEMORY_URL=stand_in,
+               TRANSLATION_HEDGE_MAX='0')
+    env.pop('GROQ_API_KEY', None)
+    output = subprocess.run([sys.executable, '-c', CONFIGURED_TRANSLATION], env=env, capture_output=True,
+                            text=True, timeout=60, cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+    report = json.loads(output.stdout.strip().splitlines()[-1])
+
+    assert report['endpoints'] == [stand_in]
+    assert report['mymemory'] == stand_in
+    assert report['up'][f'libretranslate:{stand_in}'] and report['up']['mymemory']
+    assert report['text'] == 'HELLO WORLD' and report['provider'] == 'libretranslate'
+
+
+def test_mymemory_never_returns_a_partial_translation(stand_in):
+    translator = Translator(None, libretranslate_endpoints=[stand_in], mymemory_url=stand_in)
+    text = ' '.join(['Sentence number %d is here.' % i for i in range(60)])  # > 500 chars: several requests
+    assert translator._translate_mymemory(text, 'en', 'es') == text.upper()
+
+    StandInHandler.rejected = {'number 59'}
+    assert translator._translate_mymemory(text, 'en', 'es') is None
+
+
+class FakeGroq:
+    """Chat completions that upper-case the text, cut off (finish_reason 'length') past `limit` characters"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.requests = []
+        self.chat = self
+        self.completions = self
+
+    def create(self, messages, max_tokens, stream=False, **kwargs):
+        text = messages[-1]['content'].split('Text to translate:\n', 1)[1].rsplit('\n\nPlease provide', 1)[0]
+        self.requests.append((text, max_tokens))
+        finish_reason = 'length' if len(text) > self.limit else 'stop'
+        content = text.upper()[:self.limit]
+        message = type('Message', (), {'content': content})
+        choice = type('Choice', (), {'message': message, 'finish_reason': finish_reason})
+        return type('Completion', (), {'choices': [choice]})
+
+
+def test_groq_retries_truncated_output_in_pieces():
+    translator = Translator(None)
+    translator.groq_client = FakeGroq(limit=400)
+    text = '\n'.join('Line %d of the document.' % i for i in range(40))  # ~1000 chars
+
+    assert translator._translate_groq(text, 'en', 'es') == text.upper()
+    sent = [text for text, _ in translator.groq_client.requests]
+    assert len(sent[0]) > 400 and len(sent) > 3  # cut off, then halved until the pieces fit
+
+
+def test_groq_truncated_short_text_fails():
+    translator = Translator(None)
+    translator.groq_client = FakeGroq(limit=50)
+    assert translator._translate_groq('A sentence that is longer than fifty characters, surely.', 'en', 'es') is None
+
+
+def test_groq_budget_follows_target_script():
+    translator = Translator(None)
+    translator.groq_client = FakeGroq(limit=10000)
+    translator._translate_groq('x' * 1000, 'en', 'es')
+    translator._translate_groq('x' * 1000, 'en', 'hi')
+    (_, latin), (_, devanagari) = translator.groq_client.requests
+    assert devanagari > latin >= 1000 * 0.5
+    assert Translator._chunk_chars('groq', 'hi') <= Translator._chunk_chars('groq', 'es')
+
+
+class CountingLimiter:
+    def __init__(self, grant=True):
+        self.grant = grant
+        self.acquired = 0
+
+    def acquire(self, timeout=None):
+        self.acquired += 1
+        return self.grant
+
+
+def test_open_circuit_spends_no_rate_limit_token():
+    translator = Translator(None, libretranslate_endpoints=['http://127.0.0.1:9'], mymemory_url='http://127.0.0.1:9')
+    limiter = translator.rate_limiters['mymemory'] = CountingLimiter()
+    breaker = translator.breakers['mymemory']
+    breaker._open()
+
+    calls = []
+    assert translator._call_provider('mymemory', lambda *args: calls.append(args) or 'x', 'hi', 'en', 'es') is None
+    assert limiter.acquired == 0 and not calls
+
+    breaker.opened_at -= breaker.open_seconds  # cool-down over: the next call is the half-open trial
+    limiter.grant = False
+    assert translator._call_provider('mymemory', lambda *args: 'x', 'hi', 'en', 'es') is None
+    assert limiter.acquired == 1 and breaker.allow()  # the unused trial slot was given back
+
+
+def test_refusing_provider_trips_its_circuit(stand_in):
+    translator = Translator(None, libretranslate_endpoints=[stand_in], mymemory_url=stand_in)
+    name = f'libretranslate:{stand_in}'
+    translate = lambda text, src, tgt: translator._translate_libretranslate(stand_in, text, src, tgt)
+    StandInHandler.libretranslate_status = 403
+
+    for _ in range(10):
+        assert translator._call_provider(name, translate, 'hello', 'en', 'es') is None
+    assert translator.breakers[name].state == 'open'
+    assert len(StandInHandler.calls) == translator.breakers[name].min_calls  # then no more requests
+
+
+def test_empty_answers_count_as_failures(stand_in):
+    translator = Translator(None, libretranslate_endpoints=[stand_in], mymemory_url=stand_in)
+    for _ in range(3):
+        assert not translator._call_provider('google', lambda *args: '', 'hello', 'en', 'es')
+    assert translator.breakers['google'].state == 'open'
+
+
+def test_each_thread_gets_its_own_google_client(monkeypatch):
+    module = type(sys)('google_trans_new')
+    module.google_translator = type('google_translator', (), {})
+    monkeypatch.setitem(sys.modules, 'google_trans_new', module)
+    translator = Translator(None)
+
+    clients = [translator._google(), translator._google()]
+    worker = threading.Thread(target=lambda: clients.append(translator._google()))
+    worker.start()
+    worker.join()
+    assert clients[0] is clients[1] and clients[2] is not clients[0]
@@ -0,0 +1,69 @@
+"""/upload/stream: event framing, progress, result and error events"""
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from conftest import read_events
+from models import db, Document
+
+
+def _upload(client, name='scan.png', **form):
+    return client.post('/upload/stream', data=dict(form, file=(io.BytesIO(b'image bytes'), name)),
+                       content_type='multipart/form-data')
+
+
+def test_streams_progress_then_the_saved_result(app, client):
+    response = _upload(client)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    assert response.get_data(as_text=True).endswith('\n\n')
+
+    events = read_events(response)
+    assert [event for event, _ in events] == ['uploaded', 'decoded', 'engine', 'selected', 'result']
+    assert events[0][1] == {'filename': 'scan.png'}
+    result = events[-1][1]
+    assert result['success'] and result['extracted_text'] == 'Invoice total due today'
+
+    with app.app_context():
+        document = db.session.get(Document, result['document_id'])
+        assert document.extracted_text == 'Invoice total due today'
+        assert document.original_filename == 'scan.png' and os.path.exists(document.file_path)
+
+
+def test_preview_is_streamed_before_the_result(client):
+    import main
+
+    main.ocr_processor.full_delay = 0.2  # a preview that loses the race is dropped
+    events = read_events(_upload(client, mode='preview'))
+    names = [event for event, _ in events]
+    assert 'preview' in names and names[-1] == 'result'
+    preview = dict(events)['preview']
+    assert preview['result_stage'] == 'preview' and preview['extracted_text'] == 'invoice total due today'
+
+
+def test_failed_extraction_ends_with_an_error_event(app, client):
+    events = read_events(_upload(client, name='blank.png'))
+    event, payload = events[-1]
+    assert event == 'error' and payload['error'].startswith('Could not extract')
+    with app.app_context():
+        assert Document.query.count() == 0
+
+
+def test_engine_exception_ends_with_an_error_event(client, monkeypatch):
+    import main
+
+    def broken(*args, **kwargs):
+        raise RuntimeError('engine crashed')
+
+    monkeypatch.setattr(main.ocr_processor, 'extract_text', broken)
+    events = read_events(_upload(client))
+    assert events[-1] == ('error', {'error': 'File processing failed: engine crashed'})
+
+
+def test_invalid_uploads_are_rejected_before_streaming(client):
+    response = _upload(client, name='notes.exe')
+    assert response.status_code == 400 and 'Invalid file type' in response.get_json()['error']
+    response = client.post('/upload/stream', data={}, content_type='multipart/form-data')
+    assert response.status_code == 400 and response.get_json()['error'] == 'No file selected'
@@ -0,0 +1,37 @@
+"""Workload capture writes records off the request path"""
+import hashlib
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.workload_capture import WorkloadCapture, blob_path, load_capture
+
+
+def test_writer_hashes_and_stores_in_the_background(tmp_path):
+    capture = WorkloadCapture(str(tmp_path), store_inputs=True)
+    assert capture.submit({'endpoint': 'main.upload_file', 'filename': 'scan.png'}, b'image bytes')
+    capture.drain()
+
+    [entry] = load_capture(str(tmp_path))
+    digest = hashlib.sha256(b'image bytes').hexdigest()
+    assert entry['content_sha256'] == digest and entry['content_bytes'] == 11
+    assert blob_path(str(tmp_path), digest) is not None
+
+
+def test_inputs_off_keeps_only_the_hash(tmp_path):
+    capture = WorkloadCapture(str(tmp_path), store_inputs=False)
+    capture.submit({'endpoint': 'main.upload_file', 'filename_ext': '.png'}, b'image bytes')
+    capture.drain()
+
+    [entry] = load_capture(str(tmp_path))
+    assert 'filename' not in entry and entry['content_sha256']
+    assert blob_path(str(tmp_path), entry['content_sha256']) is None
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    capture = WorkloadCapture(str(tmp_path), queue_size=1)
+    capture._start_writer = lambda: None  # no writer: the queue stays full
+    assert capture.submit({'n': 1})
+    assert not capture.submit({'n': 2})
+    assert capture.dropped == 1
@@ -1,36 +1,75 @@
 import os
+import logging
 import cv2
 import numpy as np
 from PIL import Image, ImageEnhance, ImageFilter
 import io
-from typing import Optional, Tuple, Dict, List
+import tempfile
+from typing import Callable, Optional, Tuple, Dict, List
 # Don't import easyocr at module level - do it lazily
 # import easyocr
 import pytesseract
 from config import Config
 import re
+import threading
+import time
 from collections import Counter
+from functools import lru_cache
+from importlib.util import find_spec
+from utils.micro_batcher import MicroBatcher
+from utils.batch_extraction import iter_batch_extraction
+from utils.engine_router import EngineRouter
+from utils.metrics import timed, ENGINE_RESULTS, MODEL_LOADS, MODEL_CACHE_HITS
+from utils.structured_logging import annotate_request
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=None)
+def module_available(*names: str) -> bool:
+    """True if every module is installed; checked without importing it (cached)"""
+    try:
+        return all(find_spec(name) is not None for name in names)
+    except (ImportError, ValueError):
+        return False
+
+# A batched EasyOCR call pads its images to a common size; images are only
+# grouped while the padded area stays within this factor of their own area
+EASYOCR_MAX_PADDING = 1.3
+
+def padding_groups(shapes: List[Tuple[int, int]], max_padding: float = EASYOCR_MAX_PADDING) -> List[List[int]]:
+    """
+    Split (height, width) shapes into groups of indices that can be padded
+    to one size without the padding exceeding `max_padding` times their
+    total area. Similar sizes end up together; an odd one out runs alone.
+    """
+    groups: List[List[int]] = []
+    for i in sorted(range(len(shapes)), key=lambda i: shapes[i]):
+        if groups:
+            group = groups[-1] + [i]
+            height = max(shapes[j][0] for j in group)
+            width = max(shapes[j][1] for j in group)
+            if height * width * len(group) <= max_padding * sum(h * w for h, w in (shapes[j] for j in group)):
+                groups[-1] = group
+                continue
+        groups.append([i])
+    return groups
+
+# Heavy engines (transformers/torch, paddleocr, easyocr) are imported only
+# when first used; at import time we only check that they are installed.
 
 # TrOCR - Microsoft's best model for handwriting
-try:
-    from transformers import TrOCRProcessor, VisionEncoderDecoderModel
-    import torch
-    TROCR_AVAILABLE = True
-except ImportError as e:
-    TROCR_AVAILABLE = False
-    print(f"[WARN] TrOCR not available: {e}")
+TROCR_AVAILABLE = module_available('transformers', 'torch')
+if not TROCR_AVAILABLE:
+    print("[WARN] TrOCR not available: transformers/torch not installed")
 
 # PaddleOCR - Good alternative
-try:
-    from paddleocr import PaddleOCR
-    PADDLE_AVAILABLE = True
-except ImportError as e:
-    PADDLE_AVAILABLE = False
-    print(f"[WARN] PaddleOCR not available: {e}")
+PADDLE_AVAILABLE = module_available('paddleocr')
+if not PADDLE_AVAILABLE:
+    print("[WARN] PaddleOCR not available: paddleocr not installed")
 
 class AdvancedOCRProcessor:
     def __init__(self):
-        self.processors = []
+        self._processors = []
         
         # Initialize TrOCR (BEST for handwriting) - lazy-load to avoid blocking startup
         self.trocr_processor = None
@@ -57,25 +96,68 @@ class AdvancedOCRProcessor:
         print("[INFO] EasyOCR will be loaded on first use (lazy initialization)")
         # Don't add to processors yet - we'll add it when we actually load it
         
-        # Tesseract - enable as a lightweight fallback
-        if Config.TESSERACT_CMD:
+        # Adaptive routing from recorded engine win-rates and latencies
+        self.router = None
+        if Config.ADAPTIVE_ROUTING:
             try:
-                pytesseract.pytesseract.tesseract_cmd = Config.TESSERACT_CMD
-                self.processors.append(('tesseract', self.extract_with_tesseract))
-                print("[INFO] Tesseract enabled as fallback")
+                self.router = EngineRouter(
+                    path=Config.ROUTER_STATS_PATH or None,
+                    min_samples=Config.ROUTER_MIN_SAMPLES,
+                    min_win_rate=Config.ROUTER_MIN_WIN_RATE,
+                    latency_budget_ms=Config.ROUTER_LATENCY_BUDGET_MS,
+                    exploration_rate=Config.ROUTER_EXPLORATION_RATE
+                )
             except Exception as e:
-                print(f"Tesseract initialization failed: {e}")
+                logger.warning("Adaptive routing disabled: %s", e)
+        
+        # Speed/accuracy knobs (see benchmarks/eval_profiles.py)
+        self.trocr_num_beams = Config.TROCR_NUM_BEAMS
+        self.easyocr_passes = list(Config.EASYOCR_PASSES)
+        self.max_image_side = Config.OCR_MAX_IMAGE_SIDE
+        self.enabled_engines = list(Config.OCR_ENGINES) or None
+        
+        # Micro-batchers in front of the neural engines (created on first use)
+        self._batchers: Dict[str, MicroBatcher] = {}
+        self._batchers_lock = threading.Lock()
+        self._paddle_lock = threading.Lock()  # PaddleOCR's predictors are not thread-safe
+        
+        # Tesseract - lightweight fallback, detected on first use (it runs the binary)
+        self._tesseract_checked = False
+        self._tesseract_lock = threading.Lock()
+    
+    @property
+    def processors(self) -> List[Tuple[str, Callable]]:
+        """Loaded engines as (name, extract function); registers Tesseract on first access"""
+        if not self._tesseract_checked:
+            self._register_tesseract()
+        return self._processors
+    
+    def _register_tesseract(self):
+        with self._tesseract_lock:
+            if self._tesseract_checked:
+                return
+            tesseract_cmd = Config.tesseract_cmd()
+            if tesseract_cmd:
+                try:
+                    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+                    self._processors.insert(0, ('tesseract', self.extract_with_tesseract))
+                    logger.info("Tesseract enabled as fallback")
+                except Exception as e:
+                    logger.warning("Tesseract initialization failed: %s", e)
+            self._tesseract_checked = True
     
     def _load_trocr_on_demand(self):
         """Ensure TrOCR is loaded when needed"""
         if self.trocr_initialized:
+            if self.trocr_processor is not None:
+                MODEL_CACHE_HITS.inc(model='trocr')
             return self.trocr_processor is not None
         return self._load_trocr_immediately()
 
     def _load_trocr_immediately(self):
         """Load TrOCR model immediately"""
         try:
-            print("[INFO] Initializing TrOCR (this may take a moment)...")
+            logger.info("Initializing TrOCR (this may take a moment)")
             from transformers import TrOCRProcessor, VisionEncoderDecoderModel
             import torch
             
@@ -83,31 +165,72 @@ class AdvancedOCRProcessor:
             self.trocr_model = VisionEncoderDecoderModel.from_pretrained('microsoft/trocr-base-handwritten')
             
             self.trocr_initialized = True
-            print("[OK] TrOCR initialized successfully")
+            MODEL_LOADS.inc(model='trocr', outcome='loaded')
+            logger.info("TrOCR initialized")
             return True
         except Exception as e:
-            print(f"[FAIL] TrOCR initialization failed: {e}")
+            MODEL_LOADS.inc(model='trocr', outcome='failed')
+            logger.error("TrOCR initialization failed: %s", e)
             self.trocr_initialized = True  # Mark as tried to avoid loops
             return False
 
     def _load_paddle_on_demand(self):
         """Ensure PaddleOCR is loaded when needed"""
         if self.paddle_initialized:
+            if self.paddle_ocr is not None:
+                MODEL_CACHE_HITS.inc(model='paddle')
             return self.paddle_ocr is not None
             
         try:
-            print("[INFO] Initializing PaddleOCR...")
+            logger.info("Initializing PaddleOCR")
             from paddleocr import PaddleOCR
             # Use English model, light version for speed, with angle classification
             self.paddle_ocr = PaddleOCR(use_angle_cls=True, lang='en', show_log=False)
             self.paddle_initialized = True
-            print("[OK] PaddleOCR initialized successfully")
+            MODEL_LOADS.inc(model='paddle', outcome='loaded')
+            logger.info("PaddleOCR initialized")
             return True
         except Exception as e:
-            print(f"[FAIL] PaddleOCR initialization failed: {e}")
+            MODEL_LOADS.inc(model='paddle', outcome='failed')
+            logger.error("PaddleOCR initialization failed: %s", e)
             self.paddle_initialized = True  # Mark as tried
             return False
     
+    def _get_batcher(self, name: str, batch_fn) -> MicroBatcher:
+        """Get (or lazily create) the micro-batcher for an engine"""
+        batcher = self._batchers.get(name)
+        if batcher is None:
+            with self._batchers_lock:
+                batcher = self._batchers.get(name)
+                if batcher is None:
+                    batcher = MicroBatcher(
+                        name, batch_fn,
+                        max_batch_size=Config.OCR_MAX_BATCH_SIZE,
+                        max_wait_ms=Config.OCR_BATCH_WINDOW_MS
+                    )
+                    self._batchers[name] = batcher
+        return batcher
+    
+    def _run_batched(self, name: str, batch_fn, items: List) -> List:
+        """Run items through an engine's batch function, via the micro-batcher if enabled"""
+        if Config.OCR_MICRO_BATCHING:
+            return self._get_batcher(name, batch_fn).submit_many(items)
+        return [batch_fn([item])[0] for item in items]
+    
+    def get_routing_stats(self) -> Dict:
+        """Recorded per-bucket engine statistics used for adaptive routing"""
+        return {
+            'enabled': self.router is not None,
+            'buckets': self.router.stats() if self.router else {}
+        }
+    
+    def get_batching_stats(self) -> Dict:
+        """Batch-size and queue-wait histograms for each active micro-batcher"""
+        return {
+            'enabled': Config.OCR_MICRO_BATCHING,
+            'engines': {name: batcher.stats() for name, batcher in list(self._batchers.items())}
+        }
+    
     def aggressive_text_cleanup(self, text: str) -> str:
         """EXTREME text cleanup with 150+ correction patterns and spell correction"""
         if not text:
@@ -251,12 +374,13 @@ class AdvancedOCRProcessor:
         text = ' '.join(corrected_words)
         return text
     
+    @timed('preprocess.handwriting')
     def preprocess_for_handwriting(self, image_path: str) -> Image.Image:
         """Optimized preprocessing for handwritten text with enhanced accuracy"""
         try:
             image = Image.open(image_path)
         except Exception as e:
-            print(f"Error loading image: {e}")
+            logger.warning("Error loading image: %s", e)
             return None
         
         try:
@@ -310,7 +434,7 @@ class AdvancedOCRProcessor:
             return processed_image
             
         except Exception as e:
-            print(f"Preprocessing error: {e}")
+            logger.warning("Preprocessing error: %s", e)
             # Return original image as fallback
             return image
         text = re.sub(r'\bThis\b', 'this', text)
@@ -378,12 +502,13 @@ class AdvancedOCRProcessor:
             'word_count': len(text.split())
         }
     
+    @timed('preprocess.printed')
     def preprocess_for_printed(self, image_path: str) -> Image.Image:
         """Optimized preprocessing for printed text"""
         try:
             image = Image.open(image_path)
         except Exception as e:
-            print(f"Error loading image: {e}")
+            logger.warning("Error loading image: %s", e)
             return None
         
         if image.mode != 'RGB':
@@ -405,8 +530,8 @@ class AdvancedOCRProcessor:
         clahe = cv2.createCLAHE(clipLimit=1.5, tileGridSize=(8,8))
         img_array = clahe.apply(img_array)
         
-        # Light Gaussian blur
-        img_array = cv2.GaussianBlur(img_array, (2, 2), 0)
+        # Light Gaussian blur (kernel sides must be odd)
+        img_array = cv2.GaussianBlur(img_array, (3, 3), 0)
         
         # Otsu's thresholding for printed text
         _, binary = cv2.threshold(img_array, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
@@ -418,41 +543,19 @@ class AdvancedOCRProcessor:
         
         return processed_image
     
+    @timed('engine.trocr')
     def extract_with_trocr(self, image_path: str) -> Tuple[str, float]:
         """Extract text with TrOCR"""
         if not self.trocr_processor or not self.trocr_model:
             return "", 0.0
         
         try:
-            print("Processing with TrOCR...")
-            
             original_image = Image.open(image_path).convert("RGB")
             
-            # Process entire image
-            pixel_values = self.trocr_processor(
-                images=original_image,
-                return_tensors="pt"
-            ).pixel_values
+            # Process entire image (batched with concurrent requests)
+            text = self._run_batched('trocr', self._trocr_generate_batch, [original_image])[0]
             
-            # Very conservative generation
-            generated_ids = self.trocr_model.generate(
-                pixel_values,
-                max_length=100,
-                num_beams=10,  # More beams for better results
-                length_penalty=1.0,
-                early_stopping=True,
-                repetition_penalty=2.0,
-                no_repeat_ngram_size=3,
-                temperature=0.3,
-                do_sample=False
-            )
-            
-            text = self.trocr_processor.batch_decode(
-                generated_ids,
-                skip_special_tokens=True
-            )[0].strip()
-            
-            print(f"   TrOCR raw: {text}")
+            logger.debug("TrOCR raw: %s", text)
             
             # Clean up
             text = self.aggressive_text_cleanup(text)
@@ -461,9 +564,38 @@ class AdvancedOCRProcessor:
             return text, confidence
             
         except Exception as e:
-            print(f"TrOCR error: {e}")
+            logger.warning("TrOCR error: %s", e)
             return "", 0.0
     
+    def _trocr_generate_batch(self, images: List[Image.Image]) -> List[str]:
+        """Run one TrOCR forward pass over a batch of images"""
+        # The processor resizes every image to the encoder's fixed input size,
+        # so mixed-size images stack into a single tensor
+        pixel_values = self.trocr_processor(
+            images=images,
+            return_tensors="pt"
+        ).pixel_values
+        
+        # Very conservative generation
+        generated_ids = self.trocr_model.generate(
+            pixel_values,
+            max_length=100,
+            num_beams=self.trocr_num_beams,  # More beams for better results
+            length_penalty=1.0,
+            early_stopping=True,
+            repetition_penalty=2.0,
+            no_repeat_ngram_size=3,
+            temperature=0.3,
+            do_sample=False
+        )
+        
+        texts = self.trocr_processor.batch_decode(
+            generated_ids,
+            skip_special_tokens=True
+        )
+        return [text.strip() for text in texts]
+    
+    @timed('engine.paddle')
     def extract_with_paddle(self, image_path: str) -> Tuple[str, float]:
         """Extract text using PaddleOCR"""
         if not self._load_paddle_on_demand():
@@ -473,9 +605,9 @@ class AdvancedOCRProcessor:
             return "", 0.0
         
         try:
-            print("Processing with PaddleOCR...")
-            
-            result = self.paddle_ocr.ocr(image_path, cls=True)
+            # Not micro-batched: PaddleOCR's detector takes one image per call
+            with self._paddle_lock:
+                result = self.paddle_ocr.ocr(image_path, cls=True)
             
             if not result or not result[0]:
                 return "", 0.0
@@ -492,7 +624,7 @@ class AdvancedOCRProcessor:
                         confidences.append(confidence)
             
             full_text = " ".join(texts)
-            print(f"   PaddleOCR raw: {full_text}")
+            logger.debug("PaddleOCR raw: %s", full_text)
             
             full_text = self.aggressive_text_cleanup(full_text)
             avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
@@ -500,21 +632,24 @@ class AdvancedOCRProcessor:
             return full_text, avg_confidence
             
         except Exception as e:
-            print(f"PaddleOCR error: {e}")
+            logger.warning("PaddleOCR error: %s", e)
             return "", 0.0
     
     def _ensure_easyocr_loaded(self):
         """Lazy-load EasyOCR on first use"""
         if self.easy_reader_init:
+            if self.easy_reader is not None:
+                MODEL_CACHE_HITS.inc(model='easyocr')
             return self.easy_reader is not None
         
         self.easy_reader_init = True
         
         try:
-            print("[INFO] Initializing EasyOCR on first use...")
+            logger.info("Initializing EasyOCR on first use")
             import easyocr  # Import only when needed
             self.easy_reader = easyocr.Reader(['en'], gpu=False, verbose=False)
-            print("[OK] EasyOCR loaded successfully")
+            MODEL_LOADS.inc(model='easyocr', outcome='loaded')
+            logger.info("EasyOCR loaded")
             
             # Add to processors if not already there
             if ('easyocr', self.extract_with_easyocr) not in self.processors:
@@ -522,9 +657,37 @@ class AdvancedOCRProcessor:
             
             return True
         except Exception as e:
-            print(f"[WARN] EasyOCR loading failed: {e}")
+            MODEL_LOADS.inc(model='easyocr', outcome='failed')
+            logger.warning("EasyOCR loading failed: %s", e)
             return False
     
+    def _easyocr_readtext_batch(self, images: List[np.ndarray]) -> List:
+        """
+        Run EasyOCR over a batch of RGB arrays, one detector pass per group
+        of similarly sized images (see padding_groups)
+        """
+        results: List = [None] * len(images)
+        for group in padding_groups([img.shape[:2] for img in images]):
+            if len(group) == 1:
+                results[group[0]] = self.easy_reader.readtext(images[group[0]], detail=1, paragraph=False)
+                continue
+            
+            # readtext_batched needs equal-sized inputs: pad with white to the
+            # group's largest height/width so no image is rescaled
+            height = max(images[i].shape[0] for i in group)
+            width = max(images[i].shape[1] for i in group)
+            padded = []
+            for i in group:
+                canvas = np.full((height, width, 3), 255, dtype=np.uint8)
+                canvas[:images[i].shape[0], :images[i].shape[1]] = images[i]
+                padded.append(canvas)
+            
+            for i, result in zip(group, self.easy_reader.readtext_batched(
+                    padded, n_width=width, n_height=height, detail=1, paragraph=False)):
+                results[i] = result
+        return results
+    
+    @timed('engine.easyocr')
     def extract_with_easyocr(self, image_path: str) -> Tuple[str, float]:
         """Extract text using EasyOCR with multiple preprocessing variants"""
         if not self._ensure_easyocr_loaded():
@@ -532,13 +695,7 @@ class AdvancedOCRProcessor:
         if not self.easy_reader:
             return "", 0.0
 
-        def run_reader(path: str, label: str) -> Tuple[str, float]:
-            try:
-                results = self.easy_reader.readtext(path, detail=1, paragraph=False)
-            except Exception as e:
-                print(f"[WARN] EasyOCR read failed for {label}: {e}")
-                return "", 0.0
-
+        def parse_results(results, label: str) -> Tuple[str, float]:
             if not results:
                 return "", 0.0
 
@@ -558,53 +715,49 @@ class AdvancedOCRProcessor:
 
             full_text = " ".join(texts)
             avg_conf = sum(confidences) / len(confidences) if confidences else 0.0
-            print(f"   [OK] EasyOCR ({label}) extracted {len(texts)} segments, conf={avg_conf:.2f}")
+            logger.debug("EasyOCR (%s) extracted %d segments, conf=%.2f", label, len(texts), avg_conf)
             return full_text, avg_conf
 
         try:
-            print("[INFO] Processing with EasyOCR (multi-pass)...")
-
-            candidates: List[Tuple[str, float, str]] = []
+            # Pass 1: original image, Pass 2: handwriting preprocessing,
+            # Pass 3: printed preprocessing (each selectable via easyocr_passes).
+            # Variants stay in memory and are submitted together so all passes
+            # share one batched detector run.
+            variants: List[Tuple[str, str, np.ndarray]] = []
+            if 'original' in self.easyocr_passes or not self.easyocr_passes:
+                variants.append(("original", "easyocr-original", np.array(Image.open(image_path).convert("RGB"))))
+            for label, name, preprocess in (
+                ("handwriting-prep", "easyocr-handwriting", self.preprocess_for_handwriting),
+                ("printed-prep", "easyocr-printed", self.preprocess_for_printed),
+            ):
+                if name.split('-', 1)[1] not in self.easyocr_passes:
+                    continue
+                try:
+                    prepared = preprocess(image_path)
+                    if prepared is not None:
+                        variants.append((label, name, np.array(prepared.convert("RGB"))))
+                except Exception as e:
+                    logger.warning("EasyOCR %s failed: %s", label, e)
 
-            # Pass 1: original image
-            text_orig, conf_orig = run_reader(image_path, "original")
-            if text_orig:
-                candidates.append((text_orig, conf_orig, "easyocr-original"))
+            if not variants:
+                return "", 0.0
 
-            # Pass 2: handwriting preprocessing
             try:
-                pre_hand = self.preprocess_for_handwriting(image_path)
-                if pre_hand is not None:
-                    temp_hand = "temp_easy_hand.png"
-                    pre_hand.save(temp_hand)
-                    text_hand, conf_hand = run_reader(temp_hand, "handwriting-prep")
-                    if text_hand:
-                        candidates.append((text_hand, conf_hand, "easyocr-handwriting"))
-            finally:
-                if os.path.exists("temp_easy_hand.png"):
-                    try:
-                        os.remove("temp_easy_hand.png")
-                    except Exception:
-                        pass
+                batch_results = self._run_batched(
+                    'easyocr', self._easyocr_readtext_batch, [img for _, _, img in variants]
+                )
+            except Exception as e:
+                logger.warning("EasyOCR read failed: %s", e)
+                batch_results = [None] * len(variants)
 
-            # Pass 3: printed preprocessing
-            try:
-                pre_print = self.preprocess_for_printed(image_path)
-                if pre_print is not None:
-                    temp_print = "temp_easy_print.png"
-                    pre_print.save(temp_print)
-                    text_print, conf_print = run_reader(temp_print, "printed-prep")
-                    if text_print:
-                        candidates.append((text_print, conf_print, "easyocr-printed"))
-            finally:
-                if os.path.exists("temp_easy_print.png"):
-                    try:
-                        os.remove("temp_easy_print.png")
-                    except Exception:
-                        pass
+            candidates: List[Tuple[str, float, str]] = []
+            for (label, name, _), results in zip(variants, batch_results):
+                text, conf = parse_results(results, label)
+                if text:
+                    candidates.append((text, conf, name))
 
             if not candidates:
-                print("   [INFO] EasyOCR: No text detected across passes")
+                logger.debug("EasyOCR: no text detected across passes")
                 return "", 0.0
 
             # Choose the best candidate; also try word voting if multiple
@@ -614,20 +767,17 @@ class AdvancedOCRProcessor:
                 voted = self.word_level_voting(voting_ready)
                 if voted and len(voted.split()) >= max(len(best_text.split()) - 1, 1):
                     best_text = voted
-            print(f"   [TEXT] {best_text[:120]}...")
+            logger.debug("EasyOCR text: %s", best_text[:120])
             return best_text, best_conf
 
         except Exception as e:
-            print(f"[ERROR] EasyOCR extraction error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("EasyOCR extraction error: %s", e)
             return "", 0.0
     
+    @timed('engine.tesseract')
     def extract_with_tesseract(self, image_path: str) -> Tuple[str, float]:
         """Extract text using Tesseract with better error handling"""
         try:
-            print("[INFO] Processing with Tesseract...")
-            
             # Try preprocessing
             try:
                 processed_img = self.preprocess_for_handwriting(image_path)
@@ -642,14 +792,14 @@ class AdvancedOCRProcessor:
             try:
                 text = pytesseract.image_to_string(processed_img, config=custom_config).strip()
             except Exception as e:
-                print(f"[ERROR] Tesseract read error: {e}")
+                logger.error("Tesseract read error: %s", e)
                 return "", 0.0
             
             if not text:
-                print("   [INFO] Tesseract: No text extracted")
+                logger.debug("Tesseract: no text extracted")
                 return "", 0.0
             
-            print(f"   [TEXT] {text[:100]}...")
+            logger.debug("Tesseract text: %s", text[:100])
             
             text = self.aggressive_text_cleanup(text)
             
@@ -664,9 +814,7 @@ class AdvancedOCRProcessor:
             return text, avg_confidence
             
         except Exception as e:
-            print(f"[ERROR] Tesseract error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Tesseract error: %s", e)
             return "", 0.0
     
     def word_level_voting(self, results: List[Tuple[str, str, float]]) -> str:
@@ -677,13 +825,13 @@ class AdvancedOCRProcessor:
         # Split all results into words
         all_words_by_position = []
         
-        max_words = max(len(text.split()) for _, text, _ in results)
+        split_results = [(text.split(), confidence) for _, text, confidence in results]
+        max_words = max(len(words) for words, _ in split_results)
         
         for position in range(max_words):
             words_at_position = []
             
-            for method, text, confidence in results:
-                words = text.split()
+            for words, confidence in split_results:
                 if position < len(words):
                     word = words[position]
                     words_at_position.append((word, confidence))
@@ -706,6 +854,11 @@ class AdvancedOCRProcessor:
     
     def detect_handwriting(self, image_path: str) -> bool:
         """Detect if image contains handwritten text"""
+        features = self._image_features(image_path)
+        return features['is_handwriting'] if features else False
+    
+    def _image_features(self, image_path: str) -> Optional[Dict]:
+        """Cheap image features used for handwriting detection and engine routing"""
         try:
             image = Image.open(image_path).convert('L')
             img_array = np.array(image)
@@ -721,99 +874,175 @@ class AdvancedOCRProcessor:
             # Heuristics: handwriting typically has:
             # - More edges (edge_ratio > 0.05)
             # - Higher variance in strokes
-            is_handwriting = edge_ratio > 0.03 or variance > 100
+            is_handwriting = bool(edge_ratio > 0.03 or variance > 100)
             
-            print(f"[INFO] Handwriting detection - Edge ratio: {edge_ratio:.4f}, Variance: {variance:.2f}, Is handwriting: {is_handwriting}")
-            return is_handwriting
-        except:
-            return False
-    
-    def extract_text(self, image_path: str, force_method: Optional[str] = None) -> Dict:
-        """Extract text using ensemble of methods with handwriting detection"""
-        if not os.path.exists(image_path):
+            logger.debug("Handwriting detection - edge ratio: %.4f, variance: %.2f, is handwriting: %s",
+                         edge_ratio, variance, is_handwriting)
             return {
-                'text': '',
-                'confidence': 0.0,
-                'method': 'none',
-                'error': 'File not found',
-                'quality': 'empty'
+                'width': img_array.shape[1],
+                'height': img_array.shape[0],
+                'edge_ratio': float(edge_ratio),
+                'variance': float(variance),
+                'contrast': float(img_array.std()),
+                'is_handwriting': is_handwriting
             }
+        except:
+            return None
+    
+    def _candidate_engines(self, has_handwriting: bool, force_method: Optional[str] = None) -> List[str]:
+        """Engines that could run for this image, in priority order (no models are loaded)"""
+        candidates = []
+        if has_handwriting and TROCR_AVAILABLE:
+            candidates.append('trocr')
+        if PADDLE_AVAILABLE:
+            candidates.append('paddle')
+        if not self.easy_reader_init or self.easy_reader is not None:
+            candidates.append('easyocr')
+        for name, _ in self.processors:
+            if force_method and name != force_method:
+                continue
+            if name not in candidates:
+                candidates.append(name)
+        if self.enabled_engines is not None:
+            candidates = [name for name in candidates if name in self.enabled_engines]
+        return candidates
+    
+    def _engine_plan(self, has_handwriting: bool, force_method: Optional[str] = None,
+                     allowed: Optional[List[str]] = None) -> List[Tuple[str, Callable]]:
+        """Decide which engines to run, in order, loading models on demand"""
+        plan = []
         
-        print(f"\nProcessing: {os.path.basename(image_path)}")
-        print("="*60)
-        
-        # Detect if image has handwriting
-        has_handwriting = self.detect_handwriting(image_path)
-        
-        results = []
+        def wanted(name):
+            if self.enabled_engines is not None and name not in self.enabled_engines:
+                return False
+            return allowed is None or name in allowed
         
         # If handwriting detected, try TrOCR first
-        if has_handwriting and TROCR_AVAILABLE:
-            print("[INFO] Handwriting detected - attempting TrOCR first...")
+        if has_handwriting and TROCR_AVAILABLE and wanted('trocr'):
+            logger.debug("Handwriting detected - attempting TrOCR first")
             if self._load_trocr_on_demand():
-                try:
-                    text, confidence = self.extract_with_trocr(image_path)
-                    if text and len(text) > 3:
-                        results.append(('trocr', text, confidence))
-                        print(f"[OK] TrOCR: {text[:80]}...")
-                        print(f"      Confidence: {confidence:.2%}\n")
-                except Exception as e:
-                    print(f"[WARN] TrOCR failed: {e}\n")
+                plan.append(('trocr', self.extract_with_trocr))
         
         # Try PaddleOCR (Excellent for both handwriting and printed)
-        if PADDLE_AVAILABLE:
-            if self._load_paddle_on_demand():
-                try:
-                    text, confidence = self.extract_with_paddle(image_path)
-                    if text and len(text) > 3:
-                        results.append(('paddle', text, confidence))
-                        print(f"[OK] PaddleOCR: {text[:80]}...")
-                        print(f"      Confidence: {confidence:.2%}\n")
-                except Exception as e:
-                    print(f"[FAIL] PaddleOCR: {e}\n")
+        if PADDLE_AVAILABLE and wanted('paddle') and self._load_paddle_on_demand():
+            plan.append(('paddle', self.extract_with_paddle))
         
         # Try EasyOCR next (most reliable)
-        if 'easyocr' not in [n for n, _ in self.processors]:
-            # EasyOCR not in processors yet, try to add it
-            if self._ensure_easyocr_loaded():
-                try:
-                    text, confidence = self.extract_with_easyocr(image_path)
-                    if text and len(text) > 3:
-                        results.append(('easyocr', text, confidence))
-                        print(f"[OK] EasyOCR: {text[:80]}...")
-                        print(f"      Confidence: {confidence:.2%}\n")
-                except Exception as e:
-                    print(f"[FAIL] EasyOCR: {e}\n")
-        else:
-            # EasyOCR already in processors
-            try:
-                text, confidence = self.extract_with_easyocr(image_path)
-                if text and len(text) > 3:
-                    results.append(('easyocr', text, confidence))
-                    print(f"[OK] EasyOCR: {text[:80]}...")
-                    print(f"      Confidence: {confidence:.2%}\n")
-            except Exception as e:
-                print(f"[FAIL] EasyOCR: {e}\n")
+        if wanted('easyocr') and self._ensure_easyocr_loaded():
+            plan.append(('easyocr', self.extract_with_easyocr))
         
         # Run other available OCR methods
         for name, method in self.processors:
             if force_method and name != force_method:
                 continue
             
-            if name == 'easyocr' or name == 'trocr':  # Already tried
+            if name == 'easyocr' or name == 'trocr':  # Already planned
                 continue
             
+            if wanted(name):
+                plan.append((name, method))
+        
+        return plan
+    
+    @timed('ocr.extract_text')
+    def extract_text(self, image_path: str, force_method: Optional[str] = None,
+                     progress_callback: Optional[Callable[[str, Dict], None]] = None) -> Dict:
+        """
+        Extract text using ensemble of methods with handwriting detection
+        
+        progress_callback(event, data), if given, is called as extraction
+        proceeds: 'decoded', 'routing', one 'engine' per engine run and
+        'selected' with the chosen result.
+        """
+        # Optionally run every engine on a downscaled copy of large images
+        if self.max_image_side and os.path.exists(image_path):
+            scaled_path = self._downscaled_copy(image_path, self.max_image_side, only_if_larger=True)
+            if scaled_path:
+                try:
+                    return self._extract_text(scaled_path, force_method, progress_callback)
+                finally:
+                    os.remove(scaled_path)
+        return self._extract_text(image_path, force_method, progress_callback)
+    
+    def _downscaled_copy(self, image_path: str, max_side: int, only_if_larger: bool = False) -> Optional[str]:
+        """Write a copy of the image shrunk to fit max_side; returns its temp path"""
+        with Image.open(image_path) as image:
+            if only_if_larger and max(image.size) <= max_side:
+                return None
+            image = image.convert('RGB')
+            image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)  # Only ever shrinks
+            fd, scaled_path = tempfile.mkstemp(prefix='scaled_', suffix='.png')
+            os.close(fd)
+            image.save(scaled_path)
+        return scaled_path
+    
+    def _extract_text(self, image_path: str, force_method: Optional[str],
+                      progress_callback: Optional[Callable[[str, Dict], None]]) -> Dict:
+        emit = progress_callback or (lambda event, data: None)
+        
+        if not os.path.exists(image_path):
+            return {
+                'text': '',
+                'confidence': 0.0,
+                'method': 'none',
+                'error': 'File not found',
+                'quality': 'empty'
+            }
+        
+        try:
+            # Header only: the size and format are known without decoding the
+            # pixels, which the preprocessing steps below do themselves
+            with timed('ocr.header'), Image.open(image_path) as image:
+                emit('decoded', {'width': image.width, 'height': image.height, 'format': image.format})
+        except Exception as e:
+            emit('decoded', {'error': str(e)})
+        
+        # Detect if image has handwriting
+        with timed('ocr.analyze'):
+            features = self._image_features(image_path)
+        has_handwriting = features['is_handwriting'] if features else False
+        
+        # Route to the engines likely to win for this kind of image
+        bucket = EngineRouter.bucket_for(features)
+        allowed, route_reason = None, 'all'
+        if self.router and not force_method:
+            allowed, route_reason = self.router.route(bucket, self._candidate_engines(has_handwriting))
+            logger.debug("Routing (%s, bucket=%s): %s", route_reason, bucket, ', '.join(allowed))
+        
+        plan = self._engine_plan(has_handwriting, force_method, allowed)
+        emit('routing', {'handwriting': bool(has_handwriting), 'engines': [name for name, _ in plan],
+                         'bucket': bucket, 'reason': route_reason})
+        
+        results = []
+        outcomes = []
+        
+        for name, method in plan:
+            started = time.perf_counter()
             try:
                 text, confidence = method(image_path)
-                
-                if text and len(text) > 3:
-                    results.append((name, text, confidence))
-                    print(f"[OK] {name.upper()}: {text[:80]}...")
-                    print(f"      Confidence: {confidence:.2%}\n")
             except Exception as e:
-                print(f"[FAIL] {name}: {e}\n")
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                outcomes.append({'engine': name, 'latency_ms': elapsed_ms, 'confidence': 0.0})
+                ENGINE_RESULTS.inc(engine=name, outcome='failure')
+                logger.warning("Engine %s failed: %s", name, e)
+                emit('engine', {'engine': name, 'text': '', 'confidence': 0.0,
+                                'elapsed_ms': elapsed_ms, 'error': str(e)})
+                continue
+            
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            outcomes.append({'engine': name, 'latency_ms': elapsed_ms, 'confidence': float(confidence or 0.0)})
+            if text and len(text) > 3:
+                ENGINE_RESULTS.inc(engine=name, outcome='success')
+                results.append((name, text, confidence))
+                logger.debug("%s: %s (confidence %.2f)", name, text[:80], confidence)
+            else:
+                ENGINE_RESULTS.inc(engine=name, outcome='empty')
+            emit('engine', {'engine': name, 'text': text or '', 'confidence': float(confidence or 0.0),
+                            'elapsed_ms': elapsed_ms})
         
         if not results:
+            if self.router and not force_method and outcomes:
+                self.router.record(bucket, outcomes, winner=None)
             return {
                 'text': 'Could not extract text. Please ensure the image has clear, readable text.',
                 'confidence': 0.0,
@@ -825,16 +1054,19 @@ class AdvancedOCRProcessor:
         
         # Intelligent result selection with validation
         best_result = self._select_best_result_with_validation(results)
+        if self.router and not force_method:
+            self.router.record(bucket, outcomes, winner=best_result['method'])
         
         # Final processing
-        final_text = self.aggressive_text_cleanup(best_result['text'])
-        final_text = self.post_process_text(final_text)
-        
-        # Validate extracted text
-        validation = self._validate_extraction(final_text, image_path)
-        
-        # Quality analysis
-        quality_details = self.detect_text_quality(final_text)
+        with timed('ocr.cleanup'):
+            final_text = self.aggressive_text_cleanup(best_result['text'])
+            final_text = self.post_process_text(final_text)
+            
+            # Validate extracted text
+            validation = self._validate_extraction(final_text, image_path)
+            
+            # Quality analysis
+            quality_details = self.detect_text_quality(final_text)
         
         # Boost confidence if validation passes
         final_confidence = best_result['confidence']
@@ -843,15 +1075,16 @@ class AdvancedOCRProcessor:
         else:
             final_confidence = final_confidence * 0.7
         
-        print("="*60)
-        print(f"[RESULT] Method: {best_result['method'].upper()}")
-        print(f"[TEXT] {final_text[:100]}...")
-        print(f"[CONF] {final_confidence:.1%}")
-        print(f"[WORDS] {len(final_text.split())}")
-        print(f"[QUALITY] {quality_details['quality'].upper()}")
-        if quality_details['issues']:
-            print(f"[ISSUES] {', '.join(quality_details['issues'])}")
-        print("="*60 + "\n")
+        logger.debug("Result for %s: method=%s confidence=%.2f words=%d quality=%s issues=%s",
+                     os.path.basename(image_path), best_result['method'], final_confidence,
+                     len(final_text.split()), quality_details['quality'], quality_details['issues'])
+        annotate_request(ocr_method=best_result['method'], ocr_engines=[name for name, _ in plan],
+                         ocr_route=route_reason, ocr_bucket=bucket,
+                         ocr_confidence=round(float(final_confidence), 3),
+                         ocr_quality=quality_details['quality'])
+        
+        emit('selected', {'method': best_result['method'], 'text': final_text,
+                          'confidence': float(final_confidence), 'quality': quality_details['quality']})
         
         return {
             'text': final_text,
@@ -864,6 +1097,54 @@ class AdvancedOCRProcessor:
             'validation': validation
         }
     
+    def extract_preview(self, image_path: str, max_side: Optional[int] = None) -> Optional[Dict]:
+        """
+        Cheap first-pass result: Tesseract only, on a downscaled copy of the
+        image. Returns None when Tesseract is not available.
+        """
+        if 'tesseract' not in [name for name, _ in self.processors]:
+            return None
+        
+        max_side = max_side or Config.PREVIEW_MAX_SIDE
+        preview_path = None
+        try:
+            preview_path = self._downscaled_copy(image_path, max_side)
+            text, confidence = self.extract_with_tesseract(preview_path)
+        except Exception as e:
+            logger.warning("Preview extraction failed: %s", e)
+            return None
+        finally:
+            if preview_path and os.path.exists(preview_path):
+                os.remove(preview_path)
+        
+        text = self.post_process_text(text)
+        quality_details = self.detect_text_quality(text)
+        return {
+            'text': text,
+            'confidence': confidence,
+            'method': 'tesseract',
+            'quality': quality_details['quality'],
+            'quality_details': quality_details,
+            'text_type': self._detect_text_type(text),
+            'result_stage': 'preview'
+        }
+    
+    def extract_text_batch(self, paths_or_buffers, force_method: Optional[str] = None,
+                           prefetch: int = 4, workers: int = 4, ordered: bool = True):
+        """
+        Extract text from many images, yielding one result dict per input.
+        
+        Inputs may be file paths or in-memory buffers (bytes / file-like).
+        Inputs are validated ahead of the workers (each engine still decodes
+        its own input), and concurrent workers share the neural-engine
+        micro-batches. Results come back in input order, or as
+        they complete with ordered=False; each carries 'index' and 'source'.
+        """
+        return iter_batch_extraction(
+            self.extract_text, paths_or_buffers, force_method=force_method,
+            prefetch=prefetch, workers=workers, ordered=ordered
+        )
+    
     def _validate_extraction(self, text: str, image_path: str) -> dict:
         """Validate if extraction looks reasonable"""
         issues = []
@@ -949,12 +1230,15 @@ class AdvancedOCRProcessor:
         # Select best
         best = max(scored_results, key=lambda x: x['combined_score'])
         
-        print("[INFO] Result Selection Scores:")
-        for result in sorted(scored_results, key=lambda x: x['combined_score'], reverse=True):
-            print(f"   {result['method']}: {result['combined_score']:.2f} (words={result['word_count']}, quality={result['quality_score']:.0f}, garbage={result['garbage_score']:.0f})")
+        if logger.isEnabledFor(logging.DEBUG):
+            for result in sorted(scored_results, key=lambda x: x['combined_score'], reverse=True):
+                logger.debug("Selection score %s: %.2f (words=%d, quality=%.0f, garbage=%.0f)",
+                             result['method'], result['combined_score'], result['word_count'],
+                             result['quality_score'], result['garbage_score'])
         
         return best
     
+    @timed('ocr.select_best')
     def _select_best_result_with_validation(self, results: List[Tuple[str, str, float]]) -> Dict:
         """Select best result and validate it"""
         best = self._select_best_result(results)
@@ -964,13 +1248,13 @@ class AdvancedOCRProcessor:
         
         # If validation fails and we have alternatives, try next best
         if not validation['is_valid'] and len(results) > 1:
-            print("[WARN] Best result failed validation, trying alternatives...")
+            logger.debug("Best result failed validation, trying alternatives")
             for alt_result in results:
                 if alt_result[0] != best['method']:
                     alt_text = self.aggressive_text_cleanup(alt_result[1])
                     alt_validation = self._validate_extraction(alt_text, '')
                     if alt_validation['is_valid']:
-                        print(f"[OK] Alternative {alt_result[0]} is valid")
+                        logger.debug("Alternative %s is valid", alt_result[0])
                         best['text'] = alt_text
                         best['method'] = alt_result[0]
                         best['confidence'] = alt_result[2]
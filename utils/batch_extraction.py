@@ -0,0 +1,129 @@
+"""
+Batch extraction over many images
+Shared by AdvancedOCRProcessor and LightweightOCRProcessor.extract_text_batch
+"""
+import io
+import os
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from PIL import Image
+
+ImageSource = Union[str, os.PathLike, bytes, bytearray, io.IOBase]
+
+
+def _describe(source) -> str:
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    return getattr(source, 'name', None) or '<buffer>'
+
+
+def _materialize(source) -> Tuple[str, bool]:
+    """
+    Validation prefetch for one input: check that it is an image (verify()
+    walks the file without decoding pixels) and, for in-memory buffers,
+    spill it to a temp file the engines can open. The engines still decode
+    the image themselves from the path, so for files this only rejects
+    bad inputs before they take an extraction worker. Returns (path, is_temp).
+    """
+    if isinstance(source, (str, os.PathLike)):
+        path = os.fspath(source)
+        with Image.open(path) as img:
+            img.verify()
+        return path, False
+
+    data = bytes(source) if isinstance(source, (bytes, bytearray)) else source.read()
+    with Image.open(io.BytesIO(data)) as img:
+        img.verify()
+    fd, path = tempfile.mkstemp(prefix='ocr_batch_', suffix='.img')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    return path, True
+
+
+def _extract_one(extract_fn: Callable[..., Dict], index: int, source, loaded,
+                 force_method: Optional[str]) -> Dict:
+    path, is_temp = None, False
+    try:
+        path, is_temp = loaded.result()
+        result = extract_fn(path, force_method=force_method)
+    except Exception as e:
+        result = {
+            'text': '',
+            'confidence': 0.0,
+            'method': 'none',
+            'error': f'Could not process input: {e}',
+            'quality': 'empty'
+        }
+    finally:
+        if is_temp and path and os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    result['index'] = index
+    result['source'] = _describe(source)
+    return result
+
+
+def iter_batch_extraction(extract_fn: Callable[..., Dict], inputs: Iterable[ImageSource],
+                          force_method: Optional[str] = None, prefetch: int = 4,
+                          workers: int = 4, ordered: bool = True) -> Iterator[Dict]:
+    """
+    Run `extract_fn` over `inputs` and yield one result dict per input.
+
+    A loader thread validates up to `prefetch` inputs ahead (and spills
+    buffers to temp files) while `workers` threads run extraction; each
+    engine decodes its own input, so decoding is not overlapped. Concurrent
+    workers let neural-engine calls from different images land in the same
+    micro-batch. At most `prefetch + workers` inputs are held at once
+    (including finished results waiting for their turn when `ordered` is
+    True). Each result carries its input `index` and `source`.
+    """
+    prefetch = max(1, int(prefetch))
+    workers = max(1, int(workers))
+    window = prefetch + workers
+
+    pending = enumerate(inputs)
+    in_flight: Dict[int, Tuple[Future, Future]] = {}
+    loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ocr-batch-load')
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ocr-batch')
+
+    def fill():
+        while len(in_flight) < window:
+            try:
+                index, source = next(pending)
+            except StopIteration:
+                return
+            loaded = loader.submit(_materialize, source)
+            task = pool.submit(_extract_one, extract_fn, index, source, loaded, force_method)
+            in_flight[index] = (task, loaded)
+
+    try:
+        fill()
+        next_index = 0
+        while in_flight:
+            if ordered:
+                result = in_flight.pop(next_index)[0].result()
+                next_index += 1
+                fill()
+                yield result
+            else:
+                done, _ = wait([task for task, _ in in_flight.values()],
+                               return_when=FIRST_COMPLETED)
+                finished = sorted(i for i, (task, _) in in_flight.items() if task in done)
+                results = [in_flight.pop(i)[0].result() for i in finished]
+                fill()
+                yield from results
+    finally:
+        # Stop scheduling new work if the caller abandons the generator early
+        pool.shutdown(wait=True, cancel_futures=True)
+        loader.shutdown(wait=True, cancel_futures=True)
+        for task, loaded in in_flight.values():
+            if (task.cancelled() and loaded.done() and not loaded.cancelled()
+                    and loaded.exception() is None):
+                path, is_temp = loaded.result()
+                if is_temp and os.path.exists(path):
+                    os.remove(path)
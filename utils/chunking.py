@@ -0,0 +1,120 @@
+"""
+Boundary-aware chunking for long translations
+Text longer than a provider's limit is cut at paragraph breaks where
+possible, then line breaks, then sentence ends, then spaces; only a single
+word longer than the limit is cut mid-word. Chunks are translated
+concurrently and rejoined in order with the original separators, and only
+chunks that failed are retried. A token bucket per provider keeps the
+concurrent calls under its rate limit.
+"""
+import contextvars
+import re
+import threading
+import time
+from concurrent.futures import Executor, as_completed
+from typing import Callable, List, Optional, Tuple
+
+from utils.translation_memory import SENTENCE_BREAK
+
+# Preferred cut points, best first
+BOUNDARIES = [
+    re.compile(r'(\s*\n[ \t]*\n\s*)'),    # paragraph
+    re.compile(r'([ \t]*\n\s*)'),         # line
+    re.compile(f'({SENTENCE_BREAK.pattern})'),
+    re.compile(r'(\s+)'),                 # word
+]
+
+
+def split_chunks(text: str, max_chars: int, level: int = 0) -> List[Tuple[str, str]]:
+    """
+    (chunk, separator) pairs with chunks of at most max_chars, where
+    ''.join(chunk + separator) == text. Neighbouring pieces are packed
+    together up to the limit at each boundary level before falling back
+    to the next, finer one.
+    """
+    if len(text) <= max_chars:
+        return [(text, '')]
+    if level == len(BOUNDARIES):
+        return [(text[i:i + max_chars], '') for i in range(0, len(text), max_chars)]
+
+    parts = BOUNDARIES[level].split(text)
+    pairs = [(parts[i], parts[i + 1] if i + 1 < len(parts) else '') for i in range(0, len(parts), 2)]
+
+    chunks: List[Tuple[str, str]] = []
+    current, current_sep = None, ''
+    for piece, sep in pairs:
+        if len(piece) > max_chars:
+            if current is not None:
+                chunks.append((current, current_sep))
+                current = None
+            sub = split_chunks(piece, max_chars, level + 1)
+            chunks.extend(sub[:-1])
+            chunks.append((sub[-1][0], sub[-1][1] + sep))
+            continue
+        if current is not None and len(current) + len(current_sep) + len(piece) > max_chars:
+            chunks.append((current, current_sep))
+            current = None
+        current = piece if current is None else current + current_sep + piece
+        current_sep = sep
+    if current is not None:
+        chunks.append((current, current_sep))
+    return chunks
+
+
+def translate_chunks(chunks: List[str], translate: Callable[[int, str], Optional[str]], executor: Executor,
+                     retries: int = 1,
+                     on_result: Optional[Callable[[int, str], None]] = None) -> List[Optional[str]]:
+    """
+    Translate chunks concurrently with translate(index, chunk); results are
+    in chunk order, and on_result(index, result) is called as each chunk
+    succeeds. Chunks with no letters are passed through. Failed chunks
+    (None, empty or raised) are retried up to `retries` more times;
+    still-failed ones stay None.
+    """
+    results: List[Optional[str]] = [None] * len(chunks)
+    todo = []
+    for i, chunk in enumerate(chunks):
+        if any(ch.isalpha() for ch in chunk):
+            todo.append(i)
+        else:
+            results[i] = chunk
+            if on_result is not None:
+                on_result(i, chunk)
+
+    for _ in range(1 + retries):
+        if not todo:
+            break
+        # Each task runs in a copy of the caller's context so stage timings still land
+        futures = {executor.submit(contextvars.copy_context().run, translate, i, chunks[i]): i for i in todo}
+        for future in as_completed(futures):
+            i = futures[future]
+            results[i] = (future.result() or None) if future.exception() is None else None
+            if results[i] is not None and on_result is not None:
+                on_result(i, results[i])
+        todo = [i for i in todo if results[i] is None]
+    return results
+
+
+class TokenBucket:
+    """Allows `rate` calls per second on average, with bursts of up to `burst`"""
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Take a token, waiting for one if needed; False if that would exceed `timeout` seconds"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if timeout is not None and wait > timeout:
+                return False
+            self._tokens -= 1  # reserved now; callers behind us wait longer
+        if wait:
+            time.sleep(wait)
+        return True
@@ -0,0 +1,146 @@
+"""
+Circuit breakers and latency/success scores for remote providers
+A breaker opens when too many recent calls failed or were too slow; while
+open, calls are refused without touching the network. After a cool-down
+it lets a single trial call through (half-open) and closes again if that
+call succeeds.
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Failure-rate breaker over the last `window` calls. A call counts as
+    failed when it raised or returned an error, or when it took longer
+    than `slow_call_ms`.
+    """
+
+    def __init__(self, name: str, failure_rate: float = 0.5, window: int = 20, min_calls: int = 3,
+                 open_seconds: float = 30.0, slow_call_ms: Optional[float] = None):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.slow_call_ms = slow_call_ms
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+        self._outcomes = deque(maxlen=window)  # True = failed
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (claims the trial slot when half-open)"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    return False
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def release(self):
+        """Give back the trial slot claimed by allow() for a call that never went out"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._trial_in_flight = False
+
+    def record(self, success: bool, latency_ms: Optional[float] = None) -> bool:
+        """Record a call's outcome; returns whether it counted as a failure"""
+        failed = not success or (self.slow_call_ms is not None and latency_ms is not None
+                                 and latency_ms > self.slow_call_ms)
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._trial_in_flight = False
+                if failed:
+                    self._open()
+                else:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                return failed
+
+            self._outcomes.append(failed)
+            if (self.state == CLOSED and len(self._outcomes) >= self.min_calls
+                    and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate):
+                self._open()
+        return failed
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.times_opened += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            recent = len(self._outcomes)
+            return {
+                'state': self.state,
+                'recent_calls': recent,
+                'recent_failure_rate': round(sum(self._outcomes) / recent, 3) if recent else None,
+                'times_opened': self.times_opened,
+                'retry_in_seconds': (round(max(0.0, self.open_seconds - (time.monotonic() - self.opened_at)), 1)
+                                     if self.state == OPEN else None),
+            }
+
+
+class ProviderScore:
+    """
+    Exponentially weighted latency and success rate of a provider.
+    expected_ms() is the expected time to a successful answer
+    (latency / success rate): lower is better.
+    """
+
+    def __init__(self, alpha: float = 0.2, window: int = 100):
+        self.alpha = alpha
+        self.latency_ms: Optional[float] = None
+        self.success: Optional[float] = None
+        self.calls = 0
+        self._recent = deque(maxlen=window)  # latencies of successful calls
+        self._lock = threading.Lock()
+
+    def observe(self, latency_ms: float, success: bool):
+        with self._lock:
+            self.calls += 1
+            if success:
+                self._recent.append(latency_ms)
+            if self.latency_ms is None:
+                self.latency_ms, self.success = latency_ms, float(success)
+                return
+            self.latency_ms += self.alpha * (latency_ms - self.latency_ms)
+            self.success += self.alpha * (float(success) - self.success)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q-quantile of recent successful-call latency; None without history"""
+        with self._lock:
+            if not self._recent:
+                return None
+            ordered = sorted(self._recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def expected_ms(self) -> Optional[float]:
+        """None until the provider has been called"""
+        with self._lock:
+            if self.latency_ms is None:
+                return None
+            return self.latency_ms / max(self.success, 0.05)
+
+    def snapshot(self) -> Dict:
+        expected, p90 = self.expected_ms(), self.percentile(0.9)
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'ewma_latency_ms': round(self.latency_ms, 1) if self.latency_ms is not None else None,
+                'ewma_success': round(self.success, 3) if self.success is not None else None,
+                'expected_ms': round(expected, 1) if expected is not None else None,
+                'p90_ms': round(p90, 1) if p90 is not None else None,
+            }
@@ -0,0 +1,205 @@
+"""
+Adaptive OCR engine routing
+Learns, per bucket of cheap image features, how often each engine wins
+result selection and how long it takes, then routes new requests only to
+engines with a real chance of winning within a latency budget.
+"""
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class EngineRouter:
+    """
+    Win-rate / latency statistics per (feature bucket, engine).
+
+    Win rates only count "contests" - requests where at least two engines
+    ran - so an engine is never credited for winning alone. Until every
+    candidate has `min_samples` contests in a bucket, and on a random
+    `exploration_rate` share of requests afterwards, all engines run.
+
+    The statistics file at `path` is only created by the first record(),
+    so constructing a router (importing the app) writes nothing to disk.
+    """
+
+    def __init__(self, path: Optional[str] = None, min_samples: int = 20,
+                 min_win_rate: float = 0.1, latency_budget_ms: float = 10000.0,
+                 exploration_rate: float = 0.05, refresh_seconds: float = 30.0,
+                 rng: Optional[random.Random] = None):
+        self.path = path
+        self.min_samples = min_samples
+        self.min_win_rate = min_win_rate
+        self.latency_budget_ms = latency_budget_ms
+        self.exploration_rate = exploration_rate
+        self.refresh_seconds = refresh_seconds
+        self.rng = rng or random.Random()
+
+        # (bucket, engine) -> {'runs', 'latency_ms', 'confidence', 'contests', 'wins'} (sums)
+        self._stats: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self._loaded_at = 0.0
+        self._table_ready = False
+
+        if self.path:
+            self._reload()
+
+    @contextmanager
+    def _connection(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _ensure_table(self, conn: sqlite3.Connection):
+        if self._table_ready:
+            return
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS engine_stats (
+                bucket TEXT NOT NULL,
+                engine TEXT NOT NULL,
+                runs INTEGER NOT NULL DEFAULT 0,
+                latency_ms REAL NOT NULL DEFAULT 0,
+                confidence REAL NOT NULL DEFAULT 0,
+                contests INTEGER NOT NULL DEFAULT 0,
+                wins INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (bucket, engine)
+            )
+        ''')
+        self._table_ready = True
+
+    def _reload(self):
+        """Pull statistics written by other worker processes"""
+        if not os.path.exists(self.path):  # nothing recorded yet by any process
+            self._loaded_at = time.time()
+            return
+        with self._connection() as conn:
+            self._ensure_table(conn)
+            rows = conn.execute(
+                'SELECT bucket, engine, runs, latency_ms, confidence, contests, wins FROM engine_stats'
+            ).fetchall()
+        with self._lock:
+            self._stats = {
+                (bucket, engine): {'runs': runs, 'latency_ms': latency, 'confidence': confidence,
+                                   'contests': contests, 'wins': wins}
+                for bucket, engine, runs, latency, confidence, contests, wins in rows
+            }
+            self._loaded_at = time.time()
+
+    @staticmethod
+    def bucket_for(features: Optional[Dict]) -> str:
+        """Coarse bucket key from image features (handwriting, size, contrast)"""
+        if not features:
+            return 'unknown'
+        handwriting = 'hw' if features['is_handwriting'] else 'print'
+        megapixels = features['width'] * features['height'] / 1e6
+        size = 's' if megapixels < 0.5 else 'm' if megapixels < 2 else 'l' if megapixels < 8 else 'xl'
+        contrast = features['contrast']
+        contrast_level = 'low' if contrast < 40 else 'mid' if contrast < 70 else 'high'
+        return f'{handwriting}|{size}|{contrast_level}'
+
+    def route(self, bucket: str, candidates: List[str]) -> Tuple[List[str], str]:
+        """Pick which candidate engines to run. Returns (engines, reason)."""
+        if len(candidates) <= 1:
+            return list(candidates), 'single'
+
+        if self.path and time.time() - self._loaded_at > self.refresh_seconds:
+            try:
+                self._reload()
+            except Exception as e:
+                logger.warning("Could not refresh engine stats: %s", e)
+
+        if self.rng.random() < self.exploration_rate:
+            return list(candidates), 'explore'
+
+        with self._lock:
+            stats = {name: dict(self._stats.get((bucket, name), {})) for name in candidates}
+
+        if any(s.get('contests', 0) < self.min_samples for s in stats.values()):
+            return list(candidates), 'warmup'
+
+        def win_rate(name):
+            return stats[name]['wins'] / stats[name]['contests']
+
+        def mean_latency(name):
+            return stats[name]['latency_ms'] / stats[name]['runs'] if stats[name]['runs'] else 0.0
+
+        ranked = sorted(candidates, key=win_rate, reverse=True)
+        selected, spent = [], 0.0
+        for name in ranked:
+            if selected and (win_rate(name) < self.min_win_rate
+                             or spent + mean_latency(name) > self.latency_budget_ms):
+                continue
+            selected.append(name)
+            spent += mean_latency(name)
+
+        # Keep the original (priority) order for the engines that made the cut
+        return [name for name in candidates if name in selected], 'learned'
+
+    def record(self, bucket: str, outcomes: List[Dict], winner: Optional[str]):
+        """
+        Record one request. `outcomes` holds {'engine', 'latency_ms',
+        'confidence'} for every engine that ran; `winner` is the selected one.
+        """
+        contest = len(outcomes) >= 2
+        deltas = []
+        for outcome in outcomes:
+            deltas.append((
+                outcome['engine'],
+                outcome['latency_ms'],
+                outcome.get('confidence') or 0.0,
+                1 if contest else 0,
+                1 if contest and outcome['engine'] == winner else 0,
+            ))
+
+        with self._lock:
+            for engine, latency, confidence, contests, wins in deltas:
+                entry = self._stats.setdefault((bucket, engine), {
+                    'runs': 0, 'latency_ms': 0.0, 'confidence': 0.0, 'contests': 0, 'wins': 0
+                })
+                entry['runs'] += 1
+                entry['latency_ms'] += latency
+                entry['confidence'] += confidence
+                entry['contests'] += contests
+                entry['wins'] += wins
+
+        if self.path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with self._connection() as conn:
+                    self._ensure_table(conn)
+                    conn.executemany('''
+                        INSERT INTO engine_stats (bucket, engine, runs, latency_ms, confidence, contests, wins)
+                        VALUES (?, ?, 1, ?, ?, ?, ?)
+                        ON CONFLICT (bucket, engine) DO UPDATE SET
+                            runs = runs + 1,
+                            latency_ms = latency_ms + excluded.latency_ms,
+                            confidence = confidence + excluded.confidence,
+                            contests = contests + excluded.contests,
+                            wins = wins + excluded.wins
+                    ''', [(bucket,) + delta for delta in deltas])
+            except Exception as e:
+                logger.warning("Could not persist engine stats: %s", e)
+
+    def stats(self) -> Dict:
+        """Per-bucket, per-engine summary (runs, win rate, mean latency and confidence)"""
+        with self._lock:
+            items = list(self._stats.items())
+        summary: Dict[str, Dict] = {}
+        for (bucket, engine), s in sorted(items):
+            runs = s['runs'] or 1
+            summary.setdefault(bucket, {})[engine] = {
+                'runs': s['runs'],
+                'contests': s['contests'],
+                'win_rate': s['wins'] / s['contests'] if s['contests'] else None,
+                'mean_latency_ms': s['latency_ms'] / runs,
+                'mean_confidence': s['confidence'] / runs,
+            }
+        return summary
@@ -0,0 +1,53 @@
+"""
+Hedged requests across mirrors of the same provider
+The first mirror gets the request; if it has not answered within its
+hedge delay (a high percentile of its recent latency), the next mirror
+is asked as well, and the first good answer wins. A mirror that fails
+outright is replaced immediately rather than after the delay.
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from typing import Any, Callable, List, Optional, Tuple
+
+
+def hedged_call(attempts: List[Callable[[], Any]], delay_for: Callable[[int], float],
+                max_hedges: int, executor: Executor) -> Tuple[Optional[int], Any]:
+    """
+    Run `attempts` (best first) with hedging and return (index, result) of
+    the first truthy result, or (None, None) if none produced one.
+
+    At most 1 + max_hedges attempts are in flight at once; delay_for(i) is
+    how long (seconds) attempt i may run before the next one is started.
+    Attempts not yet started when an answer arrives are cancelled; ones
+    already sending finish in the background and their result is dropped.
+    """
+    pending = {}
+    next_index = 0
+    last_launch = 0.0
+
+    def launch():
+        nonlocal next_index, last_launch
+        pending[executor.submit(attempts[next_index])] = next_index
+        next_index += 1
+        last_launch = time.monotonic()
+
+    launch()
+    while pending:
+        can_hedge = next_index < len(attempts) and len(pending) < 1 + max_hedges
+        timeout = None
+        if can_hedge:
+            timeout = max(0.0, delay_for(next_index - 1) - (time.monotonic() - last_launch))
+
+        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            index = pending.pop(future)
+            result = future.result() if future.exception() is None else None
+            if result:
+                for other in pending:
+                    other.cancel()
+                return index, result
+
+        # Timed out waiting (hedge), or an attempt failed (replace it)
+        if next_index < len(attempts) and len(pending) < 1 + max_hedges and (done or can_hedge):
+            launch()
+    return None, None
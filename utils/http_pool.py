@@ -0,0 +1,80 @@
+"""
+Pooled HTTP sessions for outbound API calls
+One requests.Session per host (scheme://host:port), so calls reuse
+keep-alive connections instead of paying a TCP (and TLS) handshake each
+time. Pools are bounded, connection errors and 502/503/504 are retried
+with backoff, and every call gets connect/read timeouts by default.
+"""
+import os
+import threading
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUSES = (502, 503, 504)
+
+
+class HTTPClientPool:
+    """
+    Thread-safe registry of per-host sessions.
+
+    Sessions are created on first use in each process, so a pool built
+    before a gunicorn fork never shares sockets between workers.
+    """
+
+    def __init__(self, pool_size: int = 10, retries: int = 1, backoff: float = 0.2,
+                 connect_timeout: float = 3.0, read_timeout: float = 10.0):
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self._sessions: Dict[str, requests.Session] = {}
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _new_session(self) -> requests.Session:
+        retry = Retry(total=self.retries, connect=self.retries, read=0, backoff_factor=self.backoff,
+                      status_forcelist=RETRY_STATUSES, allowed_methods=frozenset({'GET', 'POST'}),
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, pool_block=False,
+                              max_retries=retry)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def session(self, url: str) -> requests.Session:
+        """The shared session for `url`'s host"""
+        parts = urlsplit(url)
+        host = f'{parts.scheme}://{parts.netloc}'
+        with self._lock:
+            if self._pid != os.getpid():
+                self._sessions = {}  # inherited from the parent process: do not reuse its sockets
+                self._pid = os.getpid()
+            session = self._sessions.get(host)
+            if session is None:
+                session = self._sessions[host] = self._new_session()
+            return session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session(url).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def hosts(self):
+        with self._lock:
+            return sorted(self._sessions)
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            session.close()
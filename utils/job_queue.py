@@ -0,0 +1,367 @@
+"""
+Background job queue for long-running extraction work
+Backends: SQLite (default; survives restarts, shared by worker processes
+on one host) and in-process (single-process deployments and tests only)
+"""
+import contextvars
+import json
+import logging
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from utils.processes import pid_alive
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+
+def _now() -> float:
+    return time.time()
+
+
+class JobFailed(Exception):
+    """Raised by a handler to end its job FAILED while still recording a result payload"""
+
+    def __init__(self, message: str, result: Optional[Dict] = None):
+        super().__init__(message)
+        self.result = result
+
+
+class InMemoryJobQueue:
+    """
+    Job queue held in this process only (lost on restart, invisible to other
+    worker processes). Finished jobs are dropped `ttl_seconds` after they
+    finish; 0 keeps them forever.
+    """
+
+    def __init__(self, ttl_seconds: float = 3600):
+        self.ttl_seconds = ttl_seconds
+        self._jobs: Dict[str, Dict] = {}
+        self._ready = queue.Queue()
+        self._lock = threading.Lock()
+
+    def _expire(self):
+        """Drop finished jobs older than the TTL (caller holds the lock)"""
+        if not self.ttl_seconds:
+            return
+        cutoff = _now() - self.ttl_seconds
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job['status'] in (COMPLETED, FAILED) and job['updated_at'] < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def enqueue(self, kind: str, payload: Dict) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._expire()
+            self._jobs[job_id] = {
+                'id': job_id,
+                'kind': kind,
+                'status': QUEUED,
+                'payload': payload,
+                'result': None,
+                'error': None,
+                'created_at': _now(),
+                'updated_at': _now(),
+            }
+        self._ready.put(job_id)
+        return job_id
+
+    def claim(self, timeout: float = 1.0) -> Optional[Dict]:
+        """Take the next queued job and mark it running (None if none arrive in time)"""
+        try:
+            job_id = self._ready.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        with self._lock:
+            job = self._jobs[job_id]
+            job['status'] = RUNNING
+            job['updated_at'] = _now()
+            return dict(job)
+
+    def update(self, job_id: str, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                job.update(fields)
+                job['updated_at'] = _now()
+
+    def complete(self, job_id: str, result: Dict):
+        self.update(job_id, status=COMPLETED, result=result)
+
+    def fail(self, job_id: str, error: str, result: Optional[Dict] = None):
+        self.update(job_id, status=FAILED, error=error, result=result)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+
+class SQLiteJobQueue:
+    """
+    Job queue stored in a SQLite file. Claims use BEGIN IMMEDIATE so several
+    worker processes can share one file. A running job holds a lease that
+    its worker renews with heartbeat(); jobs whose lease ran out, or whose
+    process on this host no longer exists, are put back in the queue.
+    Finished jobs are deleted `ttl_seconds` after they finish; 0 keeps them
+    forever.
+    """
+
+    POLL_INTERVAL = 0.2
+    SWEEP_INTERVAL = 30.0  # seconds between expiry / lease checks in claim()
+
+    def __init__(self, path: str, ttl_seconds: float = 3600, lease_seconds: float = 300):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        self._next_sweep = 0.0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.owner = f'{socket.gethostname()}:{os.getpid()}'
+        with self._connection() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    owner TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    finished_at REAL
+                )
+            ''')
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(jobs)')}
+            if 'finished_at' not in columns:  # files created before finished jobs expired
+                conn.execute('ALTER TABLE jobs ADD COLUMN finished_at REAL')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (finished_at)')
+            self._sweep(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _sweep(self, conn: sqlite3.Connection):
+        """
+        Delete finished jobs past the TTL and requeue running jobs whose
+        lease ran out or whose process on this host is gone
+        """
+        now = _now()
+        self._next_sweep = now + self.SWEEP_INTERVAL
+        if self.ttl_seconds:
+            conn.execute('DELETE FROM jobs WHERE finished_at < ?', (now - self.ttl_seconds,))
+        host = socket.gethostname()
+        rows = conn.execute(
+            'SELECT id, owner, updated_at FROM jobs WHERE status = ?', (RUNNING,)
+        ).fetchall()
+        for row in rows:
+            owner_host, _, pid = (row['owner'] or '').rpartition(':')
+            lapsed = self.lease_seconds and row['updated_at'] < now - self.lease_seconds
+            orphaned = owner_host == host and pid.isdigit() and not pid_alive(int(pid))
+            if lapsed or orphaned:
+                logger.warning("Requeueing job %s from %s (%s)", row['id'], row['owner'],
+                               'lease expired' if lapsed else 'process exited')
+                conn.execute(
+                    'UPDATE jobs SET status = ?, owner = NULL, updated_at = ? WHERE id = ? AND status = ?',
+                    (QUEUED, now, row['id'], RUNNING)
+                )
+
+    def enqueue(self, kind: str, payload: Dict) -> str:
+        job_id = uuid.uuid4().hex
+        now = _now()
+        with self._connection() as conn:
+            if self.ttl_seconds:
+                conn.execute('DELETE FROM jobs WHERE finished_at < ?', (now - self.ttl_seconds,))
+            conn.execute(
+                'INSERT INTO jobs (id, kind, status, payload, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (job_id, kind, QUEUED, json.dumps(payload), now, now)
+            )
+        return job_id
+
+    def claim(self, timeout: float = 1.0) -> Optional[Dict]:
+        """Take the oldest queued job and mark it running (None if none arrive in time)"""
+        deadline = _now() + timeout
+        while True:
+            conn = self._connect()
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                if _now() >= self._next_sweep:
+                    self._sweep(conn)
+                row = conn.execute(
+                    'SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1', (QUEUED,)
+                ).fetchone()
+                if row:
+                    conn.execute(
+                        'UPDATE jobs SET status = ?, owner = ?, updated_at = ? WHERE id = ?',
+                        (RUNNING, self.owner, _now(), row['id'])
+                    )
+                conn.execute('COMMIT')
+            except Exception:
+                if conn.in_transaction:  # BEGIN itself may have failed (e.g. database locked)
+                    conn.execute('ROLLBACK')
+                raise
+            finally:
+                conn.close()
+
+            if row:
+                job = self._row_to_job(row)
+                job['status'] = RUNNING
+                return job
+            if _now() >= deadline:
+                return None
+            time.sleep(self.POLL_INTERVAL)
+
+    def update(self, job_id: str, **fields):
+        columns, values = [], []
+        for key, value in fields.items():
+            if key in ('result', 'payload'):
+                value = json.dumps(value) if value is not None else None
+            columns.append(f'{key} = ?')
+            values.append(value)
+        columns.append('updated_at = ?')
+        values.extend([_now(), job_id])
+        with self._connection() as conn:
+            conn.execute(f'UPDATE jobs SET {", ".join(columns)} WHERE id = ?', values)
+
+    def heartbeat(self, job_id: str):
+        """Renew the lease on a job this process is running"""
+        with self._connection() as conn:
+            conn.execute('UPDATE jobs SET updated_at = ? WHERE id = ? AND status = ? AND owner = ?',
+                         (_now(), job_id, RUNNING, self.owner))
+
+    def complete(self, job_id: str, result: Dict):
+        self.update(job_id, status=COMPLETED, result=result, finished_at=_now())
+
+    def fail(self, job_id: str, error: str, result: Optional[Dict] = None):
+        self.update(job_id, status=FAILED, error=error, result=result, finished_at=_now())
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._connection() as conn:
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    @staticmethod
+    def _row_to_job(row) -> Dict:
+        return {
+            'id': row['id'],
+            'kind': row['kind'],
+            'status': row['status'],
+            'payload': json.loads(row['payload']),
+            'result': json.loads(row['result']) if row['result'] else None,
+            'error': row['error'],
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at'],
+        }
+
+
+def create_job_queue(backend: str = 'sqlite', path: Optional[str] = None, ttl_seconds: float = 3600,
+                     lease_seconds: float = 300):
+    """Build a job queue for the configured backend ('sqlite' or 'memory')"""
+    if backend == 'sqlite':
+        return SQLiteJobQueue(path or 'jobs.sqlite3', ttl_seconds=ttl_seconds, lease_seconds=lease_seconds)
+    if backend == 'memory':
+        return InMemoryJobQueue(ttl_seconds=ttl_seconds)
+    raise ValueError(f'Unknown job queue backend: {backend}')
+
+
+class JobWorkerPool:
+    """
+    Background threads that claim jobs and run the handler registered for
+    their kind. With a leasing queue, a heartbeat thread renews the lease of
+    every job the pool is running.
+    """
+
+    def __init__(self, job_queue, handlers: Dict[str, Callable[[Dict], Dict]], workers: int = 2):
+        self.job_queue = job_queue
+        self.handlers = handlers
+        self.workers = max(1, int(workers))
+        self._stop = threading.Event()
+        self._threads = []
+        self._running = set()
+        self._running_lock = threading.Lock()
+
+    def start(self):
+        for i in range(self.workers):
+            # Each worker runs in a copy of the starting context (log fields, debug sampling)
+            thread = threading.Thread(target=contextvars.copy_context().run, args=(self._run,),
+                                      name=f'job-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        lease = getattr(self.job_queue, 'lease_seconds', 0)
+        if lease:
+            thread = threading.Thread(target=self._heartbeat, args=(lease / 3,),
+                                      name='job-heartbeat', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+
+    def _heartbeat(self, interval: float):
+        while not self._stop.wait(interval):
+            with self._running_lock:
+                running = list(self._running)
+            for job_id in running:
+                try:
+                    self.job_queue.heartbeat(job_id)
+                except Exception as e:
+                    logger.warning("Job %s heartbeat failed: %s", job_id, e)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                job = self.job_queue.claim(timeout=1.0)
+            except Exception as e:
+                logger.warning("Job queue claim failed: %s", e)
+                time.sleep(1.0)
+                continue
+            if job is None:
+                continue
+
+            handler = self.handlers.get(job['kind'])
+            if handler is None:
+                self.job_queue.fail(job['id'], f"No handler for job kind '{job['kind']}'")
+                continue
+
+            with self._running_lock:
+                self._running.add(job['id'])
+            try:
+                # Own context per job, so anything a handler sets does not leak into the next job
+                result = contextvars.copy_context().run(handler, job)
+                self.job_queue.complete(job['id'], result)
+            except JobFailed as e:
+                self.job_queue.fail(job['id'], str(e), e.result)
+            except Exception as e:
+                logger.exception("Job %s (%s) failed: %s", job['id'], job['kind'], e)
+                self.job_queue.fail(job['id'], str(e))
+            finally:
+                with self._running_lock:
+                    self._running.discard(job['id'])
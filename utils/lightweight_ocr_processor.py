@@ -3,29 +3,33 @@ Lightweight OCR Processor for Cloud Deployment
 Only uses Tesseract OCR to fit in free tier memory limits
 """
 import os
+import logging
 import cv2
 import numpy as np
 from PIL import Image, ImageEnhance, ImageFilter
 import pytesseract
-from typing import Dict, List
+from typing import Callable, Dict, List
 import re
+import time
+from functools import cached_property
+from utils.batch_extraction import iter_batch_extraction
+from utils.metrics import timed, ENGINE_RESULTS
+from utils.structured_logging import annotate_request
+
+logger = logging.getLogger(__name__)
 
 class LightweightOCRProcessor:
     """Simple OCR processor using only Tesseract"""
     
-    def __init__(self):
-        self.tesseract_available = self._check_tesseract()
-        if self.tesseract_available:
-            print("[INFO] Tesseract OCR initialized successfully")
-        else:
-            print("[WARN] Tesseract OCR not available")
-    
-    def _check_tesseract(self):
-        """Check if Tesseract is available"""
+    @cached_property
+    def tesseract_available(self):
+        """Check if Tesseract is available (runs the binary once, on first use)"""
         try:
             pytesseract.get_tesseract_version()
+            logger.info("Tesseract OCR initialized successfully")
             return True
         except:
+            logger.warning("Tesseract OCR not available")
             return False
     
     def is_available(self):
@@ -39,6 +43,7 @@ class LightweightOCRProcessor:
             methods.append('tesseract')
         return methods
     
+    @timed('preprocess.printed')
     def preprocess_image(self, image_path: str) -> np.ndarray:
         """Enhanced preprocessing for better OCR accuracy"""
         # Read image
@@ -86,6 +91,7 @@ class LightweightOCRProcessor:
         
         return min(confidence, 1.0)
     
+    @timed('engine.tesseract')
     def extract_text_tesseract(self, image_path: str) -> Dict:
         """Extract text using Tesseract OCR"""
         if not self.tesseract_available:
@@ -121,7 +127,7 @@ class LightweightOCRProcessor:
                     if confidence > 0.8:
                         break
                 except Exception as e:
-                    print(f"[WARN] Tesseract PSM {psm} failed: {e}")
+                    logger.warning("Tesseract PSM %s failed: %s", psm, e)
                     continue
             
             return {
@@ -140,17 +146,23 @@ class LightweightOCRProcessor:
                 'error': str(e)
             }
     
-    def extract_text(self, image_path: str, force_method: str = None) -> Dict:
+    @timed('ocr.extract_text')
+    def extract_text(self, image_path: str, force_method: str = None,
+                     progress_callback: Callable[[str, Dict], None] = None) -> Dict:
         """
         Extract text from image using available OCR method
         
         Args:
             image_path: Path to the image file
             force_method: Force a specific OCR method (currently only 'tesseract')
+            progress_callback: Optional callback(event, data) receiving
+                'routing', 'engine' and 'selected' progress events
         
         Returns:
             Dictionary with extracted text and metadata
         """
+        emit = progress_callback or (lambda event, data: None)
+        
         if not self.is_available():
             return {
                 'text': '',
@@ -160,7 +172,17 @@ class LightweightOCRProcessor:
             }
         
         # Use Tesseract (only available method in lightweight version)
+        emit('routing', {'handwriting': None, 'engines': ['tesseract']})
+        started = time.perf_counter()
         result = self.extract_text_tesseract(image_path)
+        if result.get('error'):
+            ENGINE_RESULTS.inc(engine='tesseract', outcome='failure')
+        else:
+            ENGINE_RESULTS.inc(engine='tesseract', outcome='success' if result['text'] else 'empty')
+        emit('engine', {'engine': 'tesseract', 'text': result['text'], 'confidence': result['confidence'],
+                        'elapsed_ms': (time.perf_counter() - started) * 1000})
+        emit('selected', {'method': 'tesseract', 'text': result['text'], 'confidence': result['confidence']})
+        annotate_request(ocr_method='tesseract', ocr_confidence=round(float(result['confidence']), 3))
         
         # Add helpful message if confidence is low
         if result['confidence'] < 0.5:
@@ -171,6 +193,26 @@ class LightweightOCRProcessor:
         
         return result
     
+    def extract_text_batch(self, paths_or_buffers, force_method: str = None,
+                           prefetch: int = 4, workers: int = 4, ordered: bool = True):
+        """
+        Extract text from many images, yielding one result dict per input
+        
+        Args:
+            paths_or_buffers: Iterable of file paths or in-memory buffers
+            force_method: Passed through to extract_text
+            prefetch: How many inputs to validate ahead of the OCR workers
+            workers: Number of concurrent Tesseract workers
+            ordered: Yield in input order (True) or as completed (False)
+        
+        Returns:
+            Generator of result dictionaries with 'index' and 'source' added
+        """
+        return iter_batch_extraction(
+            self.extract_text, paths_or_buffers, force_method=force_method,
+            prefetch=prefetch, workers=workers, ordered=ordered
+        )
+    
     def detect_text_type(self, image_path: str) -> str:
         """
         Detect if text is handwritten or printed
@@ -0,0 +1,433 @@
+"""
+Lightweight metrics: counters, gauges and latency histograms rendered in
+the Prometheus text exposition format
+
+With METRICS_DIR set, every process periodically writes its samples to
+METRICS_DIR/metrics_<pid>.json and /metrics sums the files of all gunicorn
+workers. Gauges of processes that have exited are dropped; their counters
+and histograms are folded into METRICS_DIR/metrics_retired.json and the
+file removed, so totals never go backwards - also when a new worker is
+given the PID of a dead one.
+"""
+import functools
+import glob
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from utils.processes import pid_alive
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock (and no multi-worker gunicorn either)
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_LabelKey = Tuple[str, ...]
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[_LabelKey, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> _LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} expects labels {self.labelnames}, got {tuple(labels)}')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def dump(self) -> List:
+        """[(label values, value)] for serialising to other processes"""
+        with self._lock:
+            return [[list(key), list(value) if isinstance(value, list) else value]
+                    for key, value in self._values.items()]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    kind = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down (e.g. requests in flight)"""
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; each label set holds [bucket counts..., +Inf count, sum]"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            entry[bisect_left(self.buckets, value)] += 1
+            entry[-1] += value
+
+
+class Registry:
+    """All metrics of this process, plus the multiprocess file exchange"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_pid = None
+        self._instance = None  # (pid, id) of this process; a reused PID gets a new id
+        self._instance_lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def _snapshot(self) -> Dict:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: {
+                'kind': metric.kind,
+                'documentation': metric.documentation,
+                'labelnames': list(metric.labelnames),
+                'buckets': list(getattr(metric, 'buckets', ())),
+                'samples': metric.dump(),
+            }
+            for metric in metrics
+        }
+
+    # Multiprocess support -------------------------------------------------
+
+    def _instance_id(self, directory: str) -> str:
+        """
+        Id of this process's samples. The first call after start (or fork)
+        retires a file a dead process left under the same PID, so writing
+        ours does not overwrite its counters.
+        """
+        with self._instance_lock:
+            pid = os.getpid()
+            if self._instance is None or self._instance[0] != pid:
+                instance_id = uuid.uuid4().hex
+                with _directory_lock(directory):
+                    path = os.path.join(directory, f'metrics_{pid}.json')
+                    data = _read_samples(path)
+                    if data is not None and data.get('instance') != instance_id:
+                        _retire(directory, path, data)
+                self._instance = (pid, instance_id)
+            return self._instance[1]
+
+    def flush(self, directory: str):
+        """Write this process's samples to directory/metrics_<pid>.json"""
+        os.makedirs(directory, exist_ok=True)
+        instance_id = self._instance_id(directory)
+        path = os.path.join(directory, f'metrics_{os.getpid()}.json')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'pid': os.getpid(), 'instance': instance_id, 'metrics': self._snapshot()}, f)
+        os.replace(tmp_path, path)
+
+    def start_flusher(self, directory: str, interval: float = 5.0):
+        """Flush in the background so other workers can serve our samples"""
+        # Threads do not survive fork(), so a forked worker starts its own
+        if self._flusher is not None and self._flusher_pid == os.getpid():
+            return
+
+        def run():
+            while True:
+                try:
+                    self.flush(directory)
+                except Exception as e:
+                    logger.warning("Metrics flush failed: %s", e)
+                time.sleep(interval)
+
+        self._flusher = threading.Thread(target=run, name='metrics-flusher', daemon=True)
+        self._flusher_pid = os.getpid()
+        self._flusher.start()
+
+    def _collect(self, directory: Optional[str]) -> Dict:
+        if not directory:
+            return self._snapshot()
+
+        self.flush(directory)
+        merged: Dict[str, Dict] = {}
+        # Under the lock, so no file is retired (moved into the aggregate) mid-read
+        with _directory_lock(directory):
+            for path in sorted(glob.glob(os.path.join(directory, 'metrics_[0-9]*.json'))):
+                data = _read_samples(path)
+                if data is None:
+                    continue
+                if not pid_alive(data.get('pid', -1)):
+                    _retire(directory, path, data)
+                    continue
+                _merge_samples(merged, data['metrics'])
+            retired = _read_samples(os.path.join(directory, RETIRED_FILE))
+            if retired is not None:
+                _merge_samples(merged, retired['metrics'])
+        return _listed(merged)
+
+    def render(self, directory: Optional[str] = None) -> str:
+        """Text exposition of every metric (summed over processes when directory is set)"""
+        lines = []
+        for name, family in sorted(self._collect(directory).items()):
+            lines.append(f"# HELP {name} {family['documentation']}")
+            lines.append(f"# TYPE {name} {family['kind']}")
+            labelnames = family['labelnames']
+            for labels, value in sorted(family['samples'], key=lambda s: s[0]):
+                pairs = list(zip(labelnames, labels))
+                if family['kind'] != 'histogram':
+                    lines.append(f'{name}{_format_labels(pairs)} {_format_value(value)}')
+                    continue
+                running = 0
+                bounds = family['buckets'] + ['+Inf']
+                for bound, count in zip(bounds, value[:-1]):
+                    running += count
+                    le = bound if bound == '+Inf' else _format_value(bound)
+                    lines.append(f'{name}_bucket{_format_labels(pairs + [("le", le)])} {running}')
+                lines.append(f'{name}_sum{_format_labels(pairs)} {_format_value(value[-1])}')
+                lines.append(f'{name}_count{_format_labels(pairs)} {running}')
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(pairs) -> str:
+    if not pairs:
+        return ''
+    escaped = []
+    for name, value in pairs:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{name}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value) -> str:
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+# Counters and histograms of exited processes, summed
+RETIRED_FILE = 'metrics_retired.json'
+
+
+@contextmanager
+def _directory_lock(directory: str):
+    """Exclusive lock over the metrics files of `directory`, across processes"""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, '.metrics.lock'), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _read_samples(path: str) -> Optional[Dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _merge_samples(merged: Dict[str, Dict], metrics: Dict, gauges: bool = True):
+    """Add one process's families into `merged` ({name: family with samples keyed by label tuple})"""
+    for name, family in metrics.items():
+        if family['kind'] == 'gauge' and not gauges:
+            continue
+        target = merged.setdefault(name, dict(family, samples={}))
+        for labels, value in family['samples']:
+            key = tuple(labels)
+            current = target['samples'].get(key)
+            if current is None:
+                target['samples'][key] = value
+            elif isinstance(value, list):
+                target['samples'][key] = [a + b for a, b in zip(current, value)]
+            else:
+                target['samples'][key] = current + value
+
+
+def _listed(merged: Dict[str, Dict]) -> Dict[str, Dict]:
+    for family in merged.values():
+        family['samples'] = [[list(key), value] for key, value in family['samples'].items()]
+    return merged
+
+
+def _retire(directory: str, path: str, data: Dict):
+    """Fold a finished process's counters and histograms into the aggregate and drop its file (lock held)"""
+    retired_path = os.path.join(directory, RETIRED_FILE)
+    merged: Dict[str, Dict] = {}
+    retired = _read_samples(retired_path)
+    if retired is not None:
+        _merge_samples(merged, retired['metrics'])
+    _merge_samples(merged, data['metrics'], gauges=False)
+    tmp_path = f'{retired_path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'pid': None, 'metrics': _listed(merged)}, f)
+    os.replace(tmp_path, retired_path)
+    os.remove(path)
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'sde_stage_duration_seconds', 'Time spent in each pipeline stage', ['stage'])
+ENGINE_RESULTS = REGISTRY.counter(
+    'sde_ocr_engine_results_total', 'OCR engine runs by outcome (success, empty, failure)',
+    ['engine', 'outcome'])
+MODEL_LOADS = REGISTRY.counter(
+    'sde_model_loads_total', 'Model load attempts by outcome (loaded, failed)', ['model', 'outcome'])
+MODEL_CACHE_HITS = REGISTRY.counter(
+    'sde_model_cache_hits_total', 'Requests served by an already-loaded model', ['model'])
+TRANSLATION_PROVIDER_RESULTS = REGISTRY.counter(
+    'sde_translation_provider_results_total',
+    'Translation provider calls by outcome (success, empty, failure, slow, skipped)', ['provider', 'outcome'])
+TRANSLATION_HEDGES = REGISTRY.counter(
+    'sde_translation_hedged_calls_total',
+    'Hedged translation calls by which attempt answered first (primary, hedge, none)', ['provider', 'winner'])
+TRANSLATION_CACHE_LOOKUPS = REGISTRY.counter(
+    'sde_translation_cache_lookups_total',
+    'Translation cache lookups by result (hit, miss); hit ratio = hit / (hit + miss)', ['result'])
+TRANSLATION_MEMORY_SEGMENTS = REGISTRY.counter(
+    'sde_translation_memory_segments_total',
+    'Unique segments per translation: reused from memory (hit) or sent to a provider (miss)', ['result'])
+IN_FLIGHT = REGISTRY.gauge(
+    'sde_requests_in_flight', 'HTTP requests currently being handled', ['endpoint'])
+REQUESTS = REGISTRY.counter(
+    'sde_http_requests_total', 'Completed HTTP requests', ['endpoint', 'status'])
+
+
+# Per-request stage breakdown (stage -> milliseconds), active between
+# begin_request_timings() and end_request_timings() in the request's context
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar('request_timings', default=None)
+# Stages of views that returned a streamed body, still running until the
+# body has been produced (closed by finish_request_timings)
+_open_stages: ContextVar[Optional[List['timed']]] = ContextVar('open_stages', default=None)
+
+
+def begin_request_timings():
+    """Start collecting timed() stages for the current request; returns a reset token"""
+    return _request_timings.set({}), _open_stages.set([])
+
+
+def finish_request_timings():
+    """Close the stages left open by streaming views; call once the response body is done"""
+    stages = _open_stages.get()
+    while stages:
+        stages.pop().__exit__(None, None, None)
+
+
+def end_request_timings(token):
+    finish_request_timings()
+    for var, var_token in zip((_request_timings, _open_stages), token):
+        try:
+            var.reset(var_token)
+        except ValueError:  # token created in a different context
+            var.set(None)
+
+
+def request_timings() -> Dict[str, float]:
+    """Milliseconds spent per stage so far in the current request (repeated stages are summed)"""
+    timings = _request_timings.get()
+    return {stage: round(ms, 2) for stage, ms in timings.items()} if timings else {}
+
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    """Format stage timings as a Server-Timing header value"""
+    return ', '.join(f'{stage};dur={ms:.1f}' for stage, ms in timings.items())
+
+
+class timed:
+    """
+    Record the duration of a stage in sde_stage_duration_seconds, and in the
+    current request's breakdown if one is being collected.
+    Use as a decorator (@timed('ocr.extract_text')) or a context manager.
+    A decorated view that returns a streamed response keeps its stage open
+    until finish_request_timings(), so the stage covers producing the body.
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._started = 0.0
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._started
+        STAGE_SECONDS.observe(elapsed, stage=self.stage)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[self.stage] = timings.get(self.stage, 0.0) + elapsed * 1000
+        return False
+
+    def __call__(self, fn):
+        stage = self.stage
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            timer = timed(stage).__enter__()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                timer.__exit__(type(e), e, e.__traceback__)
+                raise
+            stages = _open_stages.get()
+            if stages is not None and getattr(result, 'is_streamed', False):
+                stages.append(timer)
+            else:
+                timer.__exit__(None, None, None)
+            return result
+        return wrapper
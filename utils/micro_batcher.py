@@ -0,0 +1,159 @@
+"""
+Micro-batching scheduler for neural OCR engines
+Groups concurrent single-image calls into one batched forward pass
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative counts, Prometheus-style)"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = sorted(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.counts[bisect_left(self.buckets, value)] += 1
+            self.total += value
+            self.count += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            cumulative, running = [], 0
+            for bound, count in zip(self.buckets + [float('inf')], self.counts):
+                running += count
+                cumulative.append(('+Inf' if bound == float('inf') else bound, running))
+            return {'buckets': cumulative, 'sum': self.total, 'count': self.count}
+
+
+class _PendingCall:
+    __slots__ = ('item', 'enqueued_at', 'event', 'result', 'error')
+
+    def __init__(self, item):
+        self.item = item
+        self.enqueued_at = time.perf_counter()
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Collects calls from concurrent threads for up to `max_wait_ms` (or until
+    `max_batch_size` calls are waiting), runs `batch_fn` once on the whole
+    group and hands each caller its own result.
+
+    `batch_fn` receives a list of items and must return a list of results of
+    the same length and order. All model calls happen on the single worker
+    thread, so the wrapped engine never runs concurrently with itself.
+    """
+
+    BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+    QUEUE_WAIT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+    def __init__(self, name: str, batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 8, max_wait_ms: float = 10.0):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self.batch_size_histogram = Histogram(self.BATCH_SIZE_BUCKETS)
+        self.queue_wait_histogram = Histogram(self.QUEUE_WAIT_BUCKETS)
+
+        self._pending: List[_PendingCall] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name=f'microbatch-{name}', daemon=True)
+        self._worker.start()
+
+    def submit(self, item, timeout: Optional[float] = None):
+        """Queue one item and block until its result is available"""
+        return self.submit_many([item], timeout=timeout)[0]
+
+    def submit_many(self, items: Sequence[Any], timeout: Optional[float] = None) -> List[Any]:
+        """Queue several items from one caller and block until all are done"""
+        calls = [_PendingCall(item) for item in items]
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f'MicroBatcher {self.name} is closed')
+            self._pending.extend(calls)
+            self._cond.notify()
+
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        results = []
+        for call in calls:
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            if not call.event.wait(remaining):
+                raise TimeoutError(f'{self.name} batch did not complete within {timeout}s')
+            if call.error is not None:
+                raise call.error
+            results.append(call.result)
+        return results
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._worker.join(timeout=5)
+
+    def stats(self) -> Dict:
+        return {
+            'engine': self.name,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000.0,
+            'batch_size': self.batch_size_histogram.snapshot(),
+            'queue_wait_seconds': self.queue_wait_histogram.snapshot(),
+        }
+
+    def _take_batch(self) -> List[_PendingCall]:
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if not self._pending:
+                return []
+
+            # Hold the window open (measured from the oldest call) for stragglers
+            deadline = self._pending[0].enqueued_at + self.max_wait
+            while len(self._pending) < self.max_batch_size and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+
+            started = time.perf_counter()
+            self.batch_size_histogram.observe(len(batch))
+            for call in batch:
+                self.queue_wait_histogram.observe(started - call.enqueued_at)
+
+            try:
+                results = self.batch_fn([call.item for call in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f'{self.name} batch returned {len(results)} results for {len(batch)} inputs'
+                    )
+                for call, result in zip(batch, results):
+                    call.result = result
+            except Exception as e:
+                for call in batch:
+                    call.error = e
+            finally:
+                for call in batch:
+                    call.event.set()
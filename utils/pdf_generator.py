@@ -1,16 +1,18 @@
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 import os
+from functools import cached_property
+from utils.metrics import timed
+
+# reportlab is imported on the first PDF, not at app startup
 
 class PDFGenerator:
     def __init__(self):
-        self.styles = getSampleStyleSheet()
         self.setup_fonts()
     
+    @cached_property
+    def styles(self):
+        from reportlab.lib.styles import getSampleStyleSheet
+        return getSampleStyleSheet()
+    
     def setup_fonts(self):
         """Setup fonts for different languages"""
         try:
@@ -20,9 +22,14 @@ class PDFGenerator:
         except Exception as e:
             print(f"Font setup error: {str(e)}")
     
+    @timed('pdf.create')
     def create_pdf(self, text, output_path, title="Extracted Document"):
         """Create PDF from extracted text"""
         try:
+            from reportlab.lib.pagesizes import A4
+            from reportlab.lib.styles import ParagraphStyle
+            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+            
             doc = SimpleDocTemplate(
                 output_path,
                 pagesize=A4,
@@ -0,0 +1,17 @@
+"""
+Process helpers shared by the multi-worker stores (job queue, metrics)
+"""
+import os
+
+
+def pid_alive(pid: int) -> bool:
+    """True if a process with this PID exists on this host (it may belong to another user)"""
+    if pid is None or pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
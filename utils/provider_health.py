@@ -0,0 +1,95 @@
+"""
+Background health checking for translation providers
+Probes run on a daemon thread (first round right away, then every
+`interval` seconds), so neither startup nor requests wait on a dead
+endpoint. Only probes change the up/down state here; failures of real
+requests are handled by the per-provider circuit breakers.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderHealth:
+    """
+    Up/down state per provider with last-checked timestamps.
+
+    A provider nobody has checked yet counts as available, so the first
+    requests after startup are not refused while probes are in flight.
+    """
+
+    def __init__(self, probes: Dict[str, Callable[[], bool]], interval: float = 60.0):
+        self.probes = probes
+        self.interval = interval
+        self._state: Dict[str, Dict] = {
+            name: {'up': None, 'last_checked': None, 'last_ok': None, 'last_error': None,
+                   'consecutive_failures': 0, 'latency_ms': None, 'source': None}
+            for name in probes
+        }
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+
+    def is_available(self, name: str) -> bool:
+        with self._lock:
+            state = self._state.get(name)
+            return state is None or state['up'] is not False
+
+    def mark(self, name: str, ok: bool, error: Optional[str] = None,
+             latency_ms: Optional[float] = None, source: str = 'probe'):
+        """Record a probe outcome for `name`"""
+        with self._lock:
+            state = self._state.setdefault(name, {'consecutive_failures': 0})
+            now = time.time()
+            state.update(up=ok, last_checked=now, latency_ms=latency_ms, source=source)
+            if ok:
+                state.update(last_ok=now, last_error=None, consecutive_failures=0)
+            else:
+                state.update(last_error=error, consecutive_failures=state.get('consecutive_failures', 0) + 1)
+        if not ok:
+            logger.info("Translation provider %s marked down (%s): %s", name, source, error)
+
+    def check_now(self):
+        """Probe every provider once, in parallel (blocks until all probes finish)"""
+        def probe(name):
+            started = time.perf_counter()
+            try:
+                ok = bool(self.probes[name]())
+                error = None if ok else 'probe reported unhealthy'
+            except Exception as e:
+                ok, error = False, f'{type(e).__name__}: {e}'
+            self.mark(name, ok, error,
+                      latency_ms=round((time.perf_counter() - started) * 1000, 1), source='probe')
+
+        with ThreadPoolExecutor(max_workers=max(1, len(self.probes)),
+                                thread_name_prefix='provider-probe') as pool:
+            list(pool.map(probe, self.probes))
+
+    def start(self):
+        """Start background probing (idempotent; restarts in a forked worker)"""
+        if self._thread is not None and self._thread_pid == os.getpid():
+            return
+
+        def run():
+            while True:
+                self.check_now()
+                if self._stop.wait(self.interval):
+                    return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name='provider-health', daemon=True)
+        self._thread_pid = os.getpid()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {name: dict(state) for name, state in self._state.items()}
@@ -0,0 +1,202 @@
+"""
+On-demand profiling of a single request
+Modes: 'sample' (stack sampling of the request thread - low overhead,
+produces flame-graph-ready collapsed stacks) and 'cprofile' (deterministic,
+produces pstats output). Profiles are stored per request id in a directory.
+Under gevent's monkey-patching the request runs in a greenlet, which
+sys._current_frames() cannot see, so 'sample' falls back to 'cprofile'.
+"""
+import cProfile
+import io
+import json
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+MODES = ('sample', 'cprofile')
+
+
+def gevent_patched() -> bool:
+    """True if gevent has monkey-patched threading (gunicorn's gevent workers)"""
+    monkey = sys.modules.get('gevent.monkey')
+    return monkey is not None and monkey.is_module_patched('threading')
+
+
+def resolve_mode(mode: str) -> str:
+    """The mode that will actually run: sampling needs real OS threads"""
+    if mode == 'sample' and gevent_patched():
+        return 'cprofile'
+    return mode
+
+
+class SamplingProfiler:
+    """Samples one thread's Python stack every `interval` seconds"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed format: 'root;child;leaf count' per line"""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+    def call_tree(self, min_share: float = 0.005) -> str:
+        """Indented call tree with sample counts, pruning nodes below min_share"""
+        total = sum(self.stacks.values())
+        if not total:
+            return 'No samples collected\n'
+
+        tree: Dict = {}
+        for stack, count in self.stacks.items():
+            node = tree
+            for frame in stack.split(';'):
+                entry = node.setdefault(frame, [0, {}])
+                entry[0] += count
+                node = entry[1]
+
+        lines = [f'{total} samples ({self.interval * 1000:.1f} ms interval)']
+
+        def walk(node, depth):
+            for frame, (count, children) in sorted(node.items(), key=lambda item: -item[1][0]):
+                if count / total < min_share:
+                    continue
+                lines.append(f"{'  ' * depth}{count / total:6.1%} {count:6d}  {frame}")
+                walk(children, depth + 1)
+
+        walk(tree, 0)
+        return '\n'.join(lines) + '\n'
+
+
+def _cprofile_artifacts(profiler: cProfile.Profile) -> Dict[str, bytes]:
+    profiler.create_stats()
+    text = io.StringIO()
+    stats = pstats.Stats(profiler, stream=text)
+    stats.sort_stats('cumulative').print_stats(60)
+    stats.print_callees(30)
+    return {
+        'pstats': marshal.dumps(profiler.stats),  # loadable with pstats.Stats or snakeviz
+        'txt': text.getvalue().encode('utf-8'),
+    }
+
+
+def _sampler_artifacts(sampler: SamplingProfiler) -> Dict[str, bytes]:
+    return {
+        'folded': sampler.collapsed().encode('utf-8'),
+        'tree.txt': sampler.call_tree().encode('utf-8'),
+    }
+
+
+def run_profiled(fn: Callable, mode: str = 'sample', interval: float = 0.005) -> Tuple[object, Dict[str, bytes]]:
+    """
+    Call fn() under the chosen profiler (see resolve_mode). Returns (fn's
+    result, artifacts) where artifacts maps a file suffix to its contents.
+    """
+    if resolve_mode(mode) == 'cprofile':
+        profiler = cProfile.Profile()
+        result = profiler.runcall(fn)
+        return result, _cprofile_artifacts(profiler)
+
+    sampler = SamplingProfiler(threading.get_ident(), interval)
+    sampler.start()
+    try:
+        result = fn()
+    finally:
+        sampler.stop()
+    return result, _sampler_artifacts(sampler)
+
+
+def profile_stream(chunks: Iterable, on_done: Callable[[Dict[str, bytes]], None],
+                   mode: str = 'sample', interval: float = 0.005) -> Iterator:
+    """
+    Yield from chunks (a streamed response body) under the chosen profiler
+    and pass the artifacts to on_done once they are exhausted or the client
+    goes away. cProfile only counts the time spent producing chunks.
+    """
+    iterator = iter(chunks)
+    try:
+        if resolve_mode(mode) == 'cprofile':
+            profiler = cProfile.Profile()
+            try:
+                while True:
+                    profiler.enable()
+                    try:
+                        chunk = next(iterator)
+                    except StopIteration:
+                        break
+                    finally:
+                        profiler.disable()
+                    yield chunk
+            finally:
+                on_done(_cprofile_artifacts(profiler))
+        else:
+            sampler = SamplingProfiler(threading.get_ident(), interval)  # the thread sending the body
+            sampler.start()
+            try:
+                yield from iterator
+            finally:
+                sampler.stop()
+                on_done(_sampler_artifacts(sampler))
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            close()
+
+
+def save_profile(directory: str, profile_id: str, artifacts: Dict[str, bytes], meta: Dict) -> List[str]:
+    """Write a profile's artifacts plus a <id>.json metadata file; returns the file names"""
+    os.makedirs(directory, exist_ok=True)
+    names = []
+    for suffix, content in artifacts.items():
+        name = f'{profile_id}.{suffix}'
+        with open(os.path.join(directory, name), 'wb') as f:
+            f.write(content)
+        names.append(name)
+    meta = dict(meta, id=profile_id, files=names, created_at=meta.get('created_at', time.time()))
+    with open(os.path.join(directory, f'{profile_id}.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return names
+
+
+def list_profiles(directory: str) -> List[Dict]:
+    """Metadata of stored profiles, newest first"""
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in os.listdir(directory):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return sorted(profiles, key=lambda p: p.get('created_at', 0), reverse=True)
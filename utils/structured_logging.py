@@ -0,0 +1,175 @@
+"""
+Structured, non-blocking logging
+Records are handed to a QueueHandler and written by a QueueListener thread,
+so request threads never block on stdout. Output is one JSON object per
+line (or plain text), every record logged while handling a request carries
+its request_id, and DEBUG output can be sampled per request.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+# Attributes every LogRecord has; anything else was passed via extra={...}
+_STANDARD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_request_fields: ContextVar[Optional[Dict]] = ContextVar('request_log_fields', default=None)
+_debug_sampled: ContextVar[Optional[bool]] = ContextVar('request_debug_sampled', default=None)
+_request_id: ContextVar[Optional[str]] = ContextVar('request_id', default=None)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_replaced_root = None  # (handlers, level) of the root logger before configure_logging
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, msg plus any extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DebugSampleFilter(logging.Filter):
+    """
+    Let DEBUG records through only for sampled requests. The sampling
+    decision is made once per request so sampled requests log completely.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        sampled = _debug_sampled.get()
+        if sampled is None:  # outside a request
+            return random.random() < self.rate
+        return sampled
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Stamp records with the current request_id. Runs in the logging thread,
+    because the listener thread that formats records has no request context.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        request_id = _request_id.get()
+        if request_id is not None and not hasattr(record, 'request_id'):
+            record.request_id = request_id
+        return True
+
+
+def configure_logging(level: str = 'INFO', fmt: str = 'json', debug_sample_rate: float = 0.0,
+                      debug_loggers=('main', 'auth', 'utils', 'sde')):
+    """
+    Route all logging through a background queue listener (idempotent).
+    With debug_sample_rate > 0, DEBUG from `debug_loggers` (the app's own
+    modules, not third-party libraries) is kept for that share of requests.
+    """
+    global _listener, _replaced_root
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if fmt == 'json':
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(RequestContextFilter())
+    if debug_sample_rate > 0:
+        queue_handler.addFilter(DebugSampleFilter(debug_sample_rate))
+
+    root = logging.getLogger()
+    _replaced_root = (root.handlers, root.level)
+    root.handlers = [queue_handler]
+    root.setLevel(getattr(logging, level.upper(), logging.INFO))
+    if debug_sample_rate > 0:
+        # DEBUG must reach the filter for sampled requests to get it
+        for name in debug_loggers:
+            logging.getLogger(name).setLevel(logging.DEBUG)
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Write out queued records, stop the listener and restore the root handlers it replaced"""
+    global _listener, _replaced_root
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+    root = logging.getLogger()
+    root.handlers, level = _replaced_root
+    root.setLevel(level)
+    _replaced_root = None
+
+
+def begin_request_log(debug_sample_rate: float = 0.0, request_id: Optional[str] = None) -> str:
+    """
+    Start a request: a request id (`request_id`, else a new one), fresh
+    summary fields and a one-off DEBUG sampling decision. Returns the id.
+    """
+    request_id = request_id or uuid.uuid4().hex
+    _request_id.set(request_id)
+    _request_fields.set({})
+    _debug_sampled.set(debug_sample_rate > 0 and random.random() < debug_sample_rate)
+    return request_id
+
+
+def begin_job_log(debug_sampled: Optional[bool], request_id: Optional[str] = None, **fields):
+    """
+    Start a background job with the request id and DEBUG sampling decision
+    of the request that queued it
+    """
+    _request_id.set(request_id)
+    _request_fields.set(dict(fields))
+    _debug_sampled.set(debug_sampled)
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+def debug_sampled() -> Optional[bool]:
+    """The current request's DEBUG sampling decision (None outside a request)"""
+    return _debug_sampled.get()
+
+
+def end_request_log():
+    _request_id.set(None)
+    _request_fields.set(None)
+    _debug_sampled.set(None)
+
+
+def annotate_request(**fields):
+    """Add decisions (chosen engine, provider, ...) to the current request's summary record"""
+    current = _request_fields.get()
+    if current is not None:
+        current.update(fields)
+
+
+def request_fields() -> Dict:
+    return dict(_request_fields.get() or {})
@@ -0,0 +1,223 @@
+"""
+Persistent translation cache
+Translations are stored in SQLite keyed by a hash of the normalized source
+text and the language pair, together with the provider that produced them,
+so repeated requests are answered without calling any provider. Entries
+expire after a TTL, and the least recently used ones are evicted when the
+cache grows past its entry or size limit. The file is shared by all
+worker processes; triggers keep its entry and byte totals in a one-row
+table, so checking the limits on a store does not scan the cache.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+
+def normalize_text(text: str) -> str:
+    """Unicode NFC, line endings unified, trailing spaces and outer blank lines dropped"""
+    text = unicodedata.normalize('NFC', text).replace('\r\n', '\n').replace('\r', '\n')
+    return '\n'.join(line.rstrip() for line in text.split('\n')).strip()
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+def cache_key(text: str, source_lang: str, target_lang: str) -> str:
+    return f'{source_lang}:{target_lang}:{text_digest(text)}'
+
+
+class TranslationCache:
+    """
+    LRU + TTL cache of finished translations.
+
+    ttl_seconds = 0 keeps entries until they are evicted for space. A hit
+    refreshes an entry's last use at most every `touch_seconds`, so reads
+    rarely write. Past a limit, eviction goes down to EVICT_TO of it, so a
+    full cache is not trimmed on every store.
+    """
+
+    EVICT_TO = 0.9
+
+    def __init__(self, path: str, max_entries: int = 10000, max_bytes: int = 50 * 1024 * 1024,
+                 ttl_seconds: float = 0, touch_seconds: float = 60):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.touch_seconds = touch_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS translation_cache (
+                    key TEXT PRIMARY KEY,
+                    source_lang TEXT NOT NULL,
+                    target_lang TEXT NOT NULL,
+                    provider TEXT,
+                    translated_text TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS translation_cache_last_used ON translation_cache (last_used)')
+            conn.execute('CREATE INDEX IF NOT EXISTS translation_cache_created_at ON translation_cache (created_at)')
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS translation_cache_totals (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    entries INTEGER NOT NULL,
+                    size_bytes INTEGER NOT NULL
+                )
+            ''')
+            # Seeded from the table once (files written before the totals existed)
+            conn.execute('''
+                INSERT OR IGNORE INTO translation_cache_totals (id, entries, size_bytes)
+                SELECT 0, COUNT(*), COALESCE(SUM(size_bytes), 0) FROM translation_cache
+            ''')
+            conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS translation_cache_added AFTER INSERT ON translation_cache BEGIN
+                    UPDATE translation_cache_totals
+                    SET entries = entries + 1, size_bytes = size_bytes + new.size_bytes WHERE id = 0;
+                END
+            ''')
+            conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS translation_cache_removed AFTER DELETE ON translation_cache BEGIN
+                    UPDATE translation_cache_totals
+                    SET entries = entries - 1, size_bytes = size_bytes - old.size_bytes WHERE id = 0;
+                END
+            ''')
+            conn.execute('''
+                CREATE TRIGGER IF NOT EXISTS translation_cache_resized
+                AFTER UPDATE OF size_bytes ON translation_cache BEGIN
+                    UPDATE translation_cache_totals
+                    SET size_bytes = size_bytes - old.size_bytes + new.size_bytes WHERE id = 0;
+                END
+            ''')
+            conn.execute('COMMIT')
+
+    @contextmanager
+    def _connection(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _totals(self, conn: sqlite3.Connection) -> Tuple[int, int]:
+        """(entries, size_bytes), kept up to date by the triggers"""
+        return conn.execute('SELECT entries, size_bytes FROM translation_cache_totals WHERE id = 0').fetchone()
+
+    def get(self, text: str, source_lang: str, target_lang: str) -> Optional[Tuple[str, str]]:
+        """(translated_text, provider) for a cached translation, else None"""
+        key = cache_key(text, source_lang, target_lang)
+        now = time.time()
+        with self._connection() as conn:
+            row = conn.execute(
+                'SELECT translated_text, provider, created_at, last_used FROM translation_cache WHERE key = ?',
+                (key,)).fetchone()
+            if row and self.ttl_seconds and now - row[2] > self.ttl_seconds:
+                conn.execute('DELETE FROM translation_cache WHERE key = ?', (key,))
+                row = None
+            if row and now - row[3] >= self.touch_seconds:
+                conn.execute('UPDATE translation_cache SET last_used = ? WHERE key = ?', (now, key))
+        self._count(row is not None)
+        return (row[0], row[1]) if row else None
+
+    def get_many(self, texts: List[str], source_lang: str, target_lang: str) -> Dict[str, str]:
+        """{text: translated_text} for the texts that are cached (one round trip)"""
+        keys = {cache_key(text, source_lang, target_lang): text for text in texts}
+        now = time.time()
+        found, stale = {}, []
+        with self._connection() as conn:
+            items = list(keys.items())
+            for start in range(0, len(items), 500):  # stay under SQLite's bound-parameter limit
+                batch = dict(items[start:start + 500])
+                placeholders = ','.join('?' * len(batch))
+                for key, translated, created_at, last_used in conn.execute(
+                        'SELECT key, translated_text, created_at, last_used FROM translation_cache '
+                        f'WHERE key IN ({placeholders})', list(batch)):
+                    if not (self.ttl_seconds and now - created_at > self.ttl_seconds):
+                        found[key] = translated
+                        if now - last_used >= self.touch_seconds:
+                            stale.append(key)
+            if stale:
+                conn.executemany('UPDATE translation_cache SET last_used = ? WHERE key = ?',
+                                 [(now, key) for key in stale])
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return {keys[key]: translated for key, translated in found.items()}
+
+    def put(self, text: str, source_lang: str, target_lang: str, translated_text: str, provider: str):
+        self.put_many({text: translated_text}, source_lang, target_lang, provider)
+
+    def put_many(self, translations: Dict[str, str], source_lang: str, target_lang: str, provider: str):
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute('BEGIN')
+            # An upsert rather than INSERT OR REPLACE: the replace's implicit delete fires no trigger
+            conn.executemany('''
+                INSERT INTO translation_cache
+                    (key, source_lang, target_lang, provider, translated_text, size_bytes, created_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    provider = excluded.provider,
+                    translated_text = excluded.translated_text,
+                    size_bytes = excluded.size_bytes,
+                    created_at = excluded.created_at,
+                    last_used = excluded.last_used
+            ''', [(cache_key(text, source_lang, target_lang), source_lang, target_lang, provider,
+                   translated, len(translated.encode('utf-8')), now, now)
+                  for text, translated in translations.items()])
+            self._evict(conn, now)
+            conn.execute('COMMIT')
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """
+        Drop expired entries, then, once past a limit, the least recently
+        used ones beyond EVICT_TO of the limits
+        """
+        if self.ttl_seconds:
+            conn.execute('DELETE FROM translation_cache WHERE created_at < ?', (now - self.ttl_seconds,))
+        entries, size = self._totals(conn)
+        if entries <= self.max_entries and size <= self.max_bytes:
+            return
+        conn.execute('''
+            DELETE FROM translation_cache WHERE key IN (
+                SELECT key FROM (
+                    SELECT key,
+                           ROW_NUMBER() OVER (ORDER BY last_used DESC) AS recency,
+                           SUM(size_bytes) OVER (ORDER BY last_used DESC ROWS UNBOUNDED PRECEDING) AS running_bytes
+                    FROM translation_cache
+                ) WHERE recency > ? OR running_bytes > ?
+            )
+        ''', (int(self.max_entries * self.EVICT_TO), int(self.max_bytes * self.EVICT_TO)))
+
+    def clear(self):
+        with self._connection() as conn:
+            conn.execute('DELETE FROM translation_cache')
+
+    def stats(self) -> Dict:
+        with self._connection() as conn:
+            entries, size = self._totals(conn)
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'entries': entries, 'size_bytes': size, 'hits': self.hits, 'misses': self.misses,
+                    'hit_ratio': round(self.hits / lookups, 3) if lookups else None}
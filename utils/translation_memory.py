@@ -0,0 +1,105 @@
+"""
+Sentence-level translation memory
+Text is split into lines and sentences. Segments already in the memory
+(a TranslationCache keyed by segment) are reused. Only the unseen ones go
+to a provider, deduplicated and sent together in one newline-separated
+call. The output is then reassembled in the original order, with the
+original whitespace between segments.
+"""
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.translation_cache import TranslationCache
+from utils.translation_stream import current_reporter, partial_scope
+
+# Sentence ends: Latin/Cyrillic/Arabic punctuation followed by whitespace,
+# or CJK / Devanagari full stops (which need no space after them)
+SENTENCE_BREAK = re.compile(r'(?<=[.!?;؟])\s+|(?<=[。！？।])\s*')
+SEPARATOR = re.compile(r'(\s*\n\s*)')
+
+
+def segment(text: str) -> List[Tuple[bool, str]]:
+    """
+    Split text into (translatable, piece) pairs that join back to `text`.
+    Whitespace and pieces without letters (numbers, bullets, dates) are
+    kept verbatim rather than translated.
+    """
+    pieces: List[Tuple[bool, str]] = []
+    for line_index, part in enumerate(SEPARATOR.split(text)):
+        if line_index % 2:  # newline run between lines
+            pieces.append((False, part))
+            continue
+        position = 0
+        for match in SENTENCE_BREAK.finditer(part):
+            if match.start() > position:
+                pieces.append((True, part[position:match.start()]))
+            if match.end() > match.start():
+                pieces.append((False, part[match.start():match.end()]))
+            position = match.end()
+        if position < len(part):
+            pieces.append((True, part[position:]))
+    return [(translatable and any(ch.isalpha() for ch in piece), piece) for translatable, piece in pieces]
+
+
+def translate_segments(text: str, source_lang: str, target_lang: str, memory: TranslationCache,
+                       translate: Callable[[str], Tuple[Optional[str], Optional[str]]],
+                       pieces: Optional[List[Tuple[bool, str]]] = None) -> Tuple[Optional[str], Dict]:
+    """
+    Translate `text` through the memory. `translate(batch)` sends the
+    newline-joined unseen segments to a provider and returns (translation,
+    provider), or (None, None) on failure.
+
+    Returns (translated text or None, stats). None means the batch failed
+    or came back with a different number of lines than was sent; the
+    caller then translates the whole text directly. `pieces` is segment(text)
+    when the caller already has it (one text, several target languages).
+    """
+    if pieces is None:
+        pieces = segment(text)
+    segments = list(dict.fromkeys(piece for translatable, piece in pieces if translatable))
+    known = memory.get_many(segments, source_lang, target_lang) if segments else {}
+    unseen = [s for s in segments if s not in known]
+    stats = {'segments': sum(1 for translatable, _ in pieces if translatable),
+             'unique': len(segments), 'from_memory': len(known), 'sent': len(unseen), 'provider': 'memory'}
+
+    parent = current_reporter()
+
+    def assemble(lines: List[str], partial_line: Optional[str] = None) -> str:
+        """The text up to the first segment with no translation yet"""
+        translations = {**known, **dict(zip(unseen, lines))}
+        streaming = unseen[len(lines)] if partial_line is not None and len(lines) < len(unseen) else None
+        out = []
+        for translatable, piece in pieces:
+            if not translatable:
+                out.append(piece)
+            elif piece in translations:
+                out.append(translations[piece])
+            else:
+                if piece == streaming:
+                    out.append(partial_line)
+                break
+        return ''.join(out)
+
+    def report(partial: str):
+        # Map the batch's partial output (one line per unseen segment) onto the text
+        lines = partial.lstrip('\n').split('\n')
+        if len(lines) - 1 <= len(unseen):
+            parent(assemble([line.strip() for line in lines[:-1]], lines[-1].strip()))
+
+    if unseen:
+        if parent is not None:
+            parent(assemble([]))  # what the memory already knows, right away
+        with partial_scope(report if parent is not None else None):
+            translated, provider = translate('\n'.join(unseen))
+        if translated is None:
+            return None, stats
+        lines = translated.strip('\n').split('\n')
+        if len(lines) != len(unseen):
+            stats['misaligned'] = True
+            return None, stats
+        fresh = dict(zip(unseen, (line.strip() for line in lines)))
+        memory.put_many(fresh, source_lang, target_lang, provider)
+        known.update(fresh)
+        stats['provider'] = provider
+
+    return ''.join(known[piece] if translatable else piece for translatable, piece in pieces), stats
@@ -0,0 +1,59 @@
+"""
+Partial translation output for streaming responses
+A provider that streams (Groq) reports its output so far with
+report_partial(). Layers that split the text (translation memory,
+chunking) install a scope that maps partial output for their piece to
+partial output for the whole text. The request-level callback therefore
+always receives "the document translated so far". The scope lives in a
+context variable, so it follows work submitted with copy_context().
+"""
+import contextvars
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+_reporter: contextvars.ContextVar = contextvars.ContextVar('translation_partial', default=None)
+
+
+def current_reporter() -> Optional[Callable[[str], None]]:
+    return _reporter.get()
+
+
+def report_partial(text: str):
+    """Report the output produced so far for the text currently being translated"""
+    reporter = _reporter.get()
+    if reporter is not None:
+        reporter(text)
+
+
+@contextmanager
+def partial_scope(reporter: Optional[Callable[[str], None]]):
+    token = _reporter.set(reporter)
+    try:
+        yield
+    finally:
+        _reporter.reset(token)
+
+
+class DeltaSink:
+    """
+    Turns successive "translated so far" snapshots into events for the
+    client: ('delta', appended text) when a snapshot extends the previous
+    one, else ('reset', full text) when a retry or fallback replaced output
+    already sent.
+    """
+
+    def __init__(self, emit: Callable[[str, dict], None]):
+        self.emit = emit
+        self.sent = ''
+        self._lock = threading.Lock()
+
+    def __call__(self, text: str):
+        with self._lock:
+            if text == self.sent:
+                return
+            if text.startswith(self.sent):
+                self.emit('delta', {'text': text[len(self.sent):]})
+            else:
+                self.emit('reset', {'text': text})
+            self.sent = text
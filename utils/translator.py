@@ -1,91 +1,394 @@
-import groq
-from groq import Groq
 import requests
 import json
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib.util import find_spec
+from config import Config
+from utils.chunking import TokenBucket, split_chunks, translate_chunks
+from utils.circuit_breaker import CircuitBreaker, ProviderScore
+from utils.hedging import hedged_call
+from utils.http_pool import HTTPClientPool
+from utils.provider_health import ProviderHealth
+from utils.metrics import (timed, TRANSLATION_PROVIDER_RESULTS, TRANSLATION_HEDGES, TRANSLATION_CACHE_LOOKUPS,
+                           TRANSLATION_MEMORY_SEGMENTS)
+from utils.structured_logging import annotate_request
+from utils.translation_memory import segment, translate_segments
+from utils.translation_stream import current_reporter, partial_scope, report_partial
+
+logger = logging.getLogger(__name__)
+
+class ProviderError(Exception):
+    """
+    A provider call failed (transport error, 5xx, or the provider refusing
+    us: REJECTED_STATUSES); counts against its circuit breaker
+    """
+
+# Auth, forbidden and quota/rate-limit answers: the provider will keep refusing, not a bad input
+REJECTED_STATUSES = (401, 403, 429)
+
+# Output tokens reserved on top of the translation itself (stray preamble, quoting)
+GROQ_TOKEN_HEADROOM = 256
+# Groq chunks shorter than this are not split further when their output is cut off
+GROQ_MIN_SPLIT_CHARS = 200
+
+def _groq_tokens_per_char(target_lang):
+    return Config.GROQ_TOKENS_PER_CHAR.get(target_lang, Config.GROQ_TOKENS_PER_CHAR.get('default', 0.5))
 
 class Translator:
-    def __init__(self, api_key):
+    def __init__(self, api_key, libretranslate_endpoints=None, mymemory_url=None,
+                 health_interval=None, probe_timeout=None, cache=None, memory=None):
         self.groq_client = None
-        self.translation_method = None
-        self.libretranslate_endpoints = [
-            'https://libretranslate.de',
-            'https://translate.argosopentech.com',
-            'https://libretranslate.com',
-        ]
+        self.cache = cache  # TranslationCache, or None to always call a provider
+        self.memory = memory  # segment-level TranslationCache (translation memory), or None
+        self.libretranslate_endpoints = [endpoint.rstrip('/') for endpoint in
+                                         (libretranslate_endpoints or Config.LIBRETRANSLATE_ENDPOINTS)]
+        self.mymemory_url = (mymemory_url or Config.MYMEMORY_URL).rstrip('/')
+        self.probe_timeout = probe_timeout or Config.TRANSLATION_PROBE_TIMEOUT
         
         # Try Groq first
         if api_key:
             try:
+                from groq import Groq  # imported only when a key is configured
                 self.groq_client = Groq(api_key=api_key)
-                self.translation_method = 'groq'
                 print("✅ Groq translator initialized")
             except Exception as e:
                 print(f"⚠️ Failed to initialize Groq: {e}")
         
-        # If Groq fails, try LibreTranslate API (free, no key needed)
-        if not self.groq_client:
-            for endpoint in self.libretranslate_endpoints:
-                try:
-                    response = requests.get(f'{endpoint}/detect', timeout=3)
-                    if response.status_code == 200:
-                        self.libretranslate_endpoint = endpoint
-                        self.translation_method = 'libretranslate'
-                        print(f"✅ LibreTranslate translator initialized ({endpoint})")
-                        break
-                except:
-                    pass
-        
-        # If LibreTranslate fails, try mymemory API (free, no auth needed)
-        if not self.translation_method:
-            try:
-                response = requests.get('https://mymemory.translated.net/api/get?q=test&langpair=en|es', timeout=3)
-                if response.status_code == 200:
-                    self.translation_method = 'mymemory'
-                    print("✅ MyMemory translator initialized (free alternative)")
-            except:
-                pass
-        
-        # If both fail, try Google Translate (unofficial)
-        if not self.translation_method:
+        # Free fallbacks are not probed here: a background checker marks them
+        # up/down once translation is first used (see start_health_checks)
+        probes = {f'libretranslate:{endpoint}': self._probe_libretranslate(endpoint)
+                  for endpoint in self.libretranslate_endpoints}
+        probes['mymemory'] = self._probe_mymemory
+        probes['google'] = lambda: find_spec('google_trans_new') is not None
+        self.health = ProviderHealth(probes, interval=health_interval or Config.TRANSLATION_HEALTH_INTERVAL)
+        
+        # One keep-alive session per provider host, shared by all calls
+        self.http = HTTPClientPool(
+            pool_size=Config.TRANSLATION_HTTP_POOL_SIZE,
+            retries=Config.TRANSLATION_HTTP_RETRIES,
+            backoff=Config.TRANSLATION_HTTP_BACKOFF,
+            connect_timeout=Config.TRANSLATION_CONNECT_TIMEOUT,
+            read_timeout=Config.TRANSLATION_REQUEST_TIMEOUT
+        )
+        # google_trans_new keeps per-instance session state and is not thread-safe
+        self._google_local = threading.local()
+        
+        # Per-provider circuit breakers and latency/success scores
+        self.breakers = {name: CircuitBreaker(
+            name,
+            failure_rate=Config.TRANSLATION_BREAKER_FAILURE_RATE,
+            window=Config.TRANSLATION_BREAKER_WINDOW,
+            min_calls=Config.TRANSLATION_BREAKER_MIN_CALLS,
+            open_seconds=Config.TRANSLATION_BREAKER_OPEN_SECONDS,
+            slow_call_ms=Config.TRANSLATION_SLOW_CALL_MS or None
+        ) for name in ['groq'] + list(probes)}
+        self.scores = {name: ProviderScore() for name in self.breakers}
+        self.rate_limiters = {name: TokenBucket(Config.TRANSLATION_RATE_LIMITS[kind] / 60,
+                                                Config.TRANSLATION_RATE_BURST)
+                              for name in self.breakers
+                              for kind in [name.split(':')[0]] if Config.TRANSLATION_RATE_LIMITS.get(kind)}
+        
+        # Chunks of long texts are translated concurrently on this pool
+        self._chunk_pool = None
+        self._language_pool = None  # target languages of translate_many
+        
+        # Hedging across mirrors of one provider (the LibreTranslate endpoints)
+        self.hedge_max = Config.TRANSLATION_HEDGE_MAX
+        self._hedge_pool = None
+        self._hedge_pool_lock = threading.Lock()
+    
+    @property
+    def translation_method(self):
+        """Preferred provider given the current health state"""
+        if self.groq_client:
+            return 'groq'
+        for name, kind, _ in self._ordered_fallbacks():
+            if self.health.is_available(name) and self.breakers[name].state != 'open':
+                return kind
+        return 'text_only'
+    
+    def start_health_checks(self):
+        """Start background provider probing (idempotent)"""
+        self.health.start()
+    
+    def health_status(self):
+        health = self.health.snapshot()
+        return {'groq_configured': self.groq_client is not None,
+                'preferred': self.translation_method,
+                'cache': self.cache.stats() if self.cache is not None else None,
+                'memory': self.memory.stats() if self.memory is not None else None,
+                'order': [name for name, _, _ in self._ordered_fallbacks()],
+                'providers': {name: dict(health.get(name, {}),
+                                         breaker=self.breakers[name].snapshot(),
+                                         score=self.scores[name].snapshot())
+                              for name in self.breakers}}
+    
+    def _probe_libretranslate(self, endpoint):
+        def probe():
+            return self.http.get(f'{endpoint}/languages', timeout=self.probe_timeout).status_code == 200
+        return probe
+    
+    def _probe_mymemory(self):
+        response = self.http.get(f'{self.mymemory_url}/api/get?q=test&langpair=en|es', timeout=self.probe_timeout)
+        return response.status_code == 200
+    
+    def _ordered_fallbacks(self):
+        """
+        (name, kind, translate) for the free providers, best expected time to
+        a successful answer first; providers not called yet go first, in
+        configured order, so each gets measured
+        """
+        providers = [(f'libretranslate:{endpoint}', 'libretranslate',
+                      lambda text, src, tgt, endpoint=endpoint: self._translate_libretranslate(endpoint, text, src, tgt))
+                     for endpoint in self.libretranslate_endpoints]
+        providers.append(('mymemory', 'mymemory', self._translate_mymemory))
+        providers.append(('google', 'google', self._translate_google))
+        order = {name: i for i, (name, _, _) in enumerate(providers)}
+        return sorted(providers, key=lambda p: (self.scores[p[0]].expected_ms() or 0.0, order[p[0]]))
+    
+    def _call_provider(self, name, translate, text, source_lang, target_lang):
+        """Run one provider through its breaker; returns the translation or None"""
+        breaker = self.breakers[name]
+        if not self.health.is_available(name) or not breaker.allow():
+            TRANSLATION_PROVIDER_RESULTS.inc(provider=name, outcome='skipped')
+            return None
+        # Only a call that will go out spends a rate-limit token (or waits for one)
+        limiter = self.rate_limiters.get(name)
+        if limiter is not None and not limiter.acquire(timeout=Config.TRANSLATION_REQUEST_TIMEOUT):
+            breaker.release()
+            TRANSLATION_PROVIDER_RESULTS.inc(provider=name, outcome='rate_limited')
+            return None
+        
+        started = time.perf_counter()
+        try:
+            result = translate(text, source_lang, target_lang)
+            success = True
+        except Exception as e:
+            logger.warning("Translation provider %s failed: %s", name, e)
+            result, success = None, False
+        latency_ms = (time.perf_counter() - started) * 1000
+        
+        # No translation (a rejected or empty answer) counts against the provider like an error
+        self.scores[name].observe(latency_ms, success and bool(result))
+        counted_as_failure = breaker.record(success and bool(result), latency_ms)
+        if breaker.state == 'open' and counted_as_failure:
+            logger.warning("Circuit for %s is open for %ss", name, breaker.open_seconds)
+        outcome = 'failure' if not success else 'empty' if not result else 'slow' if counted_as_failure else 'success'
+        TRANSLATION_PROVIDER_RESULTS.inc(provider=name, outcome=outcome)
+        return result
+    
+    def _hedge_executor(self):
+        with self._hedge_pool_lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix='translate-hedge')
+            return self._hedge_pool
+    
+    def _language_executor(self):
+        with self._hedge_pool_lock:
+            if self._language_pool is None:
+                self._language_pool = ThreadPoolExecutor(max_workers=Config.TRANSLATION_BATCH_WORKERS,
+                                                         thread_name_prefix='translate-language')
+            return self._language_pool
+    
+    def _chunk_executor(self):
+        with self._hedge_pool_lock:
+            if self._chunk_pool is None:
+                self._chunk_pool = ThreadPoolExecutor(max_workers=Config.TRANSLATION_CHUNK_WORKERS,
+                                                      thread_name_prefix='translate-chunk')
+            return self._chunk_pool
+    
+    def _hedge_delay(self, name):
+        """Seconds to wait for `name` before asking another mirror (p90 of its recent latency)"""
+        delay_ms = self.scores[name].percentile(Config.TRANSLATION_HEDGE_QUANTILE)
+        if delay_ms is None:
+            delay_ms = Config.TRANSLATION_HEDGE_DEFAULT_DELAY_MS
+        return max(delay_ms, Config.TRANSLATION_HEDGE_MIN_DELAY_MS) / 1000
+    
+    def _call_hedged(self, mirrors, text, source_lang, target_lang):
+        """Ask the mirrors of one provider (best first) with hedging; first good answer wins"""
+        # Each attempt runs in a copy of this request's context so stage timings still land
+        attempts = [
+            lambda name=name, translate=translate, context=contextvars.copy_context(): context.run(
+                self._call_provider, name, translate, text, source_lang, target_lang)
+            for name, _, translate in mirrors
+        ]
+        index, result = hedged_call(attempts, lambda i: self._hedge_delay(mirrors[i][0]),
+                                    self.hedge_max, self._hedge_executor())
+        outcome = 'none' if index is None else 'primary' if index == 0 else 'hedge'
+        TRANSLATION_HEDGES.inc(provider=mirrors[0][1], winner=outcome)
+        return result
+    
+    def _provider_steps(self, providers):
+        """
+        With hedging on, mirrors of the same provider form one step (ordered by
+        their best member); otherwise every provider is its own step
+        """
+        if self.hedge_max <= 0:
+            return [[provider] for provider in providers]
+        steps = {}
+        for provider in providers:
+            steps.setdefault(provider[1], []).append(provider)
+        return list(steps.values())
+    
+    @timed('translate')
+    def translate_text(self, text, source_lang, target_lang, on_partial=None):
+        """
+        Translate text using available service. on_partial, if given, is
+        called with the translation so far as output comes in (streaming)
+        """
+        with partial_scope(on_partial):
+            result, _ = self._translate(text, source_lang, target_lang)
+        if result is None:
+            result = text  # Return original text if all services fail
+        if on_partial is not None:
+            on_partial(result)
+        return result
+    
+    def translate_many(self, text, source_lang, target_langs):
+        """
+        {target: (translation, provider)} for several target languages at
+        once, run concurrently; the text is segmented once for all of them.
+        A target whose translation failed maps to (None, None).
+        """
+        pieces = segment(text) if self.memory is not None and text else None
+        futures = {target: self._language_executor().submit(
+                       contextvars.copy_context().run, self._translate, text, source_lang, target, pieces)
+                   for target in dict.fromkeys(target_langs)}
+        results = {}
+        for target, future in futures.items():
             try:
-                from google_trans_new import google_translator
-                self.google_translator = google_translator()
-                self.translation_method = 'google'
-                print("✅ Google Translate initialized (free alternative)")
-            except:
-                print("⚠️ All translation services unavailable. Installing fallback...")
-                self.translation_method = 'text_only'
-    
-    def translate_text(self, text, source_lang, target_lang):
-        """Translate text using available service"""
+                results[target] = future.result()
+            except Exception as e:
+                logger.warning("Translation to %s failed: %s", target, e)
+                results[target] = (None, None)
+        return results
+    
+    def _translate(self, text, source_lang, target_lang, pieces=None):
+        """(translation, provider) through the cache and memory, or (None, None) if every provider failed"""
         if not text or not text.strip():
-            return ""
+            return "", None
         
-        # Try each available method
-        if self.translation_method == 'groq':
-            result = self._translate_groq(text, source_lang, target_lang)
-            if result and not result.startswith("Translation failed"):
-                return result
-            print("⚠️ Groq failed, trying fallback methods...")
+        if self.cache is not None:
+            cached = self.cache.get(text, source_lang, target_lang)
+            TRANSLATION_CACHE_LOOKUPS.inc(result='hit' if cached else 'miss')
+            if cached:
+                annotate_request(translation_provider=cached[1], translation_cache='hit')
+                return cached
         
-        # Try LibreTranslate
-        result = self._translate_libretranslate(text, source_lang, target_lang)
-        if result:
-            return result
+        if self.memory is not None:
+            result, stats = translate_segments(
+                text, source_lang, target_lang, self.memory,
+                lambda batch: self._translate_uncached(batch, source_lang, target_lang), pieces=pieces)
+            TRANSLATION_MEMORY_SEGMENTS.inc(stats['from_memory'], result='hit')
+            TRANSLATION_MEMORY_SEGMENTS.inc(stats['sent'], result='miss')
+            annotate_request(translation_segments=stats['segments'], translation_segments_sent=stats['sent'])
+            if stats.get('misaligned'):
+                logger.info("Segment batch came back misaligned; translating the text whole")
+            if result is not None:
+                provider = stats['provider']
+            else:
+                result, provider = self._translate_uncached(text, source_lang, target_lang)
+        else:
+            result, provider = self._translate_uncached(text, source_lang, target_lang)
         
-        # Try MyMemory
-        result = self._translate_mymemory(text, source_lang, target_lang)
-        if result:
-            return result
+        if result is None:
+            annotate_request(translation_provider='none')
+            return None, None
+        annotate_request(translation_provider=provider)
+        if self.cache is not None:
+            self.cache.put(text, source_lang, target_lang, result, provider)
+        return result, provider
+    
+    def _translate_uncached(self, text, source_lang, target_lang):
+        """(translation, provider kind) from the first provider that succeeds, else (None, None)"""
+        self.start_health_checks()
         
-        # Try Google Translate as last resort
-        result = self._translate_google(text, source_lang, target_lang)
-        if result:
-            return result
+        # Groq (configured, best quality) first, then the free providers
+        # ordered by observed latency and success; open circuits are skipped
+        providers = [('groq', 'groq', self._translate_groq)] if self.groq_client else []
+        providers += self._ordered_fallbacks()
+        return self._translate_with(self._provider_steps(providers), text, source_lang, target_lang)
+    
+    def _call_step(self, step, text, source_lang, target_lang):
+        if len(step) > 1:
+            result = self._call_hedged(step, text, source_lang, target_lang)
+        else:
+            name, _, translate = step[0]
+            result = self._call_provider(name, translate, text, source_lang, target_lang)
+        return result if result and not result.startswith("Translation failed") else None
+    
+    def _translate_with(self, steps, text, source_lang, target_lang):
+        """
+        Translate with steps[0], cutting the text into chunks that fit its
+        limit; chunks it still fails on after retries go to the later steps
+        """
+        if not steps:
+            return None, None
+        step, rest = steps[0], steps[1:]
+        kind = step[0][1]
+        chunks = split_chunks(text, self._chunk_chars(kind, target_lang) or len(text))
+        
+        if len(chunks) == 1:
+            result = self._call_step(step, text, source_lang, target_lang)
+            if result:
+                return result, kind
+            return self._translate_with(rest, text, source_lang, target_lang)
+        
+        annotate_request(translation_chunks=len(chunks))
+        parent = current_reporter()
+        finished = {}
+        finished_lock = threading.Lock()
+        
+        def chunk_reporter(index):
+            # Output so far = the finished chunks before `index` + this chunk's partial output
+            def report(partial):
+                with finished_lock:
+                    if all(j in finished for j in range(index)):
+                        parent(''.join(finished[j] for j in range(index)) + partial)
+            return report if parent is not None else None
+        
+        def on_result(index, result):
+            if parent is None:
+                return
+            with finished_lock:
+                finished[index] = result + chunks[index][1]
+                if all(j in finished for j in range(index)):  # the finished prefix grew
+                    prefix = []
+                    for j in range(len(chunks)):
+                        if j not in finished:
+                            break
+                        prefix.append(finished[j])
+                    parent(''.join(prefix))
         
-        # If all fail, return original text with note
-        return text  # Return original text if all services fail
+        def translate_chunk(index, chunk):
+            with partial_scope(chunk_reporter(index)):
+                return self._call_step(step, chunk, source_lang, target_lang)
+        
+        results = translate_chunks([chunk for chunk, _ in chunks], translate_chunk, self._chunk_executor(),
+                                   retries=Config.TRANSLATION_CHUNK_RETRIES, on_result=on_result)
+        for i, result in enumerate(results):
+            if result is None:
+                with partial_scope(chunk_reporter(i)):
+                    result, _ = self._translate_with(rest, chunks[i][0], source_lang, target_lang)
+                if result is None:
+                    return None, None
+                results[i] = result
+                on_result(i, result)
+        return ''.join(result + sep for result, (_, sep) in zip(results, chunks)), kind
+    
+    @staticmethod
+    def _chunk_chars(kind, target_lang):
+        """Longest chunk to send to a provider; Groq's also has to fit its output token budget"""
+        limit = Config.TRANSLATION_CHUNK_CHARS.get(kind)
+        if kind == 'groq':
+            fits = int((Config.GROQ_MAX_TOKENS - GROQ_TOKEN_HEADROOM) / _groq_tokens_per_char(target_lang))
+            limit = min(limit, fits) if limit else fits
+        return limit
     
+    @timed('translate.groq')
     def _translate_groq(self, text, source_lang, target_lang):
         """Translate using Groq API"""
         if not self.groq_client:
@@ -121,6 +424,8 @@ Text to translate:
 
 Please provide ONLY the translated text in {target_name}, nothing else."""
             
+            # Stream tokens when someone is waiting on partial output
+            streaming = current_reporter() is not None
             chat_completion = self.groq_client.chat.completions.create(
                 messages=[
                     {"role": "system", "content": f"You are a professional translator. Translate text accurately to {target_name}."},
@@ -128,109 +433,140 @@ Please provide ONLY the translated text in {target_name}, nothing else."""
                 ],
                 model="llama-3.3-70b-versatile",
                 temperature=0.3,
-                max_tokens=2048,
+                max_tokens=min(Config.GROQ_MAX_TOKENS,
+                               int(len(text) * _groq_tokens_per_char(target_lang)) + GROQ_TOKEN_HEADROOM),
                 top_p=1,
-                stream=False
+                stream=streaming
             )
             
-            translated = chat_completion.choices[0].message.content.strip()
-            print(f"✅ Translation successful (Groq): {source_lang} → {target_lang}")
-            return translated
+            if streaming:
+                parts = []
+                finish_reason = None
+                for chunk in chat_completion:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    finish_reason = chunk.choices[0].finish_reason or finish_reason
+                    if delta:
+                        parts.append(delta)
+                        report_partial(''.join(parts).lstrip())
+                translated = ''.join(parts).strip()
+            else:
+                translated = chat_completion.choices[0].message.content.strip()
+                finish_reason = chat_completion.choices[0].finish_reason
         except Exception as e:
-            print(f"❌ Groq translation error: {str(e)}")
+            logger.warning("Groq translation error: %s", e)
+            raise ProviderError(f'Groq: {e}') from e
+        
+        if finish_reason == 'length':
+            return self._translate_groq_halves(text, source_lang, target_lang)
+        logger.debug("Translation successful (Groq): %s -> %s", source_lang, target_lang)
+        return translated
+    
+    def _translate_groq_halves(self, text, source_lang, target_lang):
+        """
+        The output hit max_tokens, so the translation is cut off: translate
+        the text again in halves (cut at boundaries) rather than keep it.
+        None when the text is too short to split
+        """
+        pieces = split_chunks(text, (len(text) + 1) // 2)
+        if len(text) < GROQ_MIN_SPLIT_CHARS or len(pieces) < 2:
+            logger.warning("Groq output truncated for a %d-character text", len(text))
             return None
+        logger.info("Groq output truncated; retrying %d characters in %d pieces", len(text), len(pieces))
+        
+        parent = current_reporter()
+        done = ''
+        for piece, sep in pieces:
+            with partial_scope((lambda partial, done=done: parent(done + partial)) if parent is not None else None):
+                translated = self._translate_groq(piece, source_lang, target_lang)
+            if not translated:
+                return None
+            done += translated + sep
+        return done.strip()
     
-    def _translate_libretranslate(self, text, source_lang, target_lang):
-        """Translate using LibreTranslate (free alternative)"""
-        try:
-            lang_map = {
-                'auto': 'auto', 'en': 'en', 'es': 'es', 'fr': 'fr', 'de': 'de',
-                'it': 'it', 'pt': 'pt', 'hi': 'hi', 'zh': 'zh', 'ja': 'ja',
-                'ko': 'ko', 'ar': 'ar', 'ru': 'ru', 'mr': 'mr'
-            }
-            
-            src = lang_map.get(source_lang, source_lang)
-            tgt = lang_map.get(target_lang, target_lang)
-            
-            # Try all available endpoints
-            for endpoint in self.libretranslate_endpoints:
-                try:
-                    payload = {
-                        "q": text,
-                        "source": src if src != 'auto' else 'auto',
-                        "target": tgt,
-                        "format": "text"
-                    }
-                    
-                    response = requests.post(f'{endpoint}/translate', json=payload, timeout=5)
-                    if response.status_code == 200:
-                        result = response.json().get('translatedText', '')
-                        if result:
-                            print(f"✅ Translation successful (LibreTranslate): {source_lang} → {target_lang}")
-                            return result
-                except:
-                    continue
-        except Exception as e:
-            print(f"⚠️ LibreTranslate failed: {str(e)}")
+    @timed('translate.libretranslate')
+    def _translate_libretranslate(self, endpoint, text, source_lang, target_lang):
+        """Translate using one LibreTranslate endpoint (free alternative)"""
+        lang_map = {
+            'auto': 'auto', 'en': 'en', 'es': 'es', 'fr': 'fr', 'de': 'de',
+            'it': 'it', 'pt': 'pt', 'hi': 'hi', 'zh': 'zh', 'ja': 'ja',
+            'ko': 'ko', 'ar': 'ar', 'ru': 'ru', 'mr': 'mr'
+        }
+        
+        src = lang_map.get(source_lang, source_lang)
+        tgt = lang_map.get(target_lang, target_lang)
+        
+        payload = {
+            "q": text,
+            "source": src if src != 'auto' else 'auto',
+            "target": tgt,
+            "format": "text"
+        }
+        
+        response = self.http.post(f'{endpoint}/translate', json=payload)
+        if response.status_code >= 500 or response.status_code in REJECTED_STATUSES:
+            raise ProviderError(f'LibreTranslate {endpoint}: HTTP {response.status_code}')
+        if response.status_code == 200:
+            result = response.json().get('translatedText', '')
+            if result:
+                logger.debug("Translation successful (LibreTranslate): %s -> %s", source_lang, target_lang)
+                return result
         
         return None
     
+    @timed('translate.mymemory')
     def _translate_mymemory(self, text, source_lang, target_lang):
         """Translate using MyMemory API (free, no API key needed)"""
-        try:
-            lang_map = {
-                'auto': 'en', 'en': 'en', 'es': 'es', 'fr': 'fr', 'de': 'de',
-                'it': 'it', 'pt': 'pt', 'hi': 'hi', 'zh': 'zh-CN', 'ja': 'ja',
-                'ko': 'ko', 'ar': 'ar', 'ru': 'ru', 'mr': 'hi'  # Marathi not supported, use Hindi
-            }
-            
-            src = lang_map.get(source_lang, 'en')
-            tgt = lang_map.get(target_lang, 'en')
-            
-            # Limit text length for MyMemory (max 500 chars per request)
-            if len(text) > 500:
-                # Split text and translate in chunks
-                chunks = [text[i:i+500] for i in range(0, len(text), 500)]
-                translated_chunks = []
-                for chunk in chunks:
-                    try:
-                        response = requests.get(
-                            f'https://mymemory.translated.net/api/get?q={requests.utils.quote(chunk)}&langpair={src}|{tgt}',
-                            timeout=5
-                        )
-                        if response.status_code == 200:
-                            data = response.json()
-                            if data.get('responseStatus') == 200:
-                                translated_chunks.append(data['responseData']['translatedText'])
-                    except:
-                        pass
-                
-                if translated_chunks:
-                    result = ''.join(translated_chunks)
-                    print(f"✅ Translation successful (MyMemory): {source_lang} → {target_lang}")
-                    return result
-            else:
-                response = requests.get(
-                    f'https://mymemory.translated.net/api/get?q={requests.utils.quote(text)}&langpair={src}|{tgt}',
-                    timeout=5
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    if data.get('responseStatus') == 200:
-                        result = data['responseData']['translatedText']
-                        if result and result != text:  # Ensure translation is different
-                            print(f"✅ Translation successful (MyMemory): {source_lang} → {target_lang}")
-                            return result
-        except Exception as e:
-            print(f"⚠️ MyMemory failed: {str(e)}")
+        lang_map = {
+            'auto': 'en', 'en': 'en', 'es': 'es', 'fr': 'fr', 'de': 'de',
+            'it': 'it', 'pt': 'pt', 'hi': 'hi', 'zh': 'zh-CN', 'ja': 'ja',
+            'ko': 'ko', 'ar': 'ar', 'ru': 'ru', 'mr': 'hi'  # Marathi not supported, use Hindi
+        }
+        
+        src = lang_map.get(source_lang, 'en')
+        tgt = lang_map.get(target_lang, 'en')
+        
+        # Limit text length for MyMemory (max 500 chars per request); longer
+        # texts are normally chunked before they get here. Any rejected piece
+        # fails the whole call: a partial text must never be cached or stored.
+        chunks = split_chunks(text, 500)
+        translated_chunks = []
+        for chunk, sep in chunks:
+            response = self.http.get(
+                f'{self.mymemory_url}/api/get?q={requests.utils.quote(chunk)}&langpair={src}|{tgt}'
+            )
+            if response.status_code >= 500 or response.status_code in REJECTED_STATUSES:
+                raise ProviderError(f'MyMemory: HTTP {response.status_code}')
+            data = response.json() if response.status_code == 200 else {}
+            if data.get('responseStatus') == 429:  # daily quota used up
+                raise ProviderError(f"MyMemory: {data.get('responseDetails') or data.get('responseStatus')}")
+            if data.get('responseStatus') != 200:
+                logger.debug("MyMemory rejected a chunk (HTTP %s, status %s)",
+                             response.status_code, data.get('responseStatus'))
+                return None
+            translated_chunks.append(data['responseData']['translatedText'] + sep)
+        
+        result = ''.join(translated_chunks)
+        if result and result != text:  # Ensure translation is different
+            logger.debug("Translation successful (MyMemory): %s -> %s", source_lang, target_lang)
+            return result
         
         return None
     
+    def _google(self):
+        """This thread's google_trans_new client, created on its first use"""
+        client = getattr(self._google_local, 'client', None)
+        if client is None:
+            from google_trans_new import google_translator
+            client = self._google_local.client = google_translator()
+        return client
+    
+    @timed('translate.google')
     def _translate_google(self, text, source_lang, target_lang):
         """Translate using Google Translate (free alternative)"""
         try:
-            from google_trans_new import google_translator
-            translator = google_translator()
+            translator = self._google()
             
             lang_map = {
                 'auto': 'auto', 'en': 'en', 'es': 'es', 'fr': 'fr', 'de': 'de',
@@ -243,9 +579,10 @@ Please provide ONLY the translated text in {target_name}, nothing else."""
             
             result = translator.translate(text, lang_tgt=tgt, lang_src=src)
             if result:
-                print(f"✅ Translation successful (Google): {source_lang} → {target_lang}")
+                logger.debug("Translation successful (Google): %s -> %s", source_lang, target_lang)
                 return result
         except Exception as e:
-            print(f"⚠️ Google Translate failed: {str(e)}")
+            logger.warning("Google Translate failed: %s", e)
+            raise ProviderError(f'Google: {e}') from e
         
         return None
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""
+Workload capture for replay
+
+Each process appends one JSON line per captured request to
+CAPTURE_DIR/capture_<pid>.jsonl: arrival time, endpoint, parameters,
+content hash and size of the input, status, duration and stage timings.
+With store_inputs, uploaded files are also kept (once per content hash)
+under CAPTURE_DIR/blobs/ so benchmarks/replay.py can re-send them, along
+with their original filename; otherwise only the file extension is kept.
+
+User ids are stored as a salted hash, never as the raw id. Hashing and
+file writes happen on a background writer thread, off the request path.
+"""
+import hashlib
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WorkloadCapture:
+    """Appends request records (and optionally input blobs) to a capture directory"""
+
+    def __init__(self, directory: str, store_inputs: bool = False, sample_rate: float = 1.0,
+                 queue_size: int = 1000):
+        self.directory = directory
+        self.store_inputs = store_inputs
+        self.sample_rate = sample_rate
+        self.dropped = 0  # records not captured because the writer fell behind
+        self._lock = threading.Lock()
+        self._salt = self._load_salt()
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._writer: Optional[threading.Thread] = None
+        self._writer_pid = None
+
+    def _load_salt(self) -> str:
+        os.makedirs(os.path.join(self.directory, 'blobs'), exist_ok=True)
+        path = os.path.join(self.directory, 'salt')
+        try:
+            # O_EXCL: the first process creates it, the others read it
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+            with os.fdopen(fd, 'w') as f:
+                f.write(os.urandom(16).hex())
+        except FileExistsError:
+            pass
+        with open(path) as f:
+            return f.read().strip()
+
+    def sampled(self) -> bool:
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def user_hash(self, user_id) -> Optional[str]:
+        if user_id is None:
+            return None
+        return hashlib.sha256(f'{self._salt}:{user_id}'.encode()).hexdigest()[:16]
+
+    def store_blob(self, data: bytes) -> str:
+        """Content hash of `data`; the bytes are kept only when store_inputs is on"""
+        digest = hashlib.sha256(data).hexdigest()
+        if self.store_inputs:
+            path = os.path.join(self.directory, 'blobs', digest)
+            if not os.path.exists(path):
+                tmp_path = f'{path}.{os.getpid()}.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+        return digest
+
+    def submit(self, entry: Dict, data: Optional[bytes] = None) -> bool:
+        """
+        Queue a record for the background writer, which adds the content
+        hash and size of `data` (the uploaded file) before writing it.
+        Returns False, dropping the record, when the writer is behind.
+        """
+        self._start_writer()
+        try:
+            self._queue.put_nowait((entry, data))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def drain(self):
+        """Block until every queued record is written"""
+        self._queue.join()
+
+    def _start_writer(self):
+        # Threads do not survive fork(), so a forked worker starts its own
+        with self._lock:
+            if self._writer is not None and self._writer_pid == os.getpid():
+                return
+            self._writer = threading.Thread(target=self._run, name='workload-capture', daemon=True)
+            self._writer_pid = os.getpid()
+            self._writer.start()
+
+    def _run(self):
+        while True:
+            entry, data = self._queue.get()
+            try:
+                if data is not None:
+                    entry['content_sha256'] = self.store_blob(data)
+                    entry['content_bytes'] = len(data)
+                self.record(entry)
+            except Exception as e:
+                logger.warning("Workload capture failed: %s", e)
+            finally:
+                self._queue.task_done()
+
+    def record(self, entry: Dict):
+        entry.setdefault('ts', time.time())
+        line = json.dumps(entry, default=str, sort_keys=True) + '\n'
+        path = os.path.join(self.directory, f'capture_{os.getpid()}.jsonl')
+        with self._lock:
+            with open(path, 'a') as f:
+                f.write(line)
+
+
+def blob_path(directory: str, digest: str) -> Optional[str]:
+    path = os.path.join(directory, 'blobs', digest)
+    return path if os.path.exists(path) else None
+
+
+def load_capture(directory: str) -> List[Dict]:
+    """All records of every process, in arrival order"""
+    entries = []
+    for name in sorted(os.listdir(directory)):
+        if name.startswith('capture_') and name.endswith('.jsonl'):
+            entries.extend(_read_lines(os.path.join(directory, name)))
+    entries.sort(key=lambda entry: entry['ts'])
+    return entries
+
+
+def _read_lines(path: str) -> Iterator[Dict]:
+    with open(path) as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue  # a line cut short by a crash